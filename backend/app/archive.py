@@ -0,0 +1,186 @@
+"""
+Hot/cold archival of expired estimates.
+
+An estimate whose ``valid_until`` is more than ``ARCHIVE_AFTER_DAYS``
+(default 90) in the past is moved, with its line items, from
+``estimates``/``line_items`` to ``estimates_archive``/``line_items_archive``.
+The hot tables and their indexes then hold only the working set that the
+dashboard and lists query.
+
+The job moves up to ``ARCHIVE_BATCH_SIZE`` estimates per transaction:
+
+* one SELECT picks the longest-expired candidates (``FOR UPDATE SKIP
+  LOCKED`` on PostgreSQL, so concurrent runs take different rows),
+* one ``INSERT ... SELECT ... RETURNING`` copies the candidates still at the
+  version just read. An estimate edited in between stays hot until the next
+  run,
+* one ``INSERT ... SELECT`` copies their line items and two DELETEs remove
+  both from the hot tables.
+
+``estimate_daily_stats`` is left alone: archiving is not deletion, and the
+stats keep counting archived estimates (see ``app.stats``).
+
+Rows keep their ids. Ids are never handed out twice (``AUTOINCREMENT`` on
+SQLite, sequences on PostgreSQL), so an archived id can't come back as a
+new hot estimate.
+
+Run it from cron or a deploy hook:
+
+    python -m app.archive                       # until nothing is left
+    python -m app.archive --days 30 --max-batches 10
+
+or in-process with ``ARCHIVE_INTERVAL`` seconds between runs (default 0,
+off; see ``main``).
+
+Archived estimates are read-only. Lists, exports and search skip them
+unless called with ``include_archived=true``. ``GET /api/estimates/{id}``
+still finds them. Each move is published to the change feed as
+``estimate.archived`` (see ``app.events``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.batch import unchanged
+from app.cache import response_cache
+from app.database import AsyncSessionLocal, async_engine
+from app.events import estimate_events
+from app.models.archive import ArchivedEstimateModel, ArchivedLineItemModel
+from app.models.estimate import EstimateModel, LineItemModel
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = max(1, int(os.getenv("ARCHIVE_BATCH_SIZE", "1000")))
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "0"))
+
+logger = logging.getLogger("app.archive")
+
+_ESTIMATE_COLUMNS = [
+    c.name for c in ArchivedEstimateModel.__table__.c if c.name != "archived_at"
+]
+_LINE_COLUMNS = [c.name for c in ArchivedLineItemModel.__table__.c]
+
+
+def cutoff_date(days: int = ARCHIVE_AFTER_DAYS) -> date:
+    """Estimates valid until before this date are cold."""
+    return date.today() - timedelta(days=days)
+
+
+async def archive_batch(
+    db: AsyncSession, cutoff: date, batch_size: int = ARCHIVE_BATCH_SIZE
+) -> list[tuple[int, str]]:
+    """Move up to ``batch_size`` estimates that expired before ``cutoff``.
+
+    Returns the (id, number) of every estimate moved. The caller commits.
+    """
+    hot, lines = EstimateModel.__table__, LineItemModel.__table__
+    cold, cold_lines = ArchivedEstimateModel.__table__, ArchivedLineItemModel.__table__
+
+    stmt = (
+        select(hot.c.id, hot.c.number, hot.c.version)
+        .where(hot.c.valid_until < cutoff)
+        .order_by(hot.c.valid_until, hot.c.id)
+        .limit(batch_size)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = stmt.with_for_update(skip_locked=True)
+    candidates = {row.id: row for row in await db.execute(stmt)}
+    if not candidates:
+        return []
+
+    copied = await db.scalars(
+        insert(cold)
+        .from_select(
+            [*_ESTIMATE_COLUMNS, "archived_at"],
+            select(
+                *(hot.c[name] for name in _ESTIMATE_COLUMNS), func.current_timestamp()
+            ).where(unchanged(hot, candidates)),
+        )
+        .returning(cold.c.id)
+    )
+    ids = list(copied)
+    if not ids:
+        return []
+    await db.execute(
+        insert(cold_lines).from_select(
+            _LINE_COLUMNS,
+            select(*(lines.c[name] for name in _LINE_COLUMNS))
+            .where(lines.c.estimate_id.in_(ids))
+            .order_by(lines.c.id),
+        )
+    )
+    await db.execute(delete(lines).where(lines.c.estimate_id.in_(ids)))
+    await db.execute(delete(hot).where(hot.c.id.in_(ids)))
+    return [(i, candidates[i].number) for i in ids]
+
+
+async def run_archival(
+    days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Archive batch after batch until a short one; returns how many moved."""
+    cutoff = cutoff_date(days)
+    moved_total = batches = 0
+    async with AsyncSessionLocal() as db:
+        while max_batches is None or batches < max_batches:
+            moved = await archive_batch(db, cutoff, batch_size)
+            await db.commit()
+            batches += 1
+            if moved:
+                response_cache.invalidate_estimates(moved)
+                await estimate_events.estimates_archived(moved)
+                moved_total += len(moved)
+            if len(moved) < batch_size:
+                break
+    return moved_total
+
+
+async def archive_periodically(interval: float = ARCHIVE_INTERVAL) -> None:
+    """Run ``run_archival`` every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            moved = await run_archival()
+        except Exception:
+            logger.exception("archival run failed")
+            continue
+        if moved:
+            logger.info("archived %d estimates", moved)
+
+
+async def _run_once(args: argparse.Namespace) -> int:
+    try:
+        return await run_archival(args.days, args.batch_size, args.max_batches)
+    finally:
+        await async_engine.dispose()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=ARCHIVE_AFTER_DAYS,
+        help="Archive estimates that expired more than this many days ago",
+    )
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, help="Default: until done")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    moved = asyncio.run(_run_once(args))
+    print(f"archived {moved} estimates in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Batch status changes and deletes: the list view's bulk actions.
+
+A batch runs in one transaction as a fixed number of set-based statements,
+however many estimates it names:
+
+* one SELECT loads the affected estimates (locked ``FOR UPDATE`` on
+  PostgreSQL),
+* one ``UPDATE ... RETURNING`` per target status sets ``status``, the
+  derived ``type`` and bumps ``version``,
+* one DELETE removes the line items of the estimates being deleted and one
+  ``DELETE ... RETURNING`` removes the estimates,
+* one upsert moves them between the ``estimate_stats`` buckets.
+
+Each operation is checked on its own. An unknown id (404) or a stale
+``version`` (409) is reported in that operation's result and the rest of
+the batch still applies. Writes match on ``(id, version)``, so an estimate
+changed by another request after it was loaded is reported as a conflict
+instead of being overwritten.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import and_, delete, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import stats as estimate_stats
+from app.models.estimate import EstimateModel, LineItemModel
+from app.schemas.estimate import (
+    EstimateBatchOperation,
+    EstimateBatchOperationResult,
+)
+
+
+def estimate_type(status: str) -> str:
+    """The ``type`` an estimate gets with this status."""
+    return "draft" if status == "Draft" else "active"
+
+
+@dataclass
+class BatchOutcome:
+    results: list[EstimateBatchOperationResult]
+    # (id, number) of every estimate written, for cache invalidation.
+    changed: list[tuple[int, str]] = field(default_factory=list)
+    # What the change feed reports: new status per estimate, and deletes.
+    status_changes: list[dict] = field(default_factory=list)
+    deleted: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if r.error)
+
+
+def _conflict(version: int) -> str:
+    return f"Estimate has changed (current version {version})"
+
+
+def unchanged(table, rows: dict[int, Row]):
+    """Match these estimates only if they still have the version we loaded.
+
+    The plain ``id IN`` lets SQLite use the primary key; on its own the
+    row-value ``IN`` makes it scan the table.
+    """
+    return and_(
+        table.c.id.in_(list(rows)),
+        tuple_(table.c.id, table.c.version).in_(
+            [(i, row.version) for i, row in rows.items()]
+        ),
+    )
+
+
+async def apply_batch(
+    db: AsyncSession, operations: list[EstimateBatchOperation]
+) -> BatchOutcome:
+    """Apply the operations in ``db``'s transaction. The caller commits."""
+    table = EstimateModel.__table__
+    stmt = select(
+        table.c.id,
+        table.c.number,
+        table.c.date,
+        table.c.status,
+        table.c.type,
+        table.c.customer_id,
+        table.c.total,
+        table.c.version,
+    ).where(table.c.id.in_([op.id for op in operations]))
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = stmt.with_for_update()
+    rows = {row.id: row for row in await db.execute(stmt)}
+
+    results: list[EstimateBatchOperationResult] = []
+    deletes: dict[int, Row] = {}
+    updates: dict[str, dict[int, Row]] = defaultdict(dict)
+    for index, op in enumerate(operations):
+        result = EstimateBatchOperationResult(
+            index=index, id=op.id, op=op.op, code=200
+        )
+        results.append(result)
+        row = rows.get(op.id)
+        if row is None:
+            result.code, result.error = 404, "Estimate not found"
+        elif op.version is not None and op.version != row.version:
+            result.code, result.error = 409, _conflict(row.version)
+        elif op.op == "delete":
+            result.code = 204
+            deletes[op.id] = row
+        elif (row.status, row.type) == (op.status, estimate_type(op.status)):
+            result.version = row.version  # already there: nothing to write
+        else:
+            updates[op.status][op.id] = row
+
+    outcome = BatchOutcome(results)
+    removed, added = [], []
+    written: dict[int, int | None] = {}
+
+    if deletes:
+        matches = unchanged(table, deletes)
+        lines = LineItemModel.__table__
+        await db.execute(
+            delete(lines).where(
+                lines.c.estimate_id.in_(select(table.c.id).where(matches))
+            )
+        )
+        for estimate_id in await db.scalars(
+            delete(table).where(matches).returning(table.c.id)
+        ):
+            written[estimate_id] = None
+            removed.append(estimate_stats.snapshot(deletes[estimate_id]))
+
+    for status, targets in updates.items():
+        kind = estimate_type(status)
+        returned = await db.execute(
+            update(table)
+            .where(unchanged(table, targets))
+            .values(status=status, type=kind, version=table.c.version + 1)
+            .returning(table.c.id, table.c.version)
+        )
+        for estimate_id, version in returned:
+            written[estimate_id] = version
+            before = estimate_stats.snapshot(targets[estimate_id])
+            removed.append(before)
+            added.append((before[0], status, kind, *before[3:]))
+
+    await estimate_stats.record(db, removed, added)
+
+    for result in results:
+        if result.error or result.version is not None:
+            continue
+        if result.id in written:
+            result.version = written[result.id]
+            key = (result.id, rows[result.id].number)
+            outcome.changed.append(key)
+            if result.version is None:
+                outcome.deleted.append(key)
+            else:
+                status = operations[result.index].status
+                outcome.status_changes.append(
+                    {
+                        "id": result.id,
+                        "number": key[1],
+                        "status": status,
+                        "type": estimate_type(status),
+                        "version": result.version,
+                    }
+                )
+        else:
+            # Matched nothing: another request changed it after it was loaded.
+            result.code = 409
+            result.error = "Estimate was changed by another request; reload and retry"
+    return outcome
@@ -0,0 +1,334 @@
+"""
+Bulk estimate import: streaming parse, chunked batched inserts.
+
+The request body (NDJSON or a JSON array) is parsed incrementally, so the
+whole payload is never held in memory. Records are validated one at a time
+and written in chunks of ``BULK_CHUNK_SIZE``. Each chunk is one transaction:
+
+* one ``IN (...)`` query per table (hot and archive) checks explicitly
+  given numbers for duplicates,
+* one ``IN (...)`` query each checks that the referenced customers and
+  items exist,
+* one counter update moves the counter past explicitly given numeric
+  numbers, and one reserves a block for the records without a number,
+* one multi-row ``INSERT ... RETURNING`` writes the estimates,
+* one executemany ``INSERT`` writes all of their line items,
+* one upsert adds them to the ``estimate_stats`` buckets.
+
+A bad record is reported with its index and does not stop the job. That
+includes an unknown ``customer_id`` or ``item_id``, which validation can't
+see and which would otherwise fail the chunk's foreign keys on PostgreSQL.
+A chunk that still fails in the database is rolled back and reported on
+its own.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import ArchivedEstimateModel
+from app.models.customer import CustomerModel
+from app.models.estimate import EstimateModel, LineItemModel
+from app.models.item import ItemModel
+from app import stats as estimate_stats
+from app.numbering import advance_numbers_past, allocate_numbers
+from app.schemas.estimate import BulkImportError, BulkImportResult, EstimateCreate
+
+BULK_CHUNK_SIZE = 1000
+
+
+class _ParseError(ValueError):
+    """A record could not be decoded; ``fatal`` means the stream is unusable."""
+
+    def __init__(self, message: str, fatal: bool = False) -> None:
+        super().__init__(message)
+        self.fatal = fatal
+
+
+# ── Streaming parse ─────────────────────────────────────────────────────────
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    async for chunk in chunks:
+        buf += decoder.decode(chunk)
+        *lines, buf = buf.split("\n")
+        for line in lines:
+            if line.strip():
+                yield _loads(line)
+    buf += decoder.decode(b"", final=True)
+    if buf.strip():
+        yield _loads(buf)
+
+
+def _loads(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return _ParseError(f"Invalid JSON: {exc}")
+
+
+async def _iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield the elements of a top-level JSON array as they arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parser = json.JSONDecoder()
+    buf, pos, started, done = "", 0, False, False
+    ended = False
+
+    while not done:
+        chunk = await anext(chunks, None)
+        if chunk is None:
+            buf += decoder.decode(b"", final=True)
+            ended = True
+        else:
+            buf += decoder.decode(chunk)
+
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    yield _ParseError("Body must be a JSON array or NDJSON", True)
+                    return
+                started, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                done = True
+                break
+            try:
+                value, pos = parser.raw_decode(buf, pos)
+            except ValueError as exc:
+                if ended:
+                    yield _ParseError(f"Invalid JSON: {exc}", True)
+                    return
+                break  # element is incomplete; read more
+            yield value
+
+        buf, pos = buf[pos:], 0
+        if ended and not done:
+            if started:
+                yield _ParseError("Unexpected end of JSON array", True)
+            return
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], content_type: str
+) -> AsyncIterator[Any]:
+    """Decode a request body into records (or ``_ParseError`` markers).
+
+    NDJSON is used for ``application/x-ndjson`` / ``application/jsonl``
+    bodies; anything else must be a JSON array.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in ("application/x-ndjson", "application/jsonl"):
+        source = _iter_ndjson(chunks)
+    else:
+        source = _iter_json_array(chunks)
+    async for record in source:
+        yield record
+
+
+# ── Batched writes ──────────────────────────────────────────────────────────
+
+
+@dataclass
+class _Pending:
+    index: int
+    data: EstimateCreate
+
+
+@dataclass
+class BulkImporter:
+    db: AsyncSession
+    chunk_size: int = BULK_CHUNK_SIZE
+    created: int = 0
+    errors: list[BulkImportError] = field(default_factory=list)
+    _pending: list[_Pending] = field(default_factory=list)
+
+    def fail(self, index: int, error: str, number: str | None = None) -> None:
+        self.errors.append(BulkImportError(index=index, number=number, error=error))
+
+    async def add(self, index: int, record: Any) -> None:
+        if isinstance(record, _ParseError):
+            self.fail(index, str(record))
+            return
+        try:
+            data = EstimateCreate.model_validate(record)
+        except ValidationError as exc:
+            self.fail(index, _describe(exc), _raw_number(record))
+            return
+        self._pending.append(_Pending(index, data))
+        if len(self._pending) >= self.chunk_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        chunk, self._pending = self._pending, []
+        if not chunk:
+            return
+        try:
+            chunk = await self._drop_duplicate_numbers(chunk)
+            chunk = await self._drop_unknown_references(chunk)
+            if chunk:
+                await self._write(chunk)
+            await self.db.commit()
+        except DBAPIError as exc:
+            await self.db.rollback()
+            message = f"Chunk rolled back: {exc.orig}"
+            for p in chunk:
+                self.fail(p.index, message, p.data.number)
+            return
+        self.created += len(chunk)
+
+    async def _write(self, chunk: list[_Pending]) -> None:
+        await advance_numbers_past(p.data.number for p in chunk if p.data.number)
+        missing = [p for p in chunk if not p.data.number]
+        if missing:
+            taken = {p.data.number for p in chunk if p.data.number}
+            numbers: list[str] = []
+            while len(numbers) < len(missing):
+                block = await allocate_numbers(len(missing) - len(numbers))
+                numbers += [n for n in block if n not in taken]
+            for p, number in zip(missing, numbers):
+                p.data.number = number
+
+        today = date.today()
+        default_valid = today + timedelta(days=30)
+        estimate_rows = [
+            {
+                "number": p.data.number,
+                "date": p.data.date or today,
+                "valid_until": p.data.valid_until or default_valid,
+                "status": p.data.status,
+                "type": p.data.type,
+                "customer_id": p.data.customer_id,
+                "notes": p.data.notes,
+                "total": sum(li.price * li.quantity for li in p.data.items),
+                "line_count": len(p.data.items),
+            }
+            for p in chunk
+        ]
+        table = EstimateModel.__table__
+        result = await self.db.execute(
+            insert(table).returning(table.c.id, table.c.number), estimate_rows
+        )
+        ids = {number: estimate_id for estimate_id, number in result}
+
+        line_rows = [
+            {
+                "estimate_id": ids[p.data.number],
+                "item_id": li.item_id,
+                "name": li.name,
+                "description": li.description,
+                "quantity": li.quantity,
+                "price": li.price,
+            }
+            for p in chunk
+            for li in p.data.items
+        ]
+        if line_rows:
+            await self.db.execute(insert(LineItemModel.__table__), line_rows)
+
+        await estimate_stats.record(
+            self.db,
+            added=[
+                (r["date"], r["status"], r["type"], r["customer_id"] or 0, r["total"])
+                for r in estimate_rows
+            ],
+        )
+
+    async def _drop_duplicate_numbers(self, chunk: list[_Pending]) -> list[_Pending]:
+        """Report records whose explicit number already exists or repeats.
+
+        Archived estimates keep their numbers, so those count as taken too.
+        """
+        given = [p.data.number for p in chunk if p.data.number]
+        if not given:
+            return chunk
+        existing = set()
+        for model in (EstimateModel, ArchivedEstimateModel):
+            existing.update(
+                await self.db.scalars(
+                    select(model.number).where(model.number.in_(given))
+                )
+            )
+        kept, seen = [], set()
+        for p in chunk:
+            number = p.data.number
+            if number and (number in existing or number in seen):
+                self.fail(p.index, f"Duplicate estimate number {number}", number)
+                continue
+            if number:
+                seen.add(number)
+            kept.append(p)
+        return kept
+
+    async def _drop_unknown_references(self, chunk: list[_Pending]) -> list[_Pending]:
+        """Report records whose customer or line item ids don't exist."""
+        wanted = {
+            CustomerModel: {p.data.customer_id for p in chunk},
+            ItemModel: {li.item_id for p in chunk for li in p.data.items},
+        }
+        known: dict[type, set[int]] = {}
+        for model, ids in wanted.items():
+            ids.discard(None)
+            known[model] = (
+                set(await self.db.scalars(select(model.id).where(model.id.in_(ids))))
+                if ids
+                else set()
+            )
+        kept = []
+        for p in chunk:
+            customer_id = p.data.customer_id
+            unknown_items = [
+                li.item_id
+                for li in p.data.items
+                if li.item_id is not None and li.item_id not in known[ItemModel]
+            ]
+            if customer_id is not None and customer_id not in known[CustomerModel]:
+                self.fail(p.index, f"Unknown customer_id {customer_id}", p.data.number)
+            elif unknown_items:
+                self.fail(p.index, f"Unknown item_id {unknown_items[0]}", p.data.number)
+            else:
+                kept.append(p)
+        return kept
+
+    async def run(
+        self, chunks: AsyncIterator[bytes], content_type: str
+    ) -> BulkImportResult:
+        """Import every record in the body and report per-record failures."""
+        index = 0
+        async for record in iter_records(chunks, content_type):
+            if isinstance(record, _ParseError) and record.fatal:
+                self.fail(index, str(record))
+                break
+            await self.add(index, record)
+            index += 1
+        await self.flush()
+        return BulkImportResult(
+            created=self.created, failed=len(self.errors), errors=self.errors
+        )
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc']) or 'record'}: {e['msg']}"
+        for e in exc.errors()
+    )
+
+
+def _raw_number(record: Any) -> str | None:
+    if isinstance(record, dict) and isinstance(record.get("number"), str):
+        return record["number"]
+    return None
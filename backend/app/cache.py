@@ -0,0 +1,209 @@
+"""
+Response cache for read-heavy GET endpoints, with ETag revalidation.
+
+Handlers pass a key and a ``build`` coroutine to ``serve``. The first call
+renders the JSON body once and stores it with its ETag and extra headers.
+Later calls return the stored bytes without touching the database, and a
+request whose ``If-None-Match`` matches gets an empty ``304``.
+
+Keys are namespaced (``customers:``, ``items:``, ``estimates:list:``,
+``estimates:get:``, ``receipts:``). Write handlers invalidate exactly the namespaces and
+entities they change. Every invalidation also bumps a generation counter, and
+a body whose build overlapped one is served but not stored. Otherwise a fill
+that read the database just before a write committed would put the old body
+back into the cache after the write invalidated it.
+
+The default backend is an in-process LRU with a TTL (``CACHE_TTL`` seconds,
+default 30; 0 disables caching) and a size bound (``CACHE_MAX_ENTRIES``,
+default 1024). With several workers, point ``CACHE_BACKEND`` at a
+``module:factory`` returning a shared ``CacheBackend``. Otherwise another
+worker's invalidations only reach this worker when the TTL runs out.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from fastapi import Request, Response
+
+from app.responses import dumps
+
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    headers: dict[str, str] = field(default_factory=dict)
+    media_type: str = "application/json"
+
+
+class CacheBackend:
+    """Storage interface; implement this to share the cache across workers."""
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Bounded LRU with per-entry expiry, local to this process."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, CacheEntry]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, entry)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+
+def _load_backend() -> CacheBackend:
+    spec = os.getenv("CACHE_BACKEND", "")
+    if not spec:
+        return MemoryBackend()
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)()
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: float = CACHE_TTL) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.generation = 0
+
+    @staticmethod
+    def query_key(request: Request) -> str:
+        """Order-insensitive form of the query string for use in keys."""
+        items = sorted(request.query_params.multi_items())
+        return "&".join(f"{k}={v}" for k, v in items)
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+        return "*" in tags or etag in tags
+
+    def _respond(self, request: Request, entry: CacheEntry) -> Response:
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+        if self._not_modified(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type=entry.media_type, headers=headers)
+
+    async def serve(
+        self,
+        request: Request,
+        response: Response,
+        key: str,
+        build: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """Return the cached body for ``key`` or build, store and return it.
+
+        Headers that ``build`` sets on the injected ``response`` (such as the
+        pagination cursor) are stored alongside the body.
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            generation = self.generation
+            payload = await build()
+            body = dumps(payload)
+            headers = {
+                k: v for k, v in response.headers.items() if k != "content-length"
+            }
+            entry = CacheEntry(body=body, etag=self._etag(body), headers=headers)
+            if generation == self.generation:
+                self.store(key, entry)
+        return self._respond(request, entry)
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        return self.backend.get(key) if self.ttl > 0 else None
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        if self.ttl > 0:
+            self.backend.set(key, entry, self.ttl)
+
+    def respond(self, request: Request, entry: CacheEntry) -> Response:
+        """Serve a stored entry, answering ``If-None-Match`` with ``304``."""
+        return self._respond(request, entry)
+
+    # ── Invalidation ────────────────────────────────────────────────────────
+
+    def invalidate_customers(self) -> None:
+        self.generation += 1
+        self.backend.delete_prefix("customers:")
+
+    def invalidate_items(self) -> None:
+        self.generation += 1
+        self.backend.delete_prefix("items:")
+
+    def invalidate_estimate(self, estimate_id: int, number: str) -> None:
+        """Drop one estimate (both lookup keys), its receipts and every list."""
+        self.invalidate_estimates([(estimate_id, number)])
+
+    def invalidate_estimates(
+        self, estimates: Iterable[tuple[int, str]]
+    ) -> None:
+        """``invalidate_estimate`` for many (id, number) pairs at once."""
+        self.generation += 1
+        for estimate_id, number in estimates:
+            self.backend.delete(
+                f"estimates:get:{estimate_id}", f"estimates:get:{number}"
+            )
+            self.backend.delete_prefix(f"receipts:{estimate_id}:")
+        self.invalidate_estimate_lists()
+
+    def invalidate_estimate_lists(self) -> None:
+        self.generation += 1
+        self.backend.delete_prefix("estimates:list:")
+
+
+response_cache = ResponseCache(_load_backend())
@@ -0,0 +1,279 @@
+"""
+Synthetic data generator for performance work.
+
+Produces N customers, M catalog items and K estimates with realistic
+shapes. Customer activity is skewed, so a few customers own many
+estimates. Line counts have a long tail (mean 3.5, up to 50).
+Quantities are mostly small. Item prices are log-normal. Most lines come
+from the catalog and the rest are custom. Dates are spread over the last
+``days`` days.
+
+Rows are written with multi-row ``INSERT``s in batches of ``batch_size``
+estimates, each batch in its own transaction. Estimate numbers are taken
+from the regular allocator's counter, and the stats table and counter are
+brought up to date at the end. Output is deterministic for a given seed.
+
+    python -m app.datagen --scale 100k
+    python -m app.datagen --customers 500 --items 100 --estimates 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import Callable, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.models.customer import CustomerModel
+from app.models.estimate import EstimateModel, LineItemModel
+from app.models.item import ItemModel
+from app.numbering import reserve_numbers, sync_number_counter
+from app.stats import rebuild_estimate_stats
+
+BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Scale:
+    customers: int
+    items: int
+    estimates: int
+
+
+SCALES = {
+    "1k": Scale(customers=200, items=100, estimates=1_000),
+    "100k": Scale(customers=5_000, items=1_000, estimates=100_000),
+    "1m": Scale(customers=50_000, items=5_000, estimates=1_000_000),
+}
+
+FIRST_NAMES = (
+    "Amal Kamal Nimal Sunil Shenali Yomal Dilini Kasun Tharindu Ishara Nadeesha "
+    "Ruwan Chamari Saman Hiruni Lahiru Sanduni Pradeep Malsha Dinesh"
+).split()
+LAST_NAMES = (
+    "Perera Silva Fernando Pathirana Jayasinghe Bandara Wickramasinghe Dissanayake "
+    "Gunawardena Herath Rajapaksa Weerasinghe Senanayake Karunaratne Abeysekara"
+).split()
+ITEM_ADJECTIVES = (
+    "Compact Deluxe Standard Premium Wireless Ergonomic Heavy-duty Portable "
+    "Refurbished Smart"
+).split()
+ITEM_NOUNS = (
+    "Laptop Monitor Desk Chair Printer Router Pen Notebook Cable Headset Keyboard "
+    "Mouse Webcam Speaker Projector Whiteboard Locker Lamp Shelf Scanner"
+).split()
+STATUSES = ("Draft", "Saved", "Sent", "Approved")
+STATUS_WEIGHTS = (35, 25, 25, 15)
+QUANTITIES = (1, 1, 1, 1, 2, 2, 3, 4, 5, 10, 20, 50)
+
+
+def _price(rng: random.Random) -> Decimal:
+    return Decimal(str(round(min(rng.lognormvariate(3.5, 1.2), 20_000), 2)))
+
+
+def _line_count(rng: random.Random) -> int:
+    return 1 + min(int(rng.expovariate(1 / 3)), 49)
+
+
+def _insert_customers(conn, rng: random.Random, count: int) -> list[int]:
+    rows = []
+    for n in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append(
+            {
+                "name": f"{first} {last} {n}",
+                "email": f"{first}.{last}{n}@example.com".lower(),
+                "phone": f"07{rng.randrange(10**8):08d}",
+                "first_name": first,
+                "last_name": last,
+            }
+        )
+    table = CustomerModel.__table__
+    result = conn.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+    )
+    return list(result.scalars())
+
+
+def _insert_items(conn, rng: random.Random, count: int) -> list[dict]:
+    rows = []
+    for n in range(count):
+        noun = rng.choice(ITEM_NOUNS)
+        rows.append(
+            {
+                "name": f"{rng.choice(ITEM_ADJECTIVES)} {noun} {n}",
+                "description": f"{noun} model {rng.randrange(100, 999)}",
+                "price": _price(rng),
+            }
+        )
+    table = ItemModel.__table__
+    result = conn.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+    )
+    for row, item_id in zip(rows, result.scalars()):
+        row["id"] = item_id
+    return rows
+
+
+def _estimate_batch(
+    conn,
+    rng: random.Random,
+    count: int,
+    pick_customer: Callable[[], int],
+    items: list[dict],
+    days: int,
+) -> None:
+    numbers = reserve_numbers(conn, count)
+    today = date.today()
+    estimates, lines = [], []
+    for number in numbers:
+        est_lines = []
+        for _ in range(_line_count(rng)):
+            if items and rng.random() < 0.85:
+                item = rng.choice(items)
+                line = {
+                    "item_id": item["id"],
+                    "name": item["name"],
+                    "description": item["description"],
+                    "price": item["price"],
+                }
+            else:
+                line = {
+                    "item_id": None,
+                    "name": f"Custom {rng.choice(ITEM_NOUNS).lower()} work",
+                    "description": "",
+                    "price": _price(rng),
+                }
+            line["quantity"] = rng.choice(QUANTITIES)
+            est_lines.append(line)
+        status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+        day = today - timedelta(days=rng.randrange(days))
+        estimates.append(
+            {
+                "number": str(number),
+                "date": day,
+                "valid_until": day + timedelta(days=30),
+                "status": status,
+                "type": "draft" if status == "Draft" else "active",
+                "customer_id": pick_customer(),
+                "notes": "",
+                "total": sum(li["price"] * li["quantity"] for li in est_lines),
+                "line_count": len(est_lines),
+            }
+        )
+        lines.append(est_lines)
+
+    table = EstimateModel.__table__
+    result = conn.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), estimates
+    )
+    line_rows = [
+        {**line, "estimate_id": estimate_id}
+        for estimate_id, est_lines in zip(result.scalars(), lines)
+        for line in est_lines
+    ]
+    conn.execute(insert(LineItemModel.__table__), line_rows)
+
+
+def generate(
+    engine: Engine,
+    customers: int,
+    items: int,
+    estimates: int,
+    seed: int = 0,
+    days: int = 730,
+    batch_size: int = BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> None:
+    """Insert the requested number of rows on top of whatever exists."""
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        sync_number_counter(conn)
+        customer_ids = _insert_customers(conn, rng, customers)
+        catalog = _insert_items(conn, rng, items)
+    if not customer_ids:
+        with engine.connect() as conn:
+            customer_ids = list(conn.scalars(select(CustomerModel.id)))
+
+    # Zipf-like activity: the customer at rank r gets weight 1 / r^0.8.
+    cumulative = list(accumulate(1 / (r + 1) ** 0.8 for r in range(len(customer_ids))))
+
+    def pick_customer() -> Optional[int]:
+        if not customer_ids:
+            return None
+        return rng.choices(customer_ids, cum_weights=cumulative)[0]
+
+    done = 0
+    while done < estimates:
+        count = min(batch_size, estimates - done)
+        with engine.begin() as conn:
+            _estimate_batch(conn, rng, count, pick_customer, catalog, days)
+        done += count
+        if progress:
+            progress(done, estimates)
+
+    with engine.begin() as conn:
+        rebuild_estimate_stats(conn)
+        sync_number_counter(conn)
+
+
+def estimate_count(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(EstimateModel.__table__))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scale", choices=sorted(SCALES), help="Preset sizes")
+    parser.add_argument("--customers", type=int, default=0)
+    parser.add_argument("--items", type=int, default=0)
+    parser.add_argument("--estimates", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=730, help="Date spread")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    scale = SCALES[args.scale] if args.scale else Scale(0, 0, 0)
+    sizes = Scale(
+        customers=args.customers or scale.customers,
+        items=args.items or scale.items,
+        estimates=args.estimates or scale.estimates,
+    )
+
+    from app.database import engine
+    from app.manage import migrate
+
+    migrate()
+
+    start = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        rate = done / (time.perf_counter() - start)
+        print(f"  {done:>9,} / {total:,} estimates ({rate:,.0f}/s)", flush=True)
+
+    print(
+        f"Generating {sizes.customers:,} customers, {sizes.items:,} items, "
+        f"{sizes.estimates:,} estimates (seed {args.seed})"
+    )
+    generate(
+        engine,
+        sizes.customers,
+        sizes.items,
+        sizes.estimates,
+        seed=args.seed,
+        days=args.days,
+        batch_size=args.batch_size,
+        progress=progress,
+    )
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Change feed for estimates, streamed to clients as Server-Sent Events.
+
+Write handlers publish one event per estimate they change, after the
+transaction commits:
+
+* ``estimate.created`` / ``estimate.updated``: ``data`` is the full estimate,
+  as ``GET /api/estimates/{id}`` returns it,
+* ``estimate.status``: ``{id, number, status, type, version}`` (batch status
+  changes, which don't load the whole estimate),
+* ``estimate.deleted`` / ``estimate.archived``: ``{id, number}``,
+* ``estimates.imported``: ``{created}`` after a bulk import. Clients refetch.
+
+``GET /api/estimates/events`` streams them. Every event has an id. A client
+that reconnects with ``Last-Event-ID`` (``EventSource`` does this on its
+own) gets the events it missed replayed from a bounded buffer
+(``EVENTS_BUFFER_SIZE`` events, default 1000). When the id is older than the
+buffer, or comes from another stream (say, before a restart), the client
+gets a single ``reset`` event instead and should refetch what it shows.
+
+The default backend keeps the buffer in this process, so a worker only sees
+its own writes. With several workers, point ``EVENTS_BACKEND`` at a
+``module:factory`` returning a shared ``EventBackend``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import itertools
+import os
+import signal
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from app.responses import dumps
+
+EVENTS_BUFFER_SIZE = max(1, int(os.getenv("EVENTS_BUFFER_SIZE", "1000")))
+# Comment line sent on an idle stream, so proxies keep it open.
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+# Streams end after this long; EventSource reconnects and resumes.
+EVENTS_STREAM_TIMEOUT = float(os.getenv("EVENTS_STREAM_TIMEOUT", "300"))
+EVENTS_RETRY_MS = 3000
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    type: str
+    data: Any
+
+    def encode(self) -> bytes:
+        return (
+            f"id: {self.id}\nevent: {self.type}\ndata: ".encode()
+            + dumps(self.data)
+            + b"\n\n"
+        )
+
+
+class EventGap(Exception):
+    """The requested position is no longer (or was never) in the buffer."""
+
+
+class EventBackend:
+    """Storage interface; implement this to share the feed across workers."""
+
+    async def append(self, events: list[tuple[str, Any]]) -> list[Event]:
+        """Store (type, data) pairs in order and return them with their ids."""
+        raise NotImplementedError
+
+    async def latest_id(self) -> str:
+        """The id a client that has seen everything so far would send."""
+        raise NotImplementedError
+
+    async def read(self, after: str, timeout: float) -> list[Event]:
+        """Events after ``after``, waiting up to ``timeout`` for the next one.
+
+        Raises ``EventGap`` when ``after`` is older than the buffer.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Wake every waiting reader; later reads return at once."""
+
+
+class MemoryBackend(EventBackend):
+    """Bounded ring buffer local to this process.
+
+    Ids are ``<stream>-<seq>``. The stream part changes on every start, so
+    an id from before a restart is recognised as a gap.
+    """
+
+    def __init__(self, max_events: int = EVENTS_BUFFER_SIZE) -> None:
+        self.stream = f"{time.time_ns() // 1_000_000:x}"
+        self._events: deque[tuple[int, Event]] = deque(maxlen=max_events)
+        self._seq = itertools.count(1)
+        self._last = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closed = False
+
+    def _id(self, seq: int) -> str:
+        return f"{self.stream}-{seq}"
+
+    def _position(self, event_id: str) -> int:
+        stream, _, seq = event_id.rpartition("-")
+        valid = seq.isascii() and seq.isdecimal()
+        if stream != self.stream or not valid or int(seq) > self._last:
+            raise EventGap(event_id)
+        position = int(seq)
+        oldest = self._events[0][0] if self._events else self._last + 1
+        if position < oldest - 1:
+            raise EventGap(event_id)
+        return position
+
+    async def append(self, events: list[tuple[str, Any]]) -> list[Event]:
+        stored = []
+        for kind, data in events:
+            seq = next(self._seq)
+            event = Event(self._id(seq), kind, data)
+            self._events.append((seq, event))
+            stored.append(event)
+            self._last = seq
+        if stored and self._wakeup is not None:
+            self._wakeup.set()
+            self._wakeup = None
+        return stored
+
+    async def latest_id(self) -> str:
+        return self._id(self._last)
+
+    async def read(self, after: str, timeout: float) -> list[Event]:
+        position = self._position(after)
+        if position == self._last:
+            if timeout <= 0 or self._closed:
+                return []
+            if self._wakeup is None:
+                self._wakeup = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+            position = self._position(after)
+        # The buffer is in seq order: skip what the reader already has.
+        start = len(self._events) - (self._last - position)
+        return [event for _, event in itertools.islice(self._events, start, None)]
+
+    def close(self) -> None:
+        self._closed = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+            self._wakeup = None
+
+
+def _load_backend() -> EventBackend:
+    spec = os.getenv("EVENTS_BACKEND", "")
+    if not spec:
+        return MemoryBackend()
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)()
+
+
+def _comment(text: str) -> bytes:
+    return f": {text}\n\n".encode()
+
+
+class EventBus:
+    def __init__(self, backend: EventBackend) -> None:
+        self.backend = backend
+        self._closed = False
+
+    async def stream(
+        self,
+        last_event_id: Optional[str],
+        heartbeat: float = EVENTS_HEARTBEAT,
+        timeout: float = EVENTS_STREAM_TIMEOUT,
+    ) -> AsyncIterator[bytes]:
+        """SSE body: ``ready`` (or ``reset``), then events as they come.
+
+        Without ``last_event_id`` the stream starts at the current position.
+        ``ready`` carries that position as its id so a reconnect resumes from
+        it even if nothing happened in between.
+        """
+        yield f"retry: {EVENTS_RETRY_MS}\n\n".encode()
+        cursor = last_event_id
+        if cursor:
+            try:
+                pending = await self.backend.read(cursor, 0)
+            except EventGap:
+                cursor = await self.backend.latest_id()
+                pending = []
+                yield Event(cursor, "reset", {"id": cursor}).encode()
+        if not cursor:
+            cursor = await self.backend.latest_id()
+            pending = []
+            yield Event(cursor, "ready", {"id": cursor}).encode()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            for event in pending:
+                yield event.encode()
+                cursor = event.id
+            remaining = deadline - time.monotonic()
+            if self._closed or remaining <= 0:
+                return
+            try:
+                pending = await self.backend.read(cursor, min(heartbeat, remaining))
+            except EventGap:
+                # Fell behind the buffer while the client was slow to read.
+                cursor = await self.backend.latest_id()
+                pending = []
+                yield Event(cursor, "reset", {"id": cursor}).encode()
+                continue
+            if not pending:
+                yield _comment("keep-alive")
+
+    def close(self) -> None:
+        """End open streams (at shutdown) so workers can exit."""
+        self._closed = True
+        self.backend.close()
+
+    # ── Publishing ──────────────────────────────────────────────────────────
+
+    async def publish(self, kind: str, data: Any) -> None:
+        await self.backend.append([(kind, data)])
+
+    async def estimate_created(self, row: dict) -> None:
+        await self.publish("estimate.created", row)
+
+    async def estimate_updated(self, row: dict) -> None:
+        await self.publish("estimate.updated", row)
+
+    async def estimates_status(self, changes: Iterable[dict]) -> None:
+        events = [("estimate.status", change) for change in changes]
+        if events:
+            await self.backend.append(events)
+
+    async def _removed(self, kind: str, estimates: Iterable[tuple[int, str]]) -> None:
+        events = [(kind, {"id": i, "number": n}) for i, n in estimates]
+        if events:
+            await self.backend.append(events)
+
+    async def estimates_deleted(self, estimates: Iterable[tuple[int, str]]) -> None:
+        await self._removed("estimate.deleted", estimates)
+
+    async def estimates_archived(self, estimates: Iterable[tuple[int, str]]) -> None:
+        await self._removed("estimate.archived", estimates)
+
+    async def estimates_imported(self, created: int) -> None:
+        await self.publish("estimates.imported", {"created": created})
+
+
+estimate_events = EventBus(_load_backend())
+
+
+def end_streams_on_exit() -> None:
+    """Close the bus as soon as the server is told to exit.
+
+    uvicorn waits for open responses to finish before it runs the lifespan
+    shutdown, and an event stream only ends on its own after
+    ``EVENTS_STREAM_TIMEOUT``. Chaining its SIGINT/SIGTERM handlers lets
+    reloads and deploys proceed at once. Call from the lifespan startup.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(estimate_events.close)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
@@ -0,0 +1,61 @@
+"""
+Administrative commands.
+
+Schema changes and seeding run here, once per deploy, rather than in every
+worker's startup:
+
+    python -m app.manage migrate    # create missing tables, upgrade in place
+    python -m app.manage seed       # sample data, only into an empty database
+    python -m app.manage init       # migrate, then seed (first-time setup)
+
+Workers can still do both at boot with ``AUTO_MIGRATE=1`` and
+``SEED_DATABASE=1`` (see ``app.startup``), which is handy for a
+single-process dev server.
+"""
+
+import argparse
+import time
+from typing import Optional
+
+from app.database import Base, SessionLocal, engine
+
+
+def migrate() -> None:
+    """Create missing tables, then apply the in-place upgrades."""
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+    from app.migrations import run_migrations
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+def seed() -> None:
+    from app.seed import seed_database
+
+    db = SessionLocal()
+    try:
+        seed_database(db)
+    finally:
+        db.close()
+
+
+COMMANDS = {
+    "migrate": (migrate,),
+    "seed": (seed,),
+    "init": (migrate, seed),
+}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+
+    for step in COMMANDS[args.command]:
+        start = time.perf_counter()
+        step()
+        print(f"{step.__name__}: done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Request and query instrumentation, exposed in Prometheus text format.
+
+``TimingMiddleware`` times every HTTP request and files it under its route
+template (``/api/estimates/{estimate_id}``, not the concrete URL), so the
+label set stays bounded. ``instrument_engine`` hooks SQLAlchemy's cursor
+events. Each statement is timed, counted against the request that issued
+it (tracked in a context variable, which SQLAlchemy's async greenlets
+share with the calling task), and logged with its parameters to the
+``app.slow_query`` logger when it takes longer than ``SLOW_QUERY_MS``
+(default 200; 0 disables the log).
+
+Every response carries a ``Server-Timing`` header (``app``, plus ``db``
+with the query count), so browser devtools show the split per request.
+``render_metrics`` produces the ``/metrics`` body. Metrics are per worker
+process, as Prometheus expects when it scrapes each worker.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: dict[tuple, list] = defaultdict(
+            lambda: [[0] * len(buckets), 0, 0.0]
+        )
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        with self._lock:
+            counts, _, _ = series = self._series[label_values]
+            index = bisect_left(self.buckets, value)
+            if index < len(counts):
+                counts[index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for label_values, (counts, count, total) in sorted(series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _labels(self.labels + ("le",), label_values + (bound,))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _labels(self.labels + ("le",), label_values + ("+Inf",))
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_count{labels} {count}")
+            lines.append(f"{self.name}_sum{labels} {total}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self) -> None:
+        with self._lock:
+            self.value += 1
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self.value}",
+        ]
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        pairs.append(f'{name}="{text}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    "http_request_db_queries",
+    "Database statements issued per HTTP request.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+request_db_time = Histogram(
+    "http_request_db_seconds",
+    "Time spent in database statements per HTTP request.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Duration of individual database statements.",
+    (),
+    LATENCY_BUCKETS,
+)
+slow_queries = Counter(
+    "db_slow_queries_total", "Statements slower than SLOW_QUERY_MS."
+)
+
+
+# ── Query hooks ─────────────────────────────────────────────────────────────
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time, count and slow-log every statement run on ``engine``.
+
+    Pass ``async_engine.sync_engine`` for an async engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        query_duration.observe((), elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            slow_queries.inc()
+            slow_query_logger.warning(
+                "slow query (%.1f ms): %s; parameters=%.1000r",
+                elapsed * 1000,
+                " ".join(statement.split()),
+                parameters,
+            )
+
+
+# ── Request timing ──────────────────────────────────────────────────────────
+
+
+class TimingMiddleware:
+    """ASGI middleware that records latency and per-request DB usage."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'app;dur={elapsed:.1f}, db;dur={stats.db_time * 1000:.1f};'
+                    f'desc="{stats.queries} queries"'
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # The router writes the matched route into the shared scope.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            request_duration.observe(
+                (method, route, str(status)), time.perf_counter() - start
+            )
+            request_queries.observe((method, route), stats.queries)
+            request_db_time.observe((method, route), stats.db_time)
+
+
+def render_metrics(extra: Optional[list[str]] = None) -> str:
+    lines: list[str] = []
+    for metric in (
+        request_duration,
+        request_queries,
+        request_db_time,
+        query_duration,
+        slow_queries,
+    ):
+        lines += metric.render()
+    lines += extra or []
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,213 @@
+"""
+Idempotent schema upgrades for databases created by older versions.
+
+``Base.metadata.create_all`` only creates missing tables – it never adds
+columns or indexes to tables that already exist. Each step below inspects the
+live schema and only changes what is missing, so running them repeatedly is
+safe.
+"""
+
+from sqlalchemy import Date, Float, Numeric, func, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from app.database import Base
+from app.models.archive import ArchivedEstimateModel, ArchivedLineItemModel
+from app.models.estimate import EstimateModel, LineItemModel
+from app.numbering import sync_number_counter
+from app.search import ensure_search_indexes
+from app.stats import rebuild_estimate_stats, stats_stale
+
+
+def _add_missing_columns(conn: Connection) -> list[str]:
+    """``ALTER TABLE ... ADD COLUMN`` for model columns absent in the DB.
+
+    Returns the ``table.column`` names that were added so data steps can
+    decide whether a backfill is needed.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            ddl_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(
+                text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl_type}")
+            )
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _convert_column_types(conn: Connection) -> None:
+    """Convert date and money columns from text / float to Date / Numeric.
+
+    PostgreSQL converts in place with ``ALTER COLUMN ... TYPE ... USING``,
+    turning empty strings into NULL and rounding money to the column scale.
+    SQLite cannot change a declared column type, and it does not need to:
+    SQLAlchemy reads ISO date text as ``date`` and REAL as ``Decimal``. Only
+    the data is normalized there, and only rows that need it are touched.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    postgres = conn.dialect.name == "postgresql"
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        reflected = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if not isinstance(column.type, (Date, Numeric)):
+                continue
+            if column.name not in reflected:
+                continue
+            name = conn.dialect.identifier_preparer.quote(column.name)
+            ddl_type = column.type.compile(dialect=conn.dialect)
+            if isinstance(column.type, Date):
+                if postgres and not isinstance(reflected[column.name], Date):
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {table.name} ALTER COLUMN {name} "
+                            f"TYPE {ddl_type} USING NULLIF({name}, '')::date"
+                        )
+                    )
+                elif not postgres and column.nullable:
+                    conn.execute(
+                        text(f"UPDATE {table.name} SET {name} = NULL WHERE {name} = ''")
+                    )
+            else:
+                scale = column.type.scale
+                # Float subclasses Numeric, so check for it explicitly.
+                current = reflected[column.name]
+                is_float = isinstance(current, Float) or not isinstance(
+                    current, Numeric
+                )
+                if postgres and is_float:
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {table.name} ALTER COLUMN {name} "
+                            f"TYPE {ddl_type} USING round({name}::numeric, {scale})"
+                        )
+                    )
+                elif not postgres:
+                    conn.execute(
+                        text(
+                            f"UPDATE {table.name} SET {name} = round({name}, {scale}) "
+                            f"WHERE {name} <> round({name}, {scale})"
+                        )
+                    )
+
+
+def _rebuild_with_autoincrement(conn: Connection) -> None:
+    """Recreate ``estimates`` / ``line_items`` as ``AUTOINCREMENT`` on SQLite.
+
+    Without it SQLite reuses the largest id once that row is gone (archived
+    or deleted), and a new estimate would collide with its archived copy.
+    The table can't be altered in place, so it is rebuilt the documented
+    way: create, copy, drop, rename, then put its indexes and triggers
+    back. The new sequence starts past every id already in the archive.
+    PostgreSQL sequences never go back, so nothing is needed there.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    for model, archive in (
+        (EstimateModel, ArchivedEstimateModel),
+        (LineItemModel, ArchivedLineItemModel),
+    ):
+        table = model.__table__
+        ddl = conn.scalar(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :t"),
+            {"t": table.name},
+        )
+        if ddl is None or "AUTOINCREMENT" in ddl.upper():
+            continue
+        dependents = conn.scalars(
+            text(
+                "SELECT sql FROM sqlite_master WHERE tbl_name = :t "
+                "AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+            ),
+            {"t": table.name},
+        ).all()
+        new = f"{table.name}_rebuild"
+        create = str(CreateTable(table).compile(dialect=conn.dialect))
+        conn.execute(
+            text(create.replace(f"TABLE {table.name} ", f"TABLE {new} ", 1))
+        )
+        columns = ", ".join(c.name for c in table.columns)
+        conn.execute(
+            text(f"INSERT INTO {new} ({columns}) SELECT {columns} FROM {table.name}")
+        )
+        conn.execute(text(f"DROP TABLE {table.name}"))
+        conn.execute(text(f"ALTER TABLE {new} RENAME TO {table.name}"))
+        for sql in dependents:
+            conn.execute(text(sql))
+
+        floor = conn.scalar(select(func.max(archive.id))) or 0
+        updated = conn.execute(
+            text("UPDATE sqlite_sequence SET seq = max(seq, :floor) WHERE name = :t"),
+            {"floor": floor, "t": table.name},
+        )
+        if updated.rowcount == 0:
+            conn.execute(
+                text("INSERT INTO sqlite_sequence (name, seq) VALUES (:t, :floor)"),
+                {"floor": floor, "t": table.name},
+            )
+
+
+# Tables earlier versions created that nothing reads any more.
+RETIRED_TABLES = [
+    "estimate_stats",  # replaced by estimate_daily_stats
+]
+
+
+def _drop_retired_tables(conn: Connection) -> None:
+    for name in RETIRED_TABLES:
+        conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+def backfill_estimate_totals(conn: Connection) -> None:
+    """Recompute ``estimates.total`` / ``line_count`` from line items.
+
+    One set-based UPDATE with correlated subqueries, so it runs inside the
+    database regardless of table size.
+    """
+    lines = LineItemModel.__table__
+    estimates = EstimateModel.__table__
+    total = (
+        select(func.coalesce(func.sum(lines.c.price * lines.c.quantity), 0.0))
+        .where(lines.c.estimate_id == estimates.c.id)
+        .scalar_subquery()
+    )
+    count = (
+        select(func.count(lines.c.id))
+        .where(lines.c.estimate_id == estimates.c.id)
+        .scalar_subquery()
+    )
+    conn.execute(update(estimates).values(total=total, line_count=count))
+
+
+def run_migrations(engine: Engine) -> None:
+    """Bring an existing database up to the current model definitions."""
+    with engine.begin() as conn:
+        added = _add_missing_columns(conn)
+        _convert_column_types(conn)
+        _create_missing_indexes(conn)
+        if "estimates.total" in added or "estimates.line_count" in added:
+            backfill_estimate_totals(conn)
+        if "estimates.version" in added:
+            conn.execute(update(EstimateModel.__table__).values(version=1))
+        _rebuild_with_autoincrement(conn)
+        _drop_retired_tables(conn)
+        if stats_stale(conn):
+            rebuild_estimate_stats(conn)
+        ensure_search_indexes(conn)
+        sync_number_counter(conn)
@@ -1,5 +1,15 @@
 from app.models.customer import CustomerModel
 from app.models.item import ItemModel
 from app.models.estimate import EstimateModel, LineItemModel
+from app.models.stats import EstimateStatsModel
+from app.models.archive import ArchivedEstimateModel, ArchivedLineItemModel
 
-__all__ = ["CustomerModel", "ItemModel", "EstimateModel", "LineItemModel"]
+__all__ = [
+    "CustomerModel",
+    "ItemModel",
+    "EstimateModel",
+    "LineItemModel",
+    "EstimateStatsModel",
+    "ArchivedEstimateModel",
+    "ArchivedLineItemModel",
+]
@@ -0,0 +1,58 @@
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+)
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+
+class ArchivedEstimateModel(Base):
+    """Cold copy of an expired estimate, moved here by ``app.archive``.
+
+    Same columns (and ids) as ``estimates`` plus ``archived_at``, and the
+    same relationship names, so queries and serializers written against
+    ``EstimateModel`` work on either table.
+    """
+
+    __tablename__ = "estimates_archive"
+    __table_args__ = (
+        Index("ix_estimates_archive_date_id", "date", "id"),
+        Index("ix_estimates_archive_customer_date", "customer_id", "date", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    number = Column(String, unique=True, nullable=False, index=True)
+    date = Column(Date, nullable=False)
+    valid_until = Column(Date, nullable=True)
+    status = Column(String)
+    type = Column(String)
+    notes = Column(String)
+    total = Column(Numeric(12, 2))
+    line_count = Column(Integer)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
+    version = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+
+    customer_rel = relationship("CustomerModel")
+    line_items = relationship("ArchivedLineItemModel", cascade="all, delete-orphan")
+
+
+class ArchivedLineItemModel(Base):
+    __tablename__ = "line_items_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    estimate_id = Column(
+        Integer, ForeignKey("estimates_archive.id"), nullable=False, index=True
+    )
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=True)
+    name = Column(String, nullable=False)
+    description = Column(String)
+    quantity = Column(Integer)
+    price = Column(Numeric(12, 2))
@@ -8,7 +8,7 @@ class CustomerModel(Base):
     __tablename__ = "customers"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     email = Column(String, default="")
     phone = Column(String, default="")
     first_name = Column(String, default="")
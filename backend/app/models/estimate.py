@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -6,15 +6,33 @@ from app.database import Base
 
 class EstimateModel(Base):
     __tablename__ = "estimates"
+    # Composite indexes match the list filters combined with the default
+    # date ordering (and the id tie-breaker used by keyset pagination).
+    __table_args__ = (
+        Index("ix_estimates_date_id", "date", "id"),
+        Index("ix_estimates_total_id", "total", "id"),
+        Index("ix_estimates_status_date", "status", "date", "id"),
+        Index("ix_estimates_type_date", "type", "date", "id"),
+        Index("ix_estimates_customer_date", "customer_id", "date", "id"),
+        # Archival picks the longest-expired estimates first (app.archive).
+        Index("ix_estimates_valid_until_id", "valid_until", "id"),
+        # Never hand out an id again on SQLite: archived rows keep theirs.
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     number = Column(String, unique=True, nullable=False, index=True)
-    date = Column(String, nullable=False)
-    valid_until = Column(String, default="")
+    date = Column(Date, nullable=False)
+    valid_until = Column(Date, nullable=True)
     status = Column(String, default="Draft")
     type = Column(String, default="draft")
     notes = Column(String, default="")
 
+    # Denormalized from line_items so lists can show, sort and filter by
+    # amount without loading every line. Kept in sync by the estimate router.
+    total = Column(Numeric(12, 2), default=0)
+    line_count = Column(Integer, default=0)
+
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
     customer_rel = relationship("CustomerModel", back_populates="estimates")
 
@@ -22,16 +40,25 @@ class EstimateModel(Base):
         "LineItemModel", back_populates="estimate", cascade="all, delete-orphan"
     )
 
+    # Optimistic concurrency: every ORM UPDATE/DELETE of an estimate matches
+    # on the version it loaded and bumps it, so a writer holding a stale copy
+    # fails with StaleDataError instead of overwriting someone else's change.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+
 
 class LineItemModel(Base):
     __tablename__ = "line_items"
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    estimate_id = Column(Integer, ForeignKey("estimates.id"), nullable=False)
+    estimate_id = Column(
+        Integer, ForeignKey("estimates.id"), nullable=False, index=True
+    )
     item_id = Column(Integer, ForeignKey("items.id"), nullable=True)
     name = Column(String, nullable=False)
     description = Column(String, default="")
     quantity = Column(Integer, default=1)
-    price = Column(Float, default=0.0)
+    price = Column(Numeric(12, 2), default=0)
 
     estimate = relationship("EstimateModel", back_populates="line_items")
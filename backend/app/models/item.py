@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, Integer, Numeric, String
 
 from app.database import Base
 
@@ -7,6 +7,6 @@ class ItemModel(Base):
     __tablename__ = "items"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     description = Column(String, default="")
-    price = Column(Float, default=0.0)
+    price = Column(Numeric(12, 2), default=0)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Date, Integer, Numeric, String, UniqueConstraint
+
+from app.database import Base
+
+
+class EstimateStatsModel(Base):
+    """Per-day estimate counts and totals, maintained by the estimate writes.
+
+    One row per (dimension, date, key) for each of the ``status``, ``type``
+    and ``customer`` dimensions. ``key`` is the status, the type or the
+    customer id, with "0" standing for "no customer". Every estimate is
+    counted once in each dimension.
+    """
+
+    __tablename__ = "estimate_daily_stats"
+    __table_args__ = (
+        # Also the index behind the date range scans in app.stats.load_stats.
+        UniqueConstraint(
+            "dimension", "date", "key", name="uq_estimate_daily_stats_bucket"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dimension = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    key = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
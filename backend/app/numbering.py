@@ -0,0 +1,171 @@
+"""
+Estimate number allocation.
+
+Numbers come from a database counter that is advanced atomically in its own
+short transaction, so concurrent creates (in any number of workers) never
+receive the same number:
+
+* PostgreSQL: the ``estimate_number_seq`` sequence (``nextval`` never
+  blocks and never hands out a value twice);
+* SQLite: a row in ``number_counters`` bumped with
+  ``UPDATE ... RETURNING``, which runs under SQLite's single-writer lock.
+
+Each process may reserve ``NUMBER_BLOCK_SIZE`` numbers per round trip
+(default 1, i.e. no pre-allocation) and hand them out from memory. Larger
+blocks save a round trip per create at the cost of gaps when a process
+exits, and numbers from different workers interleave rather than strictly
+following creation order.
+
+``sync_number_counter`` raises the counter past the largest numeric number
+already stored. It runs with the schema migrations and after seeding.
+``advance_numbers_past`` does the same for the explicit numbers given to a
+create or an import, before they are inserted, so the counter never
+hands them out again.
+"""
+
+import asyncio
+import os
+import re
+from collections import deque
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.database import async_engine
+
+FIRST_NUMBER = 45303
+NUMBER_BLOCK_SIZE = max(1, int(os.getenv("NUMBER_BLOCK_SIZE", "1")))
+
+SEQUENCE = "estimate_number_seq"
+COUNTER_NAME = "estimates"
+
+# Numbers the counter could produce; longer ones don't fit in a BIGINT.
+_NUMERIC = re.compile(r"[0-9]{1,18}")
+
+
+def max_numeric_number(conn: Connection) -> int:
+    """Largest all-digit estimate number, compared numerically."""
+    if conn.dialect.name == "postgresql":
+        sql = (
+            "SELECT max(CAST(number AS BIGINT)) FROM estimates "
+            "WHERE number ~ '^[0-9]{1,18}$'"
+        )
+    else:
+        sql = (
+            "SELECT max(CAST(number AS INTEGER)) FROM estimates "
+            "WHERE number <> '' AND number NOT GLOB '*[^0-9]*' "
+            "AND length(number) <= 18"
+        )
+    return conn.execute(text(sql)).scalar() or 0
+
+
+def sync_number_counter(conn: Connection) -> None:
+    """Create the counter if needed and move it past every stored number.
+
+    Idempotent, and it never moves the counter backwards.
+    """
+    floor = max(FIRST_NUMBER, max_numeric_number(conn) + 1)
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE} START WITH {floor}")
+        )
+    else:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS number_counters "
+                "(name VARCHAR PRIMARY KEY, next_value INTEGER NOT NULL)"
+            )
+        )
+    raise_counter(conn, floor)
+
+
+def raise_counter(conn: Connection, floor: int) -> None:
+    """Move the counter up to ``floor``; it never moves backwards."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text(
+                f"SELECT setval('{SEQUENCE}', :floor - 1) FROM {SEQUENCE} "
+                "WHERE (CASE WHEN is_called THEN last_value + 1 "
+                "ELSE last_value END) < :floor"
+            ),
+            {"floor": floor},
+        )
+        return
+    conn.execute(
+        text(
+            "INSERT INTO number_counters (name, next_value) VALUES (:name, :floor) "
+            "ON CONFLICT (name) DO UPDATE SET next_value = "
+            "max(next_value, excluded.next_value)"
+        ),
+        {"name": COUNTER_NAME, "floor": floor},
+    )
+
+
+def reserve_numbers(conn: Connection, count: int) -> list[int]:
+    """Atomically take ``count`` fresh numbers from the database counter."""
+    if conn.dialect.name == "postgresql":
+        result = conn.execute(
+            text(f"SELECT nextval('{SEQUENCE}') FROM generate_series(1, :n)"),
+            {"n": count},
+        )
+        return sorted(result.scalars())
+    result = conn.execute(
+        text(
+            "UPDATE number_counters SET next_value = next_value + :n "
+            "WHERE name = :name RETURNING next_value"
+        ),
+        {"n": count, "name": COUNTER_NAME},
+    )
+    end = result.scalar_one()
+    return list(range(end - count, end))
+
+
+async def advance_numbers_past(numbers: Iterable[str]) -> None:
+    """Raise the counter past the largest numeric one of ``numbers``.
+
+    Called with explicitly given numbers before they are inserted, so the
+    next allocated number can't collide with them. Non-numeric numbers
+    never collide with allocated ones and are ignored.
+    """
+    numeric = [int(n) for n in numbers if _NUMERIC.fullmatch(n)]
+    if not numeric:
+        return
+    async with async_engine.begin() as conn:
+        await conn.run_sync(raise_counter, max(numeric) + 1)
+
+
+async def _reserve(count: int) -> list[int]:
+    # A separate, immediately committed transaction: a reservation must
+    # survive the caller rolling back, or another process could be handed
+    # numbers this process still holds.
+    async with async_engine.begin() as conn:
+        return await conn.run_sync(reserve_numbers, count)
+
+
+class NumberAllocator:
+    """Hands out numbers from a per-process block reserved in advance."""
+
+    def __init__(self, block_size: int = NUMBER_BLOCK_SIZE) -> None:
+        self.block_size = block_size
+        self._reserved: deque[int] = deque()
+        self._lock = asyncio.Lock()
+
+    async def allocate(self, count: int = 1) -> list[str]:
+        async with self._lock:
+            missing = count - len(self._reserved)
+            if missing > 0:
+                self._reserved.extend(await _reserve(max(missing, self.block_size)))
+            return [str(self._reserved.popleft()) for _ in range(count)]
+
+
+_allocator = NumberAllocator()
+
+
+async def allocate_numbers(count: int = 1) -> list[str]:
+    """Reserve ``count`` unique estimate numbers.
+
+    Bulk callers ask for a whole block at once so the counter is advanced
+    once per batch rather than once per estimate.
+    """
+    return await _allocator.allocate(count)
@@ -0,0 +1,178 @@
+"""
+Keyset (cursor) pagination helpers shared by the list endpoints.
+
+A page is ordered by one sort column plus the primary key as a tie-breaker,
+and the next page starts strictly after the last row's ``(value, id)`` pair.
+That turns "skip N rows" into an index range scan, so page 500 costs the same
+as page one. Cursors are opaque, URL-safe base64 blobs; clients just echo the
+``X-Next-Cursor`` response header back as ``?cursor=``.
+
+On nullable sort columns NULL sorts above every value: last ascending,
+first descending (PostgreSQL's default, so its indexes still apply). The
+cursor stores NULL as is, and the seek tests ``IS NULL`` explicitly.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, false, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SortKeys = list[tuple[Any, bool]]
+
+
+def parse_sort(sort: str, allowed: dict[str, Any], tiebreaker: Any) -> SortKeys:
+    """Turn ``"name"`` / ``"-date"`` into ``[(column, descending), ...]``.
+
+    The tie-breaker column is appended with the same direction so the order
+    is total and a ``(value, id)`` cursor identifies exactly one position.
+    """
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in allowed:
+        raise HTTPException(
+            400, f"Invalid sort '{sort}'. Allowed: {', '.join(sorted(allowed))}"
+        )
+    column = allowed[key]
+    if column is tiebreaker:
+        return [(tiebreaker, descending)]
+    return [(column, descending), (tiebreaker, descending)]
+
+
+def _plain(value: Any) -> Any:
+    """JSON form of a sort value; ``_typed`` turns it back for the column."""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _typed(column: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    payload = json.dumps(
+        {"s": sort, "v": [_plain(v) for v in values]}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        cursor_sort = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(400, "Cursor does not match the requested sort")
+    return values
+
+
+def _nullable(column: Any) -> bool:
+    return getattr(column, "nullable", True) is not False
+
+
+def _equal(column: Any, value: Any):
+    return column.is_(None) if value is None else column == value
+
+
+def _beyond(column: Any, value: Any, descending: bool):
+    """Rows strictly after ``value`` in this column's order, NULL highest."""
+    if not _nullable(column):
+        return column < value if descending else column > value
+    if value is None:
+        return column.is_not(None) if descending else false()
+    if descending:
+        return column < value
+    return or_(column > value, column.is_(None))
+
+
+def _after(keys: SortKeys, values: list):
+    """Build ``(a, b) > (va, vb)`` as a portable OR-chain.
+
+    Expanded form rather than a row-value comparison so mixed directions and
+    SQLite builds without row-value support both work.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal = [_equal(keys[j][0], values[j]) for j in range(i)]
+        clauses.append(and_(*equal, _beyond(column, values[i], descending)))
+    return or_(*clauses)
+
+
+def _order(column: Any, descending: bool):
+    if not _nullable(column):
+        return column.desc() if descending else column.asc()
+    return column.desc().nulls_first() if descending else column.asc().nulls_last()
+
+
+def keyset_select(
+    stmt: Select, keys: SortKeys, sort: str, cursor: str, limit: Optional[int]
+) -> Select:
+    """Apply the cursor seek, ordering and (``limit + 1``) row limit."""
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        if len(values) != len(keys):
+            raise HTTPException(400, "Invalid cursor")
+        try:
+            values = [_typed(c, v) for (c, _), v in zip(keys, values)]
+        except (ValueError, TypeError, ArithmeticError):
+            raise HTTPException(400, "Invalid cursor")
+        stmt = stmt.where(_after(keys, values))
+
+    stmt = stmt.order_by(*[_order(c, d) for c, d in keys])
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    return stmt
+
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    keys: SortKeys,
+    sort: str,
+    cursor: str,
+    limit: int,
+    response: Response,
+    scalars: bool = True,
+) -> list:
+    """Run a keyset-paginated select and set the next-page cursor header.
+
+    ``scalars`` returns ORM entities for ``select(Model)``; pass ``False``
+    for column selects to get rows. Endpoints default ``limit`` to
+    ``DEFAULT_PAGE_SIZE``; a client that wants everything follows the
+    cursors.
+    """
+    result = await db.execute(keyset_select(stmt, keys, sort, cursor, limit))
+    rows = list(result.scalars() if scalars else result)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            sort, [getattr(last, c.key) for c, _ in keys]
+        )
+    return rows
@@ -0,0 +1,215 @@
+"""
+Server-side estimate receipts (printable HTML).
+
+``templates/receipt.html`` is read and compiled into a ``string.Template``
+once at import, so a render is a single substitution pass with no parsing.
+Rendering takes the plain ``EstimateOut`` dump, which keeps it picklable
+for the batch path's worker processes.
+
+Rendered receipts live in the response cache under
+``receipts:{id}:{content hash}``. The hash covers everything the receipt
+shows, so an edited estimate never matches a stale entry, and
+``ResponseCache.invalidate_estimate`` also drops the old renders.
+
+Batch renders are spread over a process pool of ``RECEIPT_WORKERS``
+processes (default: CPU count, at most 4; 0 renders in-process), a page
+of ``RECEIPT_PAGE_SIZE`` estimates at a time, and written into a zip that
+is streamed as it fills.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from html import escape
+from pathlib import Path
+from string import Template
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+from app.cache import CacheEntry, response_cache
+from app.export import ChunkSink
+
+RECEIPT_WORKERS = int(os.getenv("RECEIPT_WORKERS", min(4, os.cpu_count() or 1)))
+RECEIPT_PAGE_SIZE = 100
+RECEIPT_MEDIA_TYPE = "text/html; charset=utf-8"
+
+# Estimate numbers are chosen by the client. File names keep only these.
+_UNSAFE_ASCII = re.compile(r"[^A-Za-z0-9._-]+")
+_UNSAFE_UNICODE = re.compile(r'[\x00-\x1f\x7f/\\"]+')
+
+_TEMPLATE = Template(
+    (Path(__file__).parent / "templates" / "receipt.html").read_text("utf-8")
+)
+_ITEM_ROW = Template(
+    "      <tr>\n"
+    "        <td>\n"
+    '          <div class="item-name">$name</div>\n'
+    '          <div class="item-desc">$description</div>\n'
+    "        </td>\n"
+    "        <td>$quantity</td>\n"
+    "        <td>$price</td>\n"
+    "        <td>$amount</td>\n"
+    "      </tr>"
+)
+
+
+# ── Rendering ───────────────────────────────────────────────────────────────
+
+
+def _money(value: float) -> str:
+    return f"${value:,.2f}"
+
+
+def _long_date(value: str) -> str:
+    try:
+        d = date.fromisoformat(value)
+    except ValueError:
+        return value
+    return f"{d:%B} {d.day}, {d.year}"
+
+
+def render_receipt(estimate: dict) -> bytes:
+    """Render one receipt from an ``EstimateOut.model_dump()``."""
+    rows = "\n".join(
+        _ITEM_ROW.substitute(
+            name=escape(li["name"]),
+            description=escape(li["description"] or ""),
+            quantity=li["quantity"],
+            price=_money(li["price"]),
+            amount=_money(li["price"] * li["quantity"]),
+        )
+        for li in estimate["items"]
+    )
+    return _TEMPLATE.substitute(
+        number=escape(estimate["number"]),
+        customer=escape(estimate["customer"]),
+        status=escape(estimate["status"]),
+        date=escape(_long_date(estimate["date"])),
+        valid_until=escape(estimate["valid_until"] or "—"),
+        amount=escape(estimate["amount"]),
+        items=rows,
+    ).encode()
+
+
+def content_hash(estimate: dict) -> str:
+    canonical = json.dumps(estimate, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def filename(estimate: dict) -> str:
+    """``estimate-{number}.html``, with anything but ``[A-Za-z0-9._-]`` as ``_``.
+
+    Safe as a zip entry name (no separators) and inside a quoted header.
+    """
+    number = _UNSAFE_ASCII.sub("_", estimate["number"]).strip("._")
+    return f"estimate-{number or estimate['id']}.html"
+
+
+def content_disposition(estimate: dict) -> str:
+    """RFC 6266 ``inline`` header: an ASCII ``filename`` and a UTF-8 ``filename*``."""
+    name = _UNSAFE_UNICODE.sub("_", f"estimate-{estimate['number']}.html")
+    return (
+        f'inline; filename="{filename(estimate)}"; '
+        f"filename*=UTF-8''{quote(name, safe='')}"
+    )
+
+
+# ── Render cache ────────────────────────────────────────────────────────────
+
+
+def _cache_key(estimate: dict, digest: str) -> str:
+    return f"receipts:{estimate['id']}:{digest}"
+
+
+def _entry(estimate: dict, digest: str, body: bytes) -> CacheEntry:
+    return CacheEntry(
+        body=body,
+        etag=f'"{digest}"',
+        headers={"Content-Disposition": content_disposition(estimate)},
+        media_type=RECEIPT_MEDIA_TYPE,
+    )
+
+
+def cached_receipt(estimate: dict) -> CacheEntry:
+    """Return the rendered receipt for ``estimate``, rendering on a miss."""
+    digest = content_hash(estimate)
+    key = _cache_key(estimate, digest)
+    entry = response_cache.lookup(key)
+    if entry is None:
+        entry = _entry(estimate, digest, render_receipt(estimate))
+        response_cache.store(key, entry)
+    return entry
+
+
+# ── Batch rendering ─────────────────────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that already runs an event loop and
+        # database connections is not safe.
+        _pool = ProcessPoolExecutor(
+            RECEIPT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def _render_page(estimates: list[dict]) -> list[bytes]:
+    """Render a page of receipts, using cached renders where possible."""
+    digests = [content_hash(e) for e in estimates]
+    entries = [
+        response_cache.lookup(_cache_key(e, d)) for e, d in zip(estimates, digests)
+    ]
+    misses = [n for n, entry in enumerate(entries) if entry is None]
+    if misses and RECEIPT_WORKERS > 0:
+        loop = asyncio.get_running_loop()
+        pool = _get_pool()
+        bodies = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, render_receipt, estimates[n])
+                for n in misses
+            )
+        )
+    else:
+        bodies = [render_receipt(estimates[n]) for n in misses]
+    for n, body in zip(misses, bodies):
+        entries[n] = _entry(estimates[n], digests[n], body)
+        response_cache.store(_cache_key(estimates[n], digests[n]), entries[n])
+    return [entry.body for entry in entries]
+
+
+async def stream_receipts_zip(
+    pages: AsyncIterator[list[dict]],
+) -> AsyncIterator[bytes]:
+    """Zip the receipts for each page of estimates, yielding as pages finish."""
+    sink = ChunkSink()
+    names: set[str] = set()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        async for estimates in pages:
+            for estimate, body in zip(estimates, await _render_page(estimates)):
+                name = filename(estimate)
+                if name in names:
+                    # Two numbers that differ only in replaced characters.
+                    name = f"estimate-{estimate['id']}-{name[len('estimate-'):]}"
+                names.add(name)
+                zf.writestr(name, body)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,38 @@
+"""
+orjson-backed JSON responses.
+
+``ORJSONResponse`` is the app's default response class. Hot handlers also
+return it directly, built from plain dicts. A handler that returns a
+``Response`` skips FastAPI's ``response_model`` round trip, which
+re-validates the value and runs ``jsonable_encoder`` over it (on older
+FastAPI it even dumps models to dicts and validates them again).
+``response_model`` stays on the route for the OpenAPI schema.
+
+Pydantic models met in the content are dumped with ``model_dump`` and
+Decimals become floats, matching the wire format of the ``*Out`` schemas.
+``date`` and ``datetime`` are written natively by orjson as ISO strings.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
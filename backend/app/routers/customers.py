@@ -2,37 +2,95 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app import search as search_index
+from app.cache import response_cache
+from app.database import get_async_db
 from app.models.customer import CustomerModel
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    keyset_page,
+    parse_sort,
+)
+from app.responses import ORJSONResponse
 from app.schemas.customer import CustomerCreate, CustomerOut
+from app.suggest import customers_index
 
 router = APIRouter(prefix="/api/customers", tags=["Customers"])
 
+SORT_KEYS = {
+    "name": CustomerModel.name,
+    "email": CustomerModel.email,
+    "id": CustomerModel.id,
+}
+
 
 @router.get("", response_model=List[CustomerOut])
-def list_customers(
+async def list_customers(
+    request: Request,
+    response: Response,
     search: str = Query("", description="Filter by name"),
-    db: Session = Depends(get_db),
+    sort: str = Query("id", description="Sort key, '-' prefix for descending"),
+    cursor: str = Query("", description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        stmt = select(CustomerModel)
+        if search:
+            stmt = stmt.where(
+                search_index.contains(db, "customers", CustomerModel.name, search)
+            )
+        keys = parse_sort(sort, SORT_KEYS, CustomerModel.id)
+        rows = await keyset_page(db, stmt, keys, sort, cursor, limit, response)
+        return [CustomerOut.model_validate(c) for c in rows]
+
+    key = f"customers:list:{response_cache.query_key(request)}"
+    return await response_cache.serve(request, response, key, build)
+
+
+@router.get("/suggest", response_model=List[CustomerOut])
+async def suggest_customers(
+    q: str = Query(..., description="Name prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results"),
 ):
-    q = db.query(CustomerModel)
-    if search:
-        q = q.filter(CustomerModel.name.ilike(f"%{search}%"))
-    return [CustomerOut.model_validate(c) for c in q.order_by(CustomerModel.id).all()]
+    """Typeahead from the in-memory prefix index; no database access."""
+    return ORJSONResponse(customers_index.suggest(q, limit))
+
+
+@router.get("/search", response_model=List[CustomerOut])
+async def search_customers(
+    q: str = Query(..., min_length=1, description="Search term"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum results"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Ranked prefix + fuzzy name search, best match first."""
+    ids = await search_index.ranked_ids(db, "customers", q, limit)
+    found = await db.scalars(select(CustomerModel).where(CustomerModel.id.in_(ids)))
+    rows = {r.id: r for r in found}
+    return ORJSONResponse(
+        [CustomerOut.model_validate(rows[i]) for i in ids if i in rows]
+    )
 
 
 @router.get("/{customer_id}", response_model=CustomerOut)
-def get_customer(customer_id: int, db: Session = Depends(get_db)):
-    cust = db.query(CustomerModel).get(customer_id)
+async def get_customer(customer_id: int, db: AsyncSession = Depends(get_async_db)):
+    cust = await db.get(CustomerModel, customer_id)
     if not cust:
         raise HTTPException(404, "Customer not found")
-    return CustomerOut.model_validate(cust)
+    return ORJSONResponse(CustomerOut.model_validate(cust))
 
 
 @router.post("", response_model=CustomerOut, status_code=201)
-def create_customer(data: CustomerCreate, db: Session = Depends(get_db)):
+async def create_customer(
+    data: CustomerCreate, db: AsyncSession = Depends(get_async_db)
+):
     cust = CustomerModel(
         name=data.name,
         email=data.email,
@@ -41,6 +99,9 @@ def create_customer(data: CustomerCreate, db: Session = Depends(get_db)):
         last_name=data.last_name,
     )
     db.add(cust)
-    db.commit()
-    db.refresh(cust)
-    return CustomerOut.model_validate(cust)
+    await db.commit()
+    await db.refresh(cust)
+    out = CustomerOut.model_validate(cust)
+    customers_index.add(out.id, out.name, out)
+    response_cache.invalidate_customers()
+    return ORJSONResponse(out, status_code=201)
@@ -3,137 +3,783 @@
 from __future__ import annotations
 
 from datetime import date, timedelta
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-
-from app.database import get_db
+from decimal import Decimal
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, or_, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, selectinload
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.exc import StaleDataError
+
+from app import search as search_index
+from app.batch import apply_batch, estimate_type
+from app import stats as estimate_stats
+from app.bulk import BulkImporter
+from app.cache import response_cache
+from app.database import AsyncSessionLocal, get_async_db
+from app.events import estimate_events
+from app.export import COLUMNS as EXPORT_COLUMNS
+from app.export import MEDIA_TYPES as EXPORT_MEDIA_TYPES
+from app.export import stream_export
+from app.models.archive import ArchivedEstimateModel
 from app.models.customer import CustomerModel
 from app.models.estimate import EstimateModel, LineItemModel
-from app.schemas.customer import CustomerOut
+from app.numbering import advance_numbers_past, allocate_numbers
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    SortKeys,
+    keyset_page,
+    keyset_select,
+    parse_sort,
+)
+from app.receipts import RECEIPT_PAGE_SIZE, cached_receipt, stream_receipts_zip
+from app.responses import ORJSONResponse
 from app.schemas.estimate import (
+    BulkImportResult,
+    EstimateBatchGet,
+    EstimateBatchMutation,
+    EstimateBatchMutationResult,
+    EstimateBatchResult,
     EstimateCreate,
     EstimateOut,
+    EstimateStats,
+    EstimateSummaryOut,
     EstimateUpdate,
-    LineItemOut,
+    LineItemIn,
+    LineItemsPatch,
+    QueryDate,
+    QueryDecimal,
+    ReceiptBatch,
     StatusUpdate,
 )
 
 router = APIRouter(prefix="/api/estimates", tags=["Estimates"])
 
+ARCHIVED_DESCRIPTION = "Also include archived (long-expired) estimates"
+MAX_ID = 2**31 - 1  # INTEGER columns are 32-bit on PostgreSQL
+NUMBER_ATTEMPTS = 5
+
+SORT_KEYS = {
+    "date": EstimateModel.date,
+    "number": EstimateModel.number,
+    "status": EstimateModel.status,
+    "valid_until": EstimateModel.valid_until,
+    "amount": EstimateModel.total,
+    "id": EstimateModel.id,
+}
+
 
 # ── Helpers ─────────────────────────────────────────────────────────────────
 
 
-def _format_amount(line_items: list) -> str:
-    total = sum(li.price * li.quantity for li in line_items)
-    return f"${total:,.2f}"
+def _format_amount(total: Decimal) -> str:
+    return f"${total or 0:,.2f}"
+
+
+def _set_totals(est: EstimateModel, line_items: list) -> None:
+    """Refresh the stored ``total`` / ``line_count`` from ``line_items``."""
+    est.total = sum(li.price * li.quantity for li in line_items)
+    est.line_count = len(line_items)
+
+
+LINE_FIELDS = ("item_id", "name", "description", "quantity", "price")
+
+
+async def _write_line_changes(
+    db: AsyncSession,
+    est: EstimateModel,
+    upserts: list[dict],
+    deletes: set[int] = frozenset(),
+) -> None:
+    """Apply line item edits with at most one DELETE, UPDATE and INSERT batch.
+
+    An ``upserts`` entry carrying the id of one of ``est``'s lines updates
+    only the fields that actually differ; an entry without an id becomes a
+    new line. Callers reject ids of lines ``est`` doesn't have (see
+    ``_unknown_lines``). Lines in ``deletes`` are removed. ``est.line_items``
+    must be loaded; it is stale afterwards, so reload the estimate.
+    """
+    current = {
+        li.id: {f: getattr(li, f) for f in LINE_FIELDS} for li in est.line_items
+    }
+    final = {i: row for i, row in current.items() if i not in deletes}
+    updates, inserts, matched = [], [], set()
+    for row in upserts:
+        line_id = row.get("id")
+        if line_id in deletes:
+            continue
+        fields = {k: v for k, v in row.items() if k in LINE_FIELDS}
+        if line_id in final and line_id not in matched:
+            matched.add(line_id)
+            changed = {k: v for k, v in fields.items() if final[line_id][k] != v}
+            if changed:
+                updates.append({"id": line_id, **changed})
+                final[line_id] = {**final[line_id], **changed}
+        else:
+            inserts.append({**fields, "estimate_id": est.id})
+
+    removed = [i for i in current if i in deletes]
+    if removed:
+        table = LineItemModel.__table__
+        await db.execute(delete(table).where(table.c.id.in_(removed)))
+    if updates:
+        # ORM bulk UPDATE by primary key: rows are grouped by the set of
+        # columns they change and sent as executemany batches.
+        await db.execute(update(LineItemModel), updates)
+    if inserts:
+        await db.execute(insert(LineItemModel.__table__), inserts)
+
+    lines = [*final.values(), *inserts]
+    est.total = sum(li["price"] * li["quantity"] for li in lines)
+    est.line_count = len(lines)
+    # The line writes above bypass the ORM; make sure the estimate row is
+    # UPDATEd anyway so its version is checked and bumped.
+    flag_modified(est, "line_count")
+
+
+def _unknown_lines(est: EstimateModel, line_ids: list[int]) -> None:
+    """404 for the first id that isn't one of ``est``'s line items."""
+    known = {li.id for li in est.line_items}
+    unknown = [i for i in line_ids if i not in known]
+    if unknown:
+        raise HTTPException(404, f"Line item {unknown[0]} not found")
+
+
+IF_MATCH_DESCRIPTION = 'Expected version from a previous response, e.g. "3"'
+
+
+def _check_version(
+    est: EstimateModel, if_match: Optional[str], version: Optional[int]
+) -> None:
+    """Reject the write if the client's copy of ``est`` is out of date.
+
+    The expected version can come from ``If-Match`` (``"3"``, ``W/"3"``, a
+    list, or ``*``), answered with 412 on mismatch, or from a ``version``
+    field in the body, answered with 409. Without either the write goes
+    ahead. It is still guarded by the version check at commit (``_commit``).
+    """
+    if if_match is not None:
+        tags = {t.strip().removeprefix("W/").strip('"') for t in if_match.split(",")}
+        if "*" not in tags and str(est.version) not in tags:
+            raise HTTPException(
+                412, f"Estimate has changed (current version {est.version})"
+            )
+    if version is not None and version != est.version:
+        raise HTTPException(
+            409, f"Estimate has changed (current version {est.version})"
+        )
+
 
+async def _number_taken(db: AsyncSession, number: str) -> bool:
+    """Whether a hot or archived estimate already has ``number``."""
+    for model in (EstimateModel, ArchivedEstimateModel):
+        if await db.scalar(select(model.id).where(model.number == number)):
+            return True
+    return False
 
-def _next_estimate_number(db: Session) -> str:
-    result = db.query(func.max(EstimateModel.number)).scalar()
-    if result:
-        try:
-            return str(int(result) + 1)
-        except ValueError:
-            pass
-    return "45303"
-
-
-def _estimate_to_out(est: EstimateModel) -> EstimateOut:
-    customer_name = est.customer_rel.name if est.customer_rel else ""
-    customer_out = None
-    if est.customer_rel:
-        customer_out = CustomerOut.model_validate(est.customer_rel)
-
-    items_out = [LineItemOut.model_validate(li) for li in est.line_items]
-
-    return EstimateOut(
-        id=est.id,
-        number=est.number,
-        date=est.date,
-        valid_until=est.valid_until or "",
-        status=est.status,
-        type=est.type,
-        customer=customer_name,
-        amount=_format_amount(est.line_items),
-        notes=est.notes or "",
-        customer_id=est.customer_id,
-        customer_obj=customer_out,
-        items=items_out,
+
+async def _commit(db: AsyncSession) -> None:
+    """Commit, turning a lost version race into 409 Conflict."""
+    try:
+        await db.commit()
+    except StaleDataError as exc:
+        await db.rollback()
+        raise HTTPException(
+            409, "Estimate was changed by another request; reload and retry"
+        ) from exc
+
+
+def _estimate_query(model=EstimateModel):
+    """Base estimate query that eager-loads the customer and line items.
+
+    The customer is outer-joined in the same SELECT (and that join is reused
+    by the customer/search filters) and line items are fetched with one extra
+    ``IN (...)`` query, so serializing any number of estimates costs two round
+    trips instead of ``1 + 2N``. ``model`` may be ``ArchivedEstimateModel``,
+    which has the same columns and relationships.
+    """
+    return (
+        select(model)
+        .outerjoin(model.customer_rel)
+        .options(
+            contains_eager(model.customer_rel),
+            selectinload(model.line_items),
+        )
     )
 
 
+def _summary_query(model=EstimateModel):
+    """Column-only estimate query for list views (no ORM entities)."""
+    return select(
+        model.id,
+        model.number,
+        model.date,
+        model.valid_until,
+        model.status,
+        model.type,
+        model.total,
+        CustomerModel.name.label("customer"),
+    ).outerjoin(model.customer_rel)
+
+
+def _sources(include_archived: bool) -> list:
+    if include_archived:
+        return [EstimateModel, ArchivedEstimateModel]
+    return [EstimateModel]
+
+
+def _sort_keys(sort: str, columns=None) -> SortKeys:
+    """``parse_sort`` over the estimates table, or over a union's ``columns``."""
+    if columns is None:
+        return parse_sort(sort, SORT_KEYS, EstimateModel.id)
+    allowed = {name: columns[column.key] for name, column in SORT_KEYS.items()}
+    return parse_sort(sort, allowed, columns.id)
+
+
+async def _load_estimates(db: AsyncSession, ids: List[int]) -> list:
+    """Hot or archived estimates by id, eager-loaded, in ``ids`` order."""
+    found = {}
+    for model in (EstimateModel, ArchivedEstimateModel):
+        missing = [i for i in ids if i not in found]
+        if missing:
+            stmt = _estimate_query(model).where(model.id.in_(missing))
+            found.update((e.id, e) for e in await db.scalars(stmt))
+    return [found[i] for i in ids if i in found]
+
+
+def _summary_row(row) -> dict:
+    return {
+        "id": row.id,
+        "number": row.number,
+        "date": row.date.isoformat(),
+        "status": row.status,
+        "type": row.type,
+        "customer": row.customer or "",
+        "amount": _format_amount(row.total),
+    }
+
+
+async def _summary_rows(db: AsyncSession, models: list, ids: List[int]) -> dict:
+    """``_summary_query`` rows by id, looked up in each of ``models``."""
+    rows = {}
+    for model in models:
+        if ids:
+            found = await db.execute(_summary_query(model).where(model.id.in_(ids)))
+            rows.update((r.id, r) for r in found)
+    return rows
+
+
+def _match_tier(number: str, term: str) -> int:
+    """0 for a prefix match, 1 for a substring match, 2 for a fuzzy one."""
+    if number.startswith(term):
+        return 0
+    return 1 if term in number else 2
+
+
+def _key_id(key: str) -> Optional[int]:
+    """The id a lookup key names, if it is plain ASCII digits.
+
+    ``str.isdigit`` alone accepts "²", which ``int`` rejects, and ``int``
+    accepts "٣" or "1_0"; such keys, and ones too large for the ``INTEGER``
+    id column, are only ever matched as numbers.
+    """
+    if not (key.isascii() and key.isdecimal()):
+        return None
+    value = int(key)
+    return value if value <= MAX_ID else None
+
+
+async def _find_estimate(
+    db: AsyncSession, estimate_id: str, model=EstimateModel
+) -> EstimateModel | None:
+    """Look an estimate up by numeric id, falling back to its number."""
+    est = None
+    key_id = _key_id(estimate_id)
+    if key_id is not None:
+        est = await db.scalar(_estimate_query(model).where(model.id == key_id))
+    if not est:
+        est = await db.scalar(
+            _estimate_query(model).where(model.number == estimate_id)
+        )
+    return est
+
+
+async def _find_any_estimate(db: AsyncSession, estimate_id: str):
+    """``_find_estimate``, then the archive. For read-only endpoints."""
+    return await _find_estimate(db, estimate_id) or await _find_estimate(
+        db, estimate_id, ArchivedEstimateModel
+    )
+
+
+async def _find_estimates(db: AsyncSession, keys: List[str]) -> dict:
+    """Resolve many ``_find_any_estimate`` keys with a query per table.
+
+    Numeric keys match ids and every key matches numbers, in one
+    ``IN (...)`` SELECT on the hot table, then one on the archive for the
+    keys still unresolved. Each key resolves the same way as
+    ``_find_any_estimate``: id, then number, hot before archived. Keys that
+    match nothing are left out of the result.
+    """
+    key_ids = {key: _key_id(key) for key in keys}
+    resolved = {}
+    for model in (EstimateModel, ArchivedEstimateModel):
+        pending = [key for key in key_ids if key not in resolved]
+        if not pending:
+            break
+        ids = {key_ids[key] for key in pending} - {None}
+        found = (
+            await db.scalars(
+                _estimate_query(model).where(
+                    or_(model.id.in_(ids), model.number.in_(pending))
+                )
+            )
+        ).all()
+        by_id = {e.id: e for e in found}
+        by_number = {e.number: e for e in found}
+        for key in pending:
+            est = by_id.get(key_ids[key]) or by_number.get(key)
+            if est is not None:
+                resolved[key] = est
+    return resolved
+
+
+async def _reload_estimate(db: AsyncSession, estimate_id: int) -> EstimateModel:
+    """Re-fetch an estimate with its graph eager-loaded after a commit."""
+    stmt = (
+        _estimate_query()
+        .where(EstimateModel.id == estimate_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.execute(stmt)).scalar_one()
+
+
+def _customer_row(c: CustomerModel) -> dict:
+    return {
+        "id": c.id,
+        "name": c.name,
+        "email": c.email,
+        "phone": c.phone,
+        "first_name": c.first_name,
+        "last_name": c.last_name,
+    }
+
+
+def _estimate_row(est: EstimateModel) -> dict:
+    """An ``EstimateOut``-shaped dict built straight from the loaded graph.
+
+    Stored rows are already valid, so no Pydantic model is built (and
+    validated) per estimate, customer and line.
+    """
+    customer = est.customer_rel
+    return {
+        "id": est.id,
+        "number": est.number,
+        "date": est.date.isoformat(),
+        "valid_until": est.valid_until.isoformat() if est.valid_until else "",
+        "status": est.status,
+        "type": est.type,
+        "customer": customer.name if customer else "",
+        "amount": _format_amount(est.total),
+        "notes": est.notes or "",
+        "customer_id": est.customer_id,
+        "customer_obj": _customer_row(customer) if customer else None,
+        "items": [
+            {
+                "id": li.id,
+                "item_id": li.item_id,
+                "name": li.name,
+                "description": li.description,
+                "quantity": li.quantity,
+                "price": float(li.price),
+            }
+            for li in est.line_items
+        ],
+        "version": est.version,
+    }
+
+
 # ── Endpoints ───────────────────────────────────────────────────────────────
 
 
+class EstimateFilters:
+    """Filter query parameters shared by the estimate list endpoints.
+
+    ``apply`` expects the select to already be outer-joined to customers,
+    which both ``_estimate_query`` and ``_summary_query`` do.
+    ``include_archived`` is read by ``_filtered``.
+    """
+
+    def __init__(
+        self,
+        status: str = Query("", description="Filter by status"),
+        type: str = Query("", description="Filter by type: draft | active"),
+        customer: str = Query("", description="Filter by customer name"),
+        search: str = Query("", description="Search by number or customer"),
+        date_from: Annotated[
+            QueryDate, Query(description="From date (YYYY-MM-DD)")
+        ] = None,
+        date_to: Annotated[QueryDate, Query(description="To date (YYYY-MM-DD)")] = None,
+        min_amount: Annotated[QueryDecimal, Query(description="Minimum total")] = None,
+        max_amount: Annotated[QueryDecimal, Query(description="Maximum total")] = None,
+        include_archived: bool = Query(False, description=ARCHIVED_DESCRIPTION),
+    ):
+        self.status = status
+        self.type = type
+        self.customer = customer
+        self.search = search
+        self.date_from = date_from
+        self.date_to = date_to
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.include_archived = include_archived
+
+    def apply(self, q, db: AsyncSession, model=EstimateModel):
+        if self.status:
+            q = q.where(model.status == self.status)
+        if self.type:
+            q = q.where(model.type == self.type)
+        if self.customer:
+            q = q.where(CustomerModel.name == self.customer)
+        if self.search:
+            term = self.search
+            q = q.where(
+                search_index.contains(db, model.__tablename__, model.number, term)
+                | search_index.contains(db, "customers", CustomerModel.name, term)
+            )
+        if self.date_from:
+            q = q.where(model.date >= self.date_from)
+        if self.date_to:
+            q = q.where(model.date <= self.date_to)
+        if self.min_amount is not None:
+            q = q.where(model.total >= self.min_amount)
+        if self.max_amount is not None:
+            q = q.where(model.total <= self.max_amount)
+        return q
+
+
+def _filtered(build, filters: EstimateFilters, db: AsyncSession):
+    """``build(model)`` with the filters applied, and the columns to sort by.
+
+    By default that is the estimates table alone (columns ``None``). With
+    ``include_archived`` the filtered hot and archive selects are combined
+    with ``UNION ALL``. Sorting and keyset paging then run on the union, so
+    cursors work the same either way.
+    """
+    if not filters.include_archived:
+        return filters.apply(build(EstimateModel), db), None
+    union = union_all(
+        *(filters.apply(build(m), db, m) for m in _sources(True))
+    ).subquery("estimates_all")
+    return select(union), union.c
+
+
 @router.get("", response_model=List[EstimateOut])
-def list_estimates(
-    status: str = Query("", description="Filter by status"),
-    type: str = Query("", description="Filter by type: draft | active"),
-    customer: str = Query("", description="Filter by customer name"),
-    search: str = Query("", description="Search by number or customer"),
-    date_from: str = Query("", description="Filter from date (YYYY-MM-DD)"),
-    date_to: str = Query("", description="Filter to date (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
-):
-    q = db.query(EstimateModel)
-
-    if status:
-        q = q.filter(EstimateModel.status == status)
-    if type:
-        q = q.filter(EstimateModel.type == type)
-    if customer:
-        q = q.join(CustomerModel).filter(CustomerModel.name == customer)
-    if search:
-        q = q.outerjoin(CustomerModel).filter(
-            EstimateModel.number.ilike(f"%{search}%")
-            | CustomerModel.name.ilike(f"%{search}%")
+async def list_estimates(
+    request: Request,
+    response: Response,
+    filters: EstimateFilters = Depends(),
+    sort: str = Query("-date", description="Sort key, '-' prefix for descending"),
+    cursor: str = Query("", description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        if filters.include_archived:
+            # Page over the union's plain columns, then load the entities.
+            stmt, columns = _filtered(_summary_query, filters, db)
+            keys = _sort_keys(sort, columns)
+            rows = await keyset_page(
+                db, stmt, keys, sort, cursor, limit, response, scalars=False
+            )
+            estimates = await _load_estimates(db, [r.id for r in rows])
+        else:
+            stmt = filters.apply(_estimate_query(), db)
+            keys = _sort_keys(sort)
+            estimates = await keyset_page(
+                db, stmt, keys, sort, cursor, limit, response
+            )
+        return [_estimate_row(e) for e in estimates]
+
+    key = f"estimates:list:{response_cache.query_key(request)}"
+    return await response_cache.serve(request, response, key, build)
+
+
+@router.get("/summary", response_model=List[EstimateSummaryOut])
+async def list_estimate_summaries(
+    response: Response,
+    filters: EstimateFilters = Depends(),
+    sort: str = Query("-date", description="Sort key, '-' prefix for descending"),
+    cursor: str = Query("", description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List-view projection: one joined SELECT of plain columns.
+
+    Rows are turned straight into dicts and returned as an ``ORJSONResponse``,
+    which skips ORM entity construction and ``response_model`` validation.
+    """
+    stmt, columns = _filtered(_summary_query, filters, db)
+    keys = _sort_keys(sort, columns)
+    rows = await keyset_page(
+        db, stmt, keys, sort, cursor, limit, response, scalars=False
+    )
+    return ORJSONResponse([_summary_row(r) for r in rows], headers=response.headers)
+
+
+@router.get("/export")
+async def export_estimates(
+    filters: EstimateFilters = Depends(),
+    format: str = Query("csv", pattern="^(csv|ndjson|xlsx)$"),
+    sort: str = Query("-date", description="Sort key, '-' prefix for descending"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream every estimate matching the list filters as CSV, NDJSON or XLSX."""
+
+    def build(model):
+        columns = {
+            "customer": CustomerModel.name.label("customer"),
+            **{c: getattr(model, c) for c in EXPORT_COLUMNS if c != "customer"},
+        }
+        return select(*(columns[c] for c in EXPORT_COLUMNS)).outerjoin(
+            model.customer_rel
         )
-    if date_from:
-        q = q.filter(EstimateModel.date >= date_from)
-    if date_to:
-        q = q.filter(EstimateModel.date <= date_to)
 
-    estimates = q.order_by(EstimateModel.date.desc()).all()
-    return [_estimate_to_out(e) for e in estimates]
+    stmt, columns = _filtered(build, filters, db)
+    stmt = keyset_select(stmt, _sort_keys(sort, columns), sort, "", None)
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="estimates.{format}"'
+        },
+    )
+
+
+@router.get("/stats", response_model=EstimateStats)
+async def get_estimate_stats(
+    request: Request,
+    response: Response,
+    date_from: Annotated[QueryDate, Query(description="From date (YYYY-MM-DD)")] = None,
+    date_to: Annotated[QueryDate, Query(description="To date (YYYY-MM-DD)")] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Counts, sums and averages by status, type, customer and month.
+
+    Read from the ``estimate_stats`` buckets, so the cost does not grow with
+    the number of estimates.
+    """
+
+    async def build():
+        return await estimate_stats.load_stats(db, date_from, date_to)
+
+    # Under estimates:list: so every estimate write drops it.
+    key = f"estimates:list:stats:{response_cache.query_key(request)}"
+    return await response_cache.serve(request, response, key, build)
+
+
+@router.get("/search", response_model=List[EstimateSummaryOut])
+async def search_estimates(
+    q: str = Query(..., min_length=1, description="Search term"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum results"),
+    include_archived: bool = Query(False, description=ARCHIVED_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Ranked search by estimate number, then by best-matching customers.
+
+    Number matches come first; remaining slots are filled with the most
+    recent estimates of the customers that best match ``q``. With
+    ``include_archived`` archived number matches follow the hot ones, and
+    archived estimates are candidates for the customer fill too.
+    """
+    models = _sources(include_archived)
+    ids: List[int] = []
+    for model in models:
+        ids += await search_index.ranked_ids(db, model.__tablename__, q, limit)
+    rows = await _summary_rows(db, models, ids)
+    if include_archived:
+        # Each table ranked its own matches. Merge them by match quality,
+        # hot before archived within a tier.
+        term = q.strip().lower()
+        ids.sort(key=lambda i: _match_tier(rows[i].number.lower(), term))
+        ids = ids[:limit]
+    if len(ids) < limit:
+        customer_ids = await search_index.ranked_ids(db, "customers", q, limit)
+        if customer_ids:
+            rank = {cid: n for n, cid in enumerate(customer_ids)}
+            extra = []
+            for model in models:
+                extra += await db.execute(
+                    select(model.id, model.customer_id, model.date)
+                    .where(model.customer_id.in_(customer_ids), model.id.notin_(ids))
+                    .order_by(model.date.desc(), model.id.desc())
+                    .limit(limit * len(customer_ids))
+                )
+            extra.sort(
+                key=lambda r: (rank[r.customer_id], -r.date.toordinal(), -r.id)
+            )
+            extra = [r.id for r in extra[: limit - len(ids)]]
+            rows.update(await _summary_rows(db, models, extra))
+            ids += extra
+
+    return ORJSONResponse([_summary_row(rows[i]) for i in ids if i in rows])
+
+
+@router.get("/events")
+async def stream_estimate_events(
+    last_event_id: Optional[str] = Header(
+        None, description="Resume after this event (sent by EventSource on reconnect)"
+    ),
+    since: Optional[str] = Query(
+        None, description="Same as Last-Event-ID, for clients that can't set headers"
+    ),
+):
+    """Server-Sent Events stream of estimate changes; see ``app.events``.
+
+    The first message is ``ready`` (or ``reset`` when the requested position
+    can't be replayed: refetch, then apply events from there). Then one
+    message per change, with the estimate (or its id and number) as ``data``.
+    """
+    return StreamingResponse(
+        estimate_events.stream(last_event_id or since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{estimate_id}", response_model=EstimateOut)
-def get_estimate(estimate_id: str, db: Session = Depends(get_db)):
-    est = None
-    try:
-        est = db.query(EstimateModel).get(int(estimate_id))
-    except (ValueError, TypeError):
-        pass
-    if not est:
-        est = db.query(EstimateModel).filter(
-            EstimateModel.number == estimate_id
-        ).first()
+async def get_estimate(
+    estimate_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        est = found or await _find_any_estimate(db, estimate_id)
+        if not est:
+            raise HTTPException(404, "Estimate not found")
+        return _estimate_row(est)
+
+    found = None
+    key_id = _key_id(estimate_id)
+    if key_id is not None and str(key_id) != estimate_id:
+        # "06" and the like: writes only invalidate the entries under
+        # the id and the number, so resolve first and share the id's entry.
+        found = await _find_any_estimate(db, estimate_id)
+        if not found:
+            raise HTTPException(404, "Estimate not found")
+        estimate_id = str(found.id)
+
+    key = f"estimates:get:{estimate_id}"
+    return await response_cache.serve(request, response, key, build)
+
+
+@router.get("/{estimate_id}/receipt")
+async def get_estimate_receipt(
+    estimate_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Printable HTML receipt, served from the render cache when unchanged."""
+    est = await _find_any_estimate(db, estimate_id)
     if not est:
         raise HTTPException(404, "Estimate not found")
-    return _estimate_to_out(est)
+    entry = cached_receipt(_estimate_row(est))
+    return response_cache.respond(request, entry)
+
+
+@router.post("/receipts")
+async def batch_receipts(data: ReceiptBatch):
+    """Render receipts for many estimates in parallel, streamed as one zip.
+
+    Unknown ids are skipped; the archive holds one file per estimate found,
+    archived estimates included.
+    """
+    ids = list(dict.fromkeys(data.ids))
+
+    async def pages():
+        # Own session: the body is produced after the endpoint has returned.
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(ids), RECEIPT_PAGE_SIZE):
+                chunk = ids[start : start + RECEIPT_PAGE_SIZE]
+                yield [_estimate_row(e) for e in await _load_estimates(db, chunk)]
+
+    return StreamingResponse(
+        stream_receipts_zip(pages()),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="receipts.zip"'},
+    )
 
 
-@router.post("", response_model=EstimateOut, status_code=201)
-def create_estimate(data: EstimateCreate, db: Session = Depends(get_db)):
-    number = data.number or _next_estimate_number(db)
-    today = data.date or date.today().isoformat()
-    valid = data.valid_until or (date.today() + timedelta(days=30)).isoformat()
+@router.post("/batch-get", response_model=EstimateBatchResult)
+async def batch_get_estimates(
+    data: EstimateBatchGet, db: AsyncSession = Depends(get_async_db)
+):
+    """Fetch many estimates by id or number in one call.
+
+    ``results`` follows the order of ``keys`` (duplicates included), with
+    ``estimate: null`` for keys that match nothing. The same keys are also
+    listed in ``missing``.
+    """
+    keys = [str(k).strip() for k in data.keys]
+    found = await _find_estimates(db, keys)
+    rows = {key: _estimate_row(est) for key, est in found.items()}
+    return ORJSONResponse(
+        {
+            "results": [{"key": k, "estimate": rows.get(k)} for k in keys],
+            "missing": [k for k in dict.fromkeys(keys) if k not in rows],
+        }
+    )
+
 
+@router.post("/batch", response_model=EstimateBatchMutationResult)
+async def batch_update_estimates(
+    data: EstimateBatchMutation, db: AsyncSession = Depends(get_async_db)
+):
+    """Change the status of, or delete, many estimates in one transaction.
+
+    Each operation is ``{"op": "status", "id": 1, "status": "Saved"}`` or
+    ``{"op": "delete", "id": 2}``, optionally with the expected ``version``.
+    Operations that can't apply (404, or 409 on a version conflict) are
+    reported in ``results`` in request order; the others are committed.
+    """
+    outcome = await apply_batch(db, data.operations)
+    await db.commit()
+    if outcome.changed:
+        response_cache.invalidate_estimates(outcome.changed)
+        await estimate_events.estimates_status(outcome.status_changes)
+        await estimate_events.estimates_deleted(outcome.deleted)
+    return ORJSONResponse(
+        {
+            "succeeded": len(outcome.results) - outcome.failed,
+            "failed": outcome.failed,
+            "results": [r.model_dump() for r in outcome.results],
+        }
+    )
+
+
+async def _insert_estimate(
+    db: AsyncSession, data: EstimateCreate, number: str
+) -> EstimateModel:
     est = EstimateModel(
         number=number,
-        date=today,
-        valid_until=valid,
+        date=data.date or date.today(),
+        valid_until=data.valid_until or date.today() + timedelta(days=30),
         status=data.status,
         type=data.type,
         customer_id=data.customer_id,
         notes=data.notes,
     )
+    _set_totals(est, data.items)
     db.add(est)
-    db.flush()
+    await db.flush()
 
     for li in data.items:
         db.add(
@@ -147,18 +793,85 @@ def create_estimate(data: EstimateCreate, db: Session = Depends(get_db)):
             )
         )
 
-    db.commit()
-    db.refresh(est)
-    return _estimate_to_out(est)
+    await estimate_stats.record(db, added=[estimate_stats.snapshot(est)])
+    return est
+
+
+@router.post("", response_model=EstimateOut, status_code=201)
+async def create_estimate(
+    data: EstimateCreate, db: AsyncSession = Depends(get_async_db)
+):
+    """Create an estimate, numbered from the counter unless ``number`` is given.
+
+    A given number that a hot or archived estimate already has is a 409;
+    otherwise the counter is moved past it first. An allocated number can
+    still be taken (by an explicit create racing this one, or while another
+    worker holds an older reserved block), so the insert is retried with the
+    next number.
+    """
+    if data.number:
+        if await _number_taken(db, data.number):
+            raise HTTPException(409, f"Estimate number {data.number} already exists")
+        await advance_numbers_past([data.number])
+    for _ in range(NUMBER_ATTEMPTS):
+        number = data.number or (await allocate_numbers())[0]
+        try:
+            est = await _insert_estimate(db, data, number)
+            break
+        except IntegrityError as exc:
+            await db.rollback()
+            if not await _number_taken(db, number):
+                raise
+            if data.number:
+                raise HTTPException(
+                    409, f"Estimate number {number} already exists"
+                ) from exc
+    else:
+        raise HTTPException(409, "Could not allocate a free estimate number")
+
+    await db.commit()
+    response_cache.invalidate_estimate(est.id, est.number)
+    row = _estimate_row(await _reload_estimate(db, est.id))
+    await estimate_events.estimate_created(row)
+    return ORJSONResponse(row, status_code=201)
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_estimates(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Import many estimates from a JSON array or NDJSON body.
+
+    The body is parsed as it streams in and written in chunked, batched
+    transactions; invalid records are reported individually instead of
+    failing the whole job.
+    """
+    importer = BulkImporter(db)
+    try:
+        result = await importer.run(
+            request.stream(), request.headers.get("content-type", "")
+        )
+    finally:
+        if importer.created:
+            response_cache.invalidate_estimate_lists()
+            await estimate_events.estimates_imported(importer.created)
+    return ORJSONResponse(result)
 
 
 @router.put("/{estimate_id}", response_model=EstimateOut)
-def update_estimate(
-    estimate_id: int, data: EstimateUpdate, db: Session = Depends(get_db)
+async def update_estimate(
+    estimate_id: int,
+    data: EstimateUpdate,
+    if_match: Optional[str] = Header(None, description=IF_MATCH_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    est = db.query(EstimateModel).get(estimate_id)
+    est = await db.scalar(_estimate_query().where(EstimateModel.id == estimate_id))
     if not est:
         raise HTTPException(404, "Estimate not found")
+    _check_version(est, if_match, data.version)
+    if data.items is not None:
+        _unknown_lines(est, [li.id for li in data.items if li.id is not None])
+    before = estimate_stats.snapshot(est)
 
     if data.date is not None:
         est.date = data.date
@@ -174,53 +887,103 @@ def update_estimate(
         est.notes = data.notes
 
     if data.items is not None:
-        for li in est.line_items:
-            db.delete(li)
-        db.flush()
-        for li in data.items:
-            db.add(
-                LineItemModel(
-                    estimate_id=est.id,
-                    item_id=li.item_id,
-                    name=li.name,
-                    description=li.description,
-                    quantity=li.quantity,
-                    price=li.price,
-                )
-            )
+        # The body is the complete new list: diff it against the stored
+        # lines (matched by id) and write only what changed.
+        keep = {li.id for li in data.items if li.id is not None}
+        await _write_line_changes(
+            db,
+            est,
+            [li.model_dump() for li in data.items],
+            {li.id for li in est.line_items if li.id not in keep},
+        )
 
-    db.commit()
-    db.refresh(est)
-    return _estimate_to_out(est)
+    await estimate_stats.record(db, [before], [estimate_stats.snapshot(est)])
+    await _commit(db)
+    response_cache.invalidate_estimate(est.id, est.number)
+    row = _estimate_row(await _reload_estimate(db, est.id))
+    await estimate_events.estimate_updated(row)
+    return ORJSONResponse(row)
 
 
-@router.patch("/{estimate_id}/status", response_model=EstimateOut)
-def update_estimate_status(
-    estimate_id: str, data: StatusUpdate, db: Session = Depends(get_db)
+@router.patch("/{estimate_id}/items", response_model=EstimateOut)
+async def patch_estimate_items(
+    estimate_id: int,
+    data: LineItemsPatch,
+    if_match: Optional[str] = Header(None, description=IF_MATCH_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    est = None
-    try:
-        est = db.query(EstimateModel).get(int(estimate_id))
-    except (ValueError, TypeError):
-        pass
+    """Edit, add or remove individual lines without resending the rest.
+
+    Entries with an ``id`` change only the fields they include; entries
+    without one are new lines and need at least a ``name``.
+    """
+    est = await db.scalar(_estimate_query().where(EstimateModel.id == estimate_id))
     if not est:
-        est = db.query(EstimateModel).filter(
-            EstimateModel.number == estimate_id
-        ).first()
+        raise HTTPException(404, "Estimate not found")
+    _check_version(est, if_match, data.version)
+
+    before = estimate_stats.snapshot(est)
+    _unknown_lines(est, [e.id for e in data.items if e.id is not None] + data.delete)
+
+    upserts = []
+    for edit in data.items:
+        fields = edit.model_dump(exclude_unset=True)
+        if edit.id is not None:
+            # Only item_id may be cleared; other nulls mean "leave as is".
+            fields = {
+                k: v for k, v in fields.items() if v is not None or k == "item_id"
+            }
+        else:
+            try:
+                fields = LineItemIn.model_validate(fields).model_dump()
+            except ValidationError as exc:
+                raise HTTPException(422, exc.errors(include_url=False)) from exc
+        upserts.append(fields)
+
+    await _write_line_changes(db, est, upserts, set(data.delete))
+    await estimate_stats.record(db, [before], [estimate_stats.snapshot(est)])
+    await _commit(db)
+    response_cache.invalidate_estimate(est.id, est.number)
+    row = _estimate_row(await _reload_estimate(db, est.id))
+    await estimate_events.estimate_updated(row)
+    return ORJSONResponse(row)
+
+
+@router.patch("/{estimate_id}/status", response_model=EstimateOut)
+async def update_estimate_status(
+    estimate_id: str,
+    data: StatusUpdate,
+    if_match: Optional[str] = Header(None, description=IF_MATCH_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    est = await _find_estimate(db, estimate_id)
     if not est:
         raise HTTPException(404, "Estimate not found")
+    _check_version(est, if_match, data.version)
 
+    before = estimate_stats.snapshot(est)
     est.status = data.status
-    est.type = "draft" if data.status == "Draft" else "active"
-    db.commit()
-    db.refresh(est)
-    return _estimate_to_out(est)
+    est.type = estimate_type(data.status)
+    await estimate_stats.record(db, [before], [estimate_stats.snapshot(est)])
+    await _commit(db)
+    response_cache.invalidate_estimate(est.id, est.number)
+    row = _estimate_row(await _reload_estimate(db, est.id))
+    await estimate_events.estimate_updated(row)
+    return ORJSONResponse(row)
 
 
 @router.delete("/{estimate_id}", status_code=204)
-def delete_estimate(estimate_id: int, db: Session = Depends(get_db)):
-    est = db.query(EstimateModel).get(estimate_id)
+async def delete_estimate(
+    estimate_id: int,
+    if_match: Optional[str] = Header(None, description=IF_MATCH_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    est = await db.get(EstimateModel, estimate_id)
     if not est:
         raise HTTPException(404, "Estimate not found")
-    db.delete(est)
-    db.commit()
+    _check_version(est, if_match, None)
+    await db.delete(est)
+    await estimate_stats.record(db, removed=[estimate_stats.snapshot(est)])
+    await _commit(db)
+    response_cache.invalidate_estimate(est.id, est.number)
+    await estimate_events.estimates_deleted([(est.id, est.number)])
@@ -2,31 +2,88 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app import search as search_index
+from app.cache import response_cache
+from app.database import get_async_db
 from app.models.item import ItemModel
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    keyset_page,
+    parse_sort,
+)
+from app.responses import ORJSONResponse
 from app.schemas.item import ItemCreate, ItemOut
+from app.suggest import items_index
 
 router = APIRouter(prefix="/api/items", tags=["Items"])
 
+SORT_KEYS = {
+    "name": ItemModel.name,
+    "price": ItemModel.price,
+    "id": ItemModel.id,
+}
+
 
 @router.get("", response_model=List[ItemOut])
-def list_items(
+async def list_items(
+    request: Request,
+    response: Response,
     search: str = Query("", description="Filter by name"),
-    db: Session = Depends(get_db),
+    sort: str = Query("id", description="Sort key, '-' prefix for descending"),
+    cursor: str = Query("", description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        stmt = select(ItemModel)
+        if search:
+            stmt = stmt.where(
+                search_index.contains(db, "items", ItemModel.name, search)
+            )
+        keys = parse_sort(sort, SORT_KEYS, ItemModel.id)
+        rows = await keyset_page(db, stmt, keys, sort, cursor, limit, response)
+        return [ItemOut.model_validate(i) for i in rows]
+
+    key = f"items:list:{response_cache.query_key(request)}"
+    return await response_cache.serve(request, response, key, build)
+
+
+@router.get("/suggest", response_model=List[ItemOut])
+async def suggest_items(
+    q: str = Query(..., description="Name prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results"),
+):
+    """Typeahead from the in-memory prefix index; no database access."""
+    return ORJSONResponse(items_index.suggest(q, limit))
+
+
+@router.get("/search", response_model=List[ItemOut])
+async def search_items(
+    q: str = Query(..., min_length=1, description="Search term"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum results"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    q = db.query(ItemModel)
-    if search:
-        q = q.filter(ItemModel.name.ilike(f"%{search}%"))
-    return [ItemOut.model_validate(i) for i in q.order_by(ItemModel.id).all()]
+    """Ranked prefix + fuzzy name search, best match first."""
+    ids = await search_index.ranked_ids(db, "items", q, limit)
+    found = await db.scalars(select(ItemModel).where(ItemModel.id.in_(ids)))
+    rows = {r.id: r for r in found}
+    return ORJSONResponse([ItemOut.model_validate(rows[i]) for i in ids if i in rows])
 
 
 @router.post("", response_model=ItemOut, status_code=201)
-def create_item(data: ItemCreate, db: Session = Depends(get_db)):
+async def create_item(data: ItemCreate, db: AsyncSession = Depends(get_async_db)):
     item = ItemModel(name=data.name, description=data.description, price=data.price)
     db.add(item)
-    db.commit()
-    db.refresh(item)
-    return ItemOut.model_validate(item)
+    await db.commit()
+    await db.refresh(item)
+    out = ItemOut.model_validate(item)
+    items_index.add(out.id, out.name, out)
+    response_cache.invalidate_items()
+    return ORJSONResponse(out, status_code=201)
@@ -0,0 +1,52 @@
+"""Operational endpoints (readiness, pool stats, metrics and other diagnostics)."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.database import async_engine, engine, pool_status
+from app.metrics import render_metrics
+from app.responses import ORJSONResponse
+from app.startup import readiness
+
+router = APIRouter(prefix="/api", tags=["System"])
+
+# Prometheus scrapes /metrics at the root by convention.
+metrics_router = APIRouter(tags=["System"])
+
+
+@router.get("/_ready")
+async def get_readiness():
+    """200 once this worker has warmed up; 503 while starting or if warm-up failed."""
+    body = readiness.snapshot()
+    return ORJSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
+@router.get("/_pool")
+async def get_pool_stats():
+    """Connection pool occupancy and checkout wait times for this worker."""
+    return {
+        "async": pool_status(async_engine.pool),
+        "sync": pool_status(engine.pool),
+    }
+
+
+def _pool_gauges() -> list[str]:
+    samples: dict[str, list[str]] = {}
+    for name, pool in (("async", async_engine.pool), ("sync", engine.pool)):
+        for key, value in pool_status(pool).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                samples.setdefault(f"db_pool_{key}", []).append(
+                    f'db_pool_{key}{{engine="{name}"}} {value}'
+                )
+    lines = []
+    for metric, values in samples.items():
+        lines += [f"# TYPE {metric} gauge", *values]
+    return lines
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request latency, per-request query counts/DB time and pool gauges."""
+    return PlainTextResponse(
+        render_metrics(_pool_gauges()), media_type="text/plain; version=0.0.4"
+    )
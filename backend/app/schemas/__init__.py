@@ -3,10 +3,18 @@ from app.schemas.item import ItemCreate, ItemOut
 from app.schemas.estimate import (
     LineItemIn,
     LineItemOut,
+    LineItemEdit,
+    LineItemsPatch,
     EstimateCreate,
     EstimateUpdate,
     EstimateOut,
+    EstimateSummaryOut,
     StatusUpdate,
+    BulkImportError,
+    BulkImportResult,
+    ReceiptBatch,
+    StatsBucket,
+    EstimateStats,
 )
 
 __all__ = [
@@ -16,8 +24,16 @@ __all__ = [
     "ItemOut",
     "LineItemIn",
     "LineItemOut",
+    "LineItemEdit",
+    "LineItemsPatch",
     "EstimateCreate",
     "EstimateUpdate",
     "EstimateOut",
+    "EstimateSummaryOut",
     "StatusUpdate",
+    "BulkImportError",
+    "BulkImportResult",
+    "ReceiptBatch",
+    "StatsBucket",
+    "EstimateStats",
 ]
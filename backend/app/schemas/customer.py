@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class CustomerCreate(BaseModel):
@@ -17,5 +17,11 @@ class CustomerOut(BaseModel):
     first_name: str
     last_name: str
 
+    @field_validator("email", "phone", "first_name", "last_name", mode="before")
+    @classmethod
+    def _blank_if_null(cls, value):
+        # The columns default to "" but older rows may hold NULL.
+        return "" if value is None else value
+
     class Config:
         from_attributes = True
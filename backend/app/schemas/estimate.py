@@ -1,18 +1,27 @@
 from __future__ import annotations
 
-from typing import List, Optional
-
-from pydantic import BaseModel
+from datetime import date as Date
+from decimal import Decimal
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    Field,
+    field_validator,
+    model_validator,
+)
 
 from app.schemas.customer import CustomerOut
 
 
 class LineItemIn(BaseModel):
+    id: Optional[int] = None
     item_id: Optional[int] = None
     name: str
     description: str = ""
     quantity: int = 1
-    price: float = 0.0
+    price: Decimal = Decimal(0)
 
 
 class LineItemOut(BaseModel):
@@ -27,10 +36,47 @@ class LineItemOut(BaseModel):
         from_attributes = True
 
 
-class EstimateCreate(BaseModel):
+class LineItemEdit(BaseModel):
+    """One line in a ``PATCH .../items`` body; no ``id`` means a new line."""
+
+    id: Optional[int] = None
+    item_id: Optional[int] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    quantity: Optional[int] = None
+    price: Optional[Decimal] = None
+
+
+class LineItemsPatch(BaseModel):
+    items: List[LineItemEdit] = []
+    delete: List[int] = []
+    # Expected current version; alternative to an If-Match header.
+    version: Optional[int] = None
+
+
+def _blank_is_none(value):
+    return value or None
+
+
+# Filter query parameters that take "" (a cleared form field) as not given.
+# The validator only runs with ``Query`` inside ``Annotated``, not as default.
+QueryDate = Annotated[Optional[Date], BeforeValidator(_blank_is_none)]
+QueryDecimal = Annotated[Optional[Decimal], BeforeValidator(_blank_is_none)]
+
+
+class _DateFields(BaseModel):
+    """Accepts ``""`` for the optional dates, as older clients send it."""
+
+    @field_validator("date", "valid_until", mode="before", check_fields=False)
+    @classmethod
+    def _blank_is_none(cls, value):
+        return _blank_is_none(value)
+
+
+class EstimateCreate(_DateFields):
     number: Optional[str] = None
-    date: Optional[str] = None
-    valid_until: Optional[str] = None
+    date: Optional[Date] = None
+    valid_until: Optional[Date] = None
     status: str = "Draft"
     type: str = "draft"
     customer_id: Optional[int] = None
@@ -38,14 +84,15 @@ class EstimateCreate(BaseModel):
     items: List[LineItemIn] = []
 
 
-class EstimateUpdate(BaseModel):
-    date: Optional[str] = None
-    valid_until: Optional[str] = None
+class EstimateUpdate(_DateFields):
+    date: Optional[Date] = None
+    valid_until: Optional[Date] = None
     status: Optional[str] = None
     type: Optional[str] = None
     customer_id: Optional[int] = None
     notes: Optional[str] = None
     items: Optional[List[LineItemIn]] = None
+    version: Optional[int] = None
 
 
 class EstimateOut(BaseModel):
@@ -61,10 +108,118 @@ class EstimateOut(BaseModel):
     customer_id: Optional[int]
     customer_obj: Optional[CustomerOut] = None
     items: List[LineItemOut] = []
+    version: int
 
     class Config:
         from_attributes = True
 
 
+class EstimateSummaryOut(BaseModel):
+    id: int
+    number: str
+    date: str
+    status: str
+    type: str
+    customer: str
+    amount: str
+
+
 class StatusUpdate(BaseModel):
     status: str
+    version: Optional[int] = None
+
+
+class BulkImportError(BaseModel):
+    index: int
+    number: Optional[str] = None
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: List[BulkImportError] = []
+
+
+class ReceiptBatch(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+
+class EstimateBatchGet(BaseModel):
+    # Each key is an id or a number, resolved like GET /api/estimates/{key}.
+    keys: List[Union[int, str]] = Field(..., min_length=1, max_length=1000)
+
+
+class EstimateBatchHit(BaseModel):
+    key: str
+    estimate: Optional[EstimateOut] = None
+
+
+class EstimateBatchResult(BaseModel):
+    results: List[EstimateBatchHit]
+    missing: List[str]
+
+
+class EstimateBatchOperation(BaseModel):
+    op: Literal["status", "delete"]
+    id: int
+    status: Optional[str] = None
+    # Expected current version; the operation is refused (409) if it differs.
+    version: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _status_given(self):
+        if self.op == "status" and not self.status:
+            raise ValueError("status is required for a status operation")
+        return self
+
+
+class EstimateBatchMutation(BaseModel):
+    operations: List[EstimateBatchOperation] = Field(
+        ..., min_length=1, max_length=1000
+    )
+
+    @field_validator("operations")
+    @classmethod
+    def _one_operation_per_estimate(cls, operations):
+        seen = set()
+        for op in operations:
+            if op.id in seen:
+                raise ValueError(f"estimate {op.id} appears more than once")
+            seen.add(op.id)
+        return operations
+
+
+class EstimateBatchOperationResult(BaseModel):
+    index: int
+    id: int
+    op: str
+    code: int
+    error: Optional[str] = None
+    version: Optional[int] = None
+
+
+class EstimateBatchMutationResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[EstimateBatchOperationResult]
+
+
+class StatsBucket(BaseModel):
+    key: str
+    id: Optional[int] = None
+    count: int
+    total: float
+    average: float
+
+
+class EstimateStats(BaseModel):
+    date_from: Optional[Date]
+    date_to: Optional[Date]
+    count: int
+    total: float
+    average: float
+    by_status: List[StatsBucket]
+    by_type: List[StatsBucket]
+    by_customer: List[StatsBucket]
+    by_month: List[StatsBucket]
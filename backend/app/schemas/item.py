@@ -1,10 +1,12 @@
+from decimal import Decimal
+
 from pydantic import BaseModel
 
 
 class ItemCreate(BaseModel):
     name: str
     description: str = ""
-    price: float = 0.0
+    price: Decimal = Decimal(0)
 
 
 class ItemOut(BaseModel):
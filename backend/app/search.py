@@ -0,0 +1,217 @@
+"""
+Indexed text search for customers, items and estimate numbers.
+
+``ILIKE '%term%'`` cannot use a B-tree index, so every keystroke in the search
+box used to scan the whole table. This module backs search with a trigram
+index instead:
+
+* **PostgreSQL** – ``pg_trgm`` GIN indexes. ``ILIKE`` substring filters use
+  them automatically, and ranked search uses ``similarity()`` / ``%`` for
+  fuzzy matches.
+* **SQLite** – external-content FTS5 tables with the ``trigram`` tokenizer,
+  kept in sync by triggers. Substring filters become ``MATCH`` lookups, and
+  ranked search ORs the term's trigrams together and orders by ``bm25``, so a
+  misspelled name still finds its closest rows.
+
+Anything else (or a SQLite build without FTS5) falls back to plain ``ILIKE``.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# name -> (table, searchable column)
+TARGETS = {
+    "customers": ("customers", "name"),
+    "items": ("items", "name"),
+    "estimates": ("estimates", "number"),
+    "estimates_archive": ("estimates_archive", "number"),
+}
+
+MIN_TRIGRAM_TERM = 3
+
+# table -> whether it has a usable trigram index; see detect_search_indexes.
+_available: dict[str, bool] = {}
+
+
+# ── Schema ──────────────────────────────────────────────────────────────────
+
+
+def _install_pg_trgm(conn: Connection) -> None:
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError:
+        logger.warning("pg_trgm unavailable; search falls back to ILIKE scans")
+        return
+    for table, column in TARGETS.values():
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+        )
+
+
+def _install_fts5(conn: Connection) -> None:
+    existing = {
+        row[0]
+        for row in conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table'")
+        )
+    }
+    for table, column in TARGETS.values():
+        fts = f"{table}_fts"
+        if fts in existing:
+            continue
+        try:
+            with conn.begin_nested():
+                conn.execute(
+                    text(
+                        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                        f"{column}, content='{table}', content_rowid='id', "
+                        f"tokenize='trigram')"
+                    )
+                )
+        except DBAPIError:
+            logger.warning("FTS5 trigram tokenizer unavailable; using LIKE scans")
+            return
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); "
+                f"END"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) "
+                f"VALUES ('delete', old.id, old.{column}); END"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) "
+                f"VALUES ('delete', old.id, old.{column}); "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); "
+                f"END"
+            )
+        )
+        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def detect_search_indexes(conn: Connection) -> None:
+    """Record which tables have a trigram index in this database.
+
+    Called at startup so request handlers can pick a query plan without a
+    catalog lookup per search.
+    """
+    _available.clear()
+    if conn.dialect.name == "sqlite":
+        names = {
+            row[0] for row in conn.execute(text("SELECT name FROM sqlite_master"))
+        }
+        for table, _ in TARGETS.values():
+            _available[table] = f"{table}_fts" in names
+    elif conn.dialect.name == "postgresql":
+        found = conn.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first()
+        for table, _ in TARGETS.values():
+            _available[table] = found is not None
+
+
+def ensure_search_indexes(conn: Connection) -> None:
+    """Create the dialect's search indexes if they do not exist yet."""
+    if conn.dialect.name == "postgresql":
+        _install_pg_trgm(conn)
+    elif conn.dialect.name == "sqlite":
+        _install_fts5(conn)
+    detect_search_indexes(conn)
+
+
+# ── Queries ─────────────────────────────────────────────────────────────────
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _fts_trigrams(term: str) -> str:
+    """``"abc" OR "bcd" OR ...`` – matches rows sharing any trigram."""
+    grams = {term[i : i + 3] for i in range(len(term) - 2)}
+    return " OR ".join(_fts_phrase(g) for g in sorted(grams))
+
+
+def contains(db: AsyncSession, target: str, column, term: str):
+    """Substring filter on ``column`` that uses the search index if present.
+
+    ``column`` is the mapped attribute (e.g. ``CustomerModel.name``). On
+    PostgreSQL the plain ``ILIKE`` is already served by the GIN index; on
+    SQLite it is rewritten as an FTS5 lookup.
+    """
+    table, _ = TARGETS[target]
+    if (
+        db.get_bind().dialect.name == "sqlite"
+        and len(term) >= MIN_TRIGRAM_TERM
+        and _available.get(table)
+    ):
+        ids = text(
+            f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH :fts_term"
+        ).bindparams(fts_term=_fts_phrase(term))
+        pk = column.class_.id
+        return pk.in_(ids.columns(rowid=pk.type))
+    return column.ilike(f"%{term}%")
+
+
+async def ranked_ids(
+    db: AsyncSession, target: str, term: str, limit: int
+) -> list[int]:
+    """Ids of the best matches for ``term``, best first.
+
+    Prefix matches always rank above fuzzy/substring ones; within each group
+    PostgreSQL orders by trigram similarity and SQLite by ``bm25``.
+    """
+    table, column = TARGETS[target]
+    term = term.strip()
+    if not term:
+        return []
+    params = {"term": term, "prefix": f"{term}%", "sub": f"%{term}%", "n": limit}
+    dialect = db.get_bind().dialect.name
+    ready = _available.get(table, False)
+
+    if dialect == "postgresql" and ready:
+        sql = (
+            f"SELECT id FROM {table} "
+            f"WHERE {column} ILIKE :sub OR {column} % :term "
+            f"ORDER BY ({column} ILIKE :prefix) DESC, "
+            f"similarity({column}, :term) DESC, id "
+            f"LIMIT :n"
+        )
+    elif dialect == "sqlite" and ready and len(term) >= MIN_TRIGRAM_TERM:
+        params["fts_term"] = _fts_trigrams(term)
+        sql = (
+            f"SELECT t.id FROM {table}_fts "
+            f"JOIN {table} t ON t.id = {table}_fts.rowid "
+            f"WHERE {table}_fts MATCH :fts_term "
+            f"ORDER BY (t.{column} LIKE :prefix) DESC, "
+            f"(t.{column} LIKE :sub) DESC, bm25({table}_fts), t.id "
+            f"LIMIT :n"
+        )
+    else:
+        sql = (
+            f"SELECT id FROM {table} WHERE LOWER({column}) LIKE LOWER(:sub) "
+            f"ORDER BY (LOWER({column}) LIKE LOWER(:prefix)) DESC, {column}, id "
+            f"LIMIT :n"
+        )
+    result = await db.execute(text(sql), params)
+    return list(result.scalars())
@@ -1,10 +1,14 @@
 """Seed the database with initial data if tables are empty."""
 
+from datetime import date
+
 from sqlalchemy.orm import Session
 
 from app.models.customer import CustomerModel
 from app.models.item import ItemModel
 from app.models.estimate import EstimateModel, LineItemModel
+from app.numbering import sync_number_counter
+from app.stats import rebuild_estimate_stats
 
 
 def seed_database(db: Session) -> None:
@@ -105,11 +109,13 @@ def seed_database(db: Session) -> None:
         cust = customer_map.get(est["customer_name"])
         estimate = EstimateModel(
             number=est["number"],
-            date=est["date"],
-            valid_until=est["valid_until"],
+            date=date.fromisoformat(est["date"]),
+            valid_until=date.fromisoformat(est["valid_until"]),
             status=est["status"],
             type=est["type"],
             customer_id=cust.id if cust else None,
+            total=sum(li["price"] * li["quantity"] for li in est["line_items"]),
+            line_count=len(est["line_items"]),
         )
         db.add(estimate)
         db.flush()
@@ -125,4 +131,6 @@ def seed_database(db: Session) -> None:
                 )
             )
 
+    sync_number_counter(db.connection())
+    rebuild_estimate_stats(db.connection())
     db.commit()
@@ -0,0 +1,103 @@
+"""
+Worker startup and readiness.
+
+A worker's start does no schema work by default. Tables and upgrades are
+applied by ``python -m app.manage migrate`` before the workers start.
+``AUTO_MIGRATE=1`` and ``SEED_DATABASE=1`` bring back boot-time
+migration and seeding for dev setups.
+
+The lifespan runs ``warm_up`` as a background task, so the worker accepts
+connections right away. The task opens a pooled database connection and
+builds the in-memory typeahead indexes. It also records which search
+indexes (trigram / FTS5) the database has. Until it finishes,
+``GET /api/_ready`` answers 503, so a load balancer or orchestrator should
+only route traffic to the worker once it answers 200. The response also
+reports how long each startup phase took.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+# Reference point for the "import" phase. ``main`` imports this module before
+# FastAPI, SQLAlchemy and the routers, so their import time is counted.
+_PROCESS_START = time.perf_counter()
+
+from sqlalchemy import text  # noqa: E402
+
+from app.database import SessionLocal, async_engine, engine  # noqa: E402
+
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "").strip().lower() in ("1", "true", "yes")
+SEED_DATABASE = os.getenv("SEED_DATABASE", "").strip().lower() in ("1", "true", "yes")
+
+logger = logging.getLogger("app.startup")
+
+
+class Readiness:
+    """Startup phase timings and whether this worker is warm."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self._mark = _PROCESS_START
+
+    def phase_done(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases[name] = round((now - self._mark) * 1000, 1)
+        self._mark = now
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "pid": os.getpid(),
+            "uptime_ms": round((time.perf_counter() - _PROCESS_START) * 1000, 1),
+            "phases_ms": dict(self.phases),
+            "error": self.error,
+        }
+
+
+readiness = Readiness()
+
+
+def prepare_database() -> None:
+    """Boot-time migration and seeding, when enabled by the flags."""
+    if AUTO_MIGRATE or SEED_DATABASE:
+        from app import manage
+
+        if AUTO_MIGRATE:
+            manage.migrate()
+        if SEED_DATABASE:
+            manage.seed()
+    readiness.phase_done("database_setup")
+
+
+def _build_indexes() -> None:
+    from app.search import detect_search_indexes
+    from app.suggest import build_indexes
+
+    with engine.connect() as conn:
+        detect_search_indexes(conn)
+    db = SessionLocal()
+    try:
+        build_indexes(db)
+    finally:
+        db.close()
+
+
+async def warm_up() -> None:
+    """Bring the worker to a state where requests don't pay first-use costs."""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        readiness.phase_done("db_connect")
+        await asyncio.to_thread(_build_indexes)
+        readiness.phase_done("indexes")
+    except Exception as exc:
+        readiness.error = f"{type(exc).__name__}: {str(exc).splitlines()[0]}"
+        logger.exception("worker warm-up failed")
+        return
+    readiness.ready = True
+    logger.info("worker %s ready: %s", os.getpid(), readiness.phases)
@@ -0,0 +1,264 @@
+"""
+Incrementally maintained estimate statistics.
+
+``estimate_daily_stats`` holds, for each day, the number of estimates and
+the sum of their totals per status, per type and per customer. These are
+three separate dimensions rather than one bucket per combination, so the
+table grows with days x (statuses + types + active customers), not with
+their product. Every estimate write calls ``record`` in the same
+transaction. It sends only the net per-bucket changes, as ``INSERT ... ON
+CONFLICT DO UPDATE`` increments, so the table always agrees with
+``estimates``. Archiving moves an estimate without touching its buckets:
+the stats cover hot and archived estimates alike, so a past date range
+reports the same numbers before and after ``app.archive`` runs.
+
+``load_stats`` sums the buckets in the requested date range in SQL. One
+grouped SELECT covers all three dimensions, and one more groups the
+``status`` rows by month, since every estimate has exactly one status.
+``rebuild_estimate_stats`` recomputes the table from scratch, from both
+tables. It runs as a migration and after seeding.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Integer,
+    String,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import ArchivedEstimateModel
+from app.models.customer import CustomerModel
+from app.models.estimate import EstimateModel
+from app.models.stats import EstimateStatsModel
+
+DIMENSIONS = ("status", "type", "customer")
+
+# (date, status, type, customer_id, total) of one estimate
+Snapshot = tuple[date, str, str, int, Decimal]
+
+
+def snapshot(est: EstimateModel) -> Snapshot:
+    """The estimate's contribution to the aggregates at this moment."""
+    return (
+        est.date,
+        est.status or "",
+        est.type or "",
+        est.customer_id or 0,
+        est.total or Decimal(0),
+    )
+
+
+async def record(
+    db: AsyncSession,
+    removed: Iterable[Optional[Snapshot]] = (),
+    added: Iterable[Optional[Snapshot]] = (),
+) -> None:
+    """Move estimates out of / into their buckets.
+
+    ``None`` entries are skipped, so ``record(db, [before], [after])`` also
+    covers creates (no before) and deletes (no after).
+    """
+    deltas: dict[tuple, list] = defaultdict(lambda: [0, Decimal(0)])
+    for sign, snapshots in ((-1, removed), (1, added)):
+        for snap in snapshots:
+            if snap is None:
+                continue
+            day, status, type_, customer_id, total = snap
+            for dimension, key in zip(DIMENSIONS, (status, type_, str(customer_id))):
+                delta = deltas[dimension, day, key]
+                delta[0] += sign
+                delta[1] += sign * total
+    rows = [
+        {
+            "dimension": dimension,
+            "date": day,
+            "key": key,
+            "count": count,
+            "total": total,
+        }
+        for (dimension, day, key), (count, total) in deltas.items()
+        if count or total
+    ]
+    if rows:
+        await db.execute(_upsert(db.get_bind().dialect.name), rows)
+
+
+def _upsert(dialect: str):
+    table = EstimateStatsModel.__table__
+    stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["dimension", "date", "key"],
+        set_={
+            "count": table.c.count + stmt.excluded.count,
+            "total": table.c.total + stmt.excluded.total,
+        },
+    )
+
+
+def _every_estimate():
+    """Hot and archived estimates, as one subquery of the bucketed columns."""
+    columns = ("date", "status", "type", "customer_id", "total")
+    return union_all(
+        *(
+            select(*(model.__table__.c[name] for name in columns))
+            for model in (EstimateModel, ArchivedEstimateModel)
+        )
+    ).subquery()
+
+
+def rebuild_estimate_stats(conn: Connection) -> None:
+    """Recompute every bucket from both tables in one INSERT ... SELECT."""
+    stats = EstimateStatsModel.__table__
+    est = _every_estimate()
+    keys = {
+        "status": func.coalesce(est.c.status, ""),
+        "type": func.coalesce(est.c.type, ""),
+        "customer": cast(func.coalesce(est.c.customer_id, 0), String),
+    }
+    conn.execute(delete(stats))
+    conn.execute(
+        insert(stats).from_select(
+            ["dimension", "date", "key", "count", "total"],
+            union_all(
+                *(
+                    select(
+                        literal(dimension),
+                        est.c.date,
+                        keys[dimension],
+                        func.count(),
+                        func.coalesce(func.sum(est.c.total), 0),
+                    ).group_by(est.c.date, keys[dimension])
+                    for dimension in DIMENSIONS
+                )
+            ),
+        )
+    )
+
+
+def stats_stale(conn: Connection) -> bool:
+    """True when the buckets don't count every hot and archived estimate.
+
+    That is a table never filled, or one filled while archiving still took
+    estimates out of their buckets.
+    """
+    counted = conn.scalar(
+        select(func.coalesce(func.sum(EstimateStatsModel.count), 0)).where(
+            EstimateStatsModel.dimension == "status"
+        )
+    )
+    estimates = sum(
+        conn.scalar(select(func.count()).select_from(model))
+        for model in (EstimateModel, ArchivedEstimateModel)
+    )
+    return counted != estimates
+
+
+# ── Reads ───────────────────────────────────────────────────────────────────
+
+
+def _bucket(key: str, count: int, total: Decimal, id: Optional[int] = None) -> dict:
+    """A ``StatsBucket`` as a plain dict, ready for ``ORJSONResponse``."""
+    average = total / count if count else 0.0
+    return {"key": key, "id": id, "count": count, "total": total, "average": average}
+
+
+def _month(column, dialect: str):
+    """``YYYY-MM`` of a date column."""
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+async def load_stats(
+    db: AsyncSession,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> dict:
+    """Sum the stored buckets in ``[date_from, date_to]`` by dimension.
+
+    Returns an ``EstimateStats`` as plain dicts. Two queries: one
+    ``UNION ALL`` for status, type and month, and one for customers joined
+    to their names, largest total first.
+    """
+    stats = EstimateStatsModel
+    count = func.sum(stats.count).label("count")
+    total = func.sum(stats.total).label("total")
+
+    def grouped(dimension: str, key):
+        stmt = (
+            select(key.label("key"), count, total)
+            .where(stats.dimension == dimension)
+            .group_by(key)
+            .having(func.sum(stats.count) != 0)
+        )
+        if date_from:
+            stmt = stmt.where(stats.date >= date_from)
+        if date_to:
+            stmt = stmt.where(stats.date <= date_to)
+        return stmt
+
+    # Every estimate has exactly one status, so months come from those rows.
+    month = _month(stats.date, db.get_bind().dialect.name)
+    parts = {
+        "status": grouped("status", stats.key),
+        "type": grouped("type", stats.key),
+        "month": grouped("status", month),
+    }
+    small = union_all(
+        *(
+            stmt.add_columns(literal(name).label("rollup"))
+            for name, stmt in parts.items()
+        )
+    ).order_by("rollup", "key")
+    rows: dict[str, list] = {name: [] for name in parts}
+    for row in await db.execute(small):
+        rows[row.rollup].append(row)
+
+    # Cast after grouping, so only customer keys are ever cast.
+    customers = grouped("customer", stats.key).subquery()
+    customer_id = cast(customers.c.key, Integer)
+    by_customer = await db.execute(
+        select(
+            customer_id.label("id"),
+            CustomerModel.name,
+            customers.c.count,
+            customers.c.total,
+        )
+        .outerjoin(CustomerModel, CustomerModel.id == customer_id)
+        .order_by(customers.c.total.desc(), customer_id)
+    )
+
+    def buckets(name: str) -> list[dict]:
+        return [_bucket(r.key, r.count, r.total) for r in rows[name]]
+
+    all_count = sum(r.count for r in rows["status"])
+    all_total = sum((r.total for r in rows["status"]), Decimal(0))
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "count": all_count,
+        "total": all_total,
+        "average": all_total / all_count if all_count else 0.0,
+        "by_status": buckets("status"),
+        "by_type": buckets("type"),
+        "by_customer": [
+            _bucket(r.name or "", r.count, r.total, id=r.id or None)
+            for r in by_customer
+        ],
+        "by_month": buckets("month"),
+    }
@@ -0,0 +1,105 @@
+"""
+In-memory prefix indexes for typeahead on customer and item names.
+
+Each index is a sorted list of ``(key, id)`` pairs searched with ``bisect``.
+A name is indexed once per word, e.g. "Amal Perera" under both "amal perera"
+and "perera", so typing the start of any word matches. The indexes are built
+by the worker's warm-up (``app.startup``) and updated by the create
+endpoints, so suggestions never touch the database. A worker only reports
+ready once they are loaded.
+
+The indexes are per process: with several uvicorn workers, a row created
+through one worker only shows up in the others' suggestions after their next
+restart.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from typing import Generic, Iterable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.models.customer import CustomerModel
+from app.models.item import ItemModel
+from app.schemas.customer import CustomerOut
+from app.schemas.item import ItemOut
+
+T = TypeVar("T")
+
+
+# How many matching keys ``suggest`` inspects at most, as a multiple of ``k``.
+# Bounds the cost of one-letter prefixes on large tables.
+SCAN_FACTOR = 50
+
+Key = tuple[str, int, int]  # (word suffix, doc id, word position)
+
+
+def _keys(doc_id: int, name: str) -> list[Key]:
+    words = name.lower().split()
+    return [(" ".join(words[i:]), doc_id, i) for i in range(len(words))]
+
+
+class PrefixIndex(Generic[T]):
+    def __init__(self) -> None:
+        self._keys: list[Key] = []
+        self._docs: dict[int, T] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def load(self, entries: Iterable[tuple[int, str, T]]) -> None:
+        """Replace the whole index, e.g. at startup."""
+        keys: list[Key] = []
+        docs: dict[int, T] = {}
+        for doc_id, name, doc in entries:
+            docs[doc_id] = doc
+            keys.extend(_keys(doc_id, name))
+        keys.sort()
+        with self._lock:
+            self._keys, self._docs = keys, docs
+
+    def add(self, doc_id: int, name: str, doc: T) -> None:
+        with self._lock:
+            self._docs[doc_id] = doc
+            for key in _keys(doc_id, name):
+                insort(self._keys, key)
+
+    def suggest(self, prefix: str, k: int = 10) -> list[T]:
+        """Up to ``k`` documents with a word starting with ``prefix``.
+
+        Names that start with the prefix rank before mid-name word matches;
+        within each group results are alphabetical.
+        """
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        leading: list[int] = []
+        inner: list[int] = []
+        with self._lock:
+            start = bisect_left(self._keys, (prefix,))
+            window = self._keys[start : start + k * SCAN_FACTOR]
+            for key, doc_id, position in window:
+                if not key.startswith(prefix) or len(leading) >= k:
+                    break
+                (inner if position else leading).append(doc_id)
+            ids = list(dict.fromkeys(leading + inner))[:k]
+            return [self._docs[i] for i in ids]
+
+
+customers_index: PrefixIndex[CustomerOut] = PrefixIndex()
+items_index: PrefixIndex[ItemOut] = PrefixIndex()
+
+
+def build_indexes(db: Session) -> None:
+    """Load every customer and item into the in-memory indexes."""
+    customers_index.load(
+        (c.id, c.name, CustomerOut.model_validate(c))
+        for c in db.query(CustomerModel).yield_per(1000)
+    )
+    items_index.load(
+        (i.id, i.name, ItemOut.model_validate(i))
+        for i in db.query(ItemModel).yield_per(1000)
+    )
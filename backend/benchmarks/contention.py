@@ -0,0 +1,174 @@
+"""
+Contended-update check for optimistic concurrency on estimates.
+
+Several client threads edit the same estimate at once. Each edit is a
+read-modify-write: fetch the estimate, append a unique token to its notes,
+then ``PUT`` the result with ``If-Match`` set to the version it read. A 409
+or 412 answer means another writer got there first, so the thread reloads
+and tries again. At the end every token must appear in the notes exactly
+once. If one is missing, a write was lost and the run exits with 1.
+
+    python -m benchmarks.contention
+    python -m benchmarks.contention --threads 16 --writes 25
+    python -m benchmarks.contention --no-if-match   # control: writes get lost
+    python -m benchmarks.contention --url http://127.0.0.1:8000
+
+Without ``--url`` a ``uvicorn main:app`` worker is started on a scratch
+SQLite database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.startup import BACKEND_DIR, _free_port
+
+
+def start_server(
+    database: Path,
+    timeout: float = 60.0,
+    app: str = "main:app",
+    env: Optional[dict] = None,
+) -> tuple[subprocess.Popen, str]:
+    """Start ``uvicorn app`` on ``database`` and wait for ``/api/_ready``.
+
+    The database is migrated and seeded at boot; ``env`` adds or overrides
+    environment variables.
+    """
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "AUTO_MIGRATE": "1",
+        "SEED_DATABASE": "1",
+        "RECEIPT_WORKERS": "0",
+        **(env or {}),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited:\n" + proc.stderr.read().decode())
+        try:
+            if httpx.get(f"{url}/api/_ready").status_code == 200:
+                return proc, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def writer(
+    client: httpx.Client,
+    path: str,
+    tokens: list[str],
+    use_if_match: bool,
+    retries: Counter,
+) -> None:
+    for token in tokens:
+        while True:
+            est = client.get(path).json()
+            body = {"notes": f"{est['notes']} {token}".strip()}
+            headers = {"If-Match": f'"{est["version"]}"'} if use_if_match else {}
+            response = client.put(path, json=body, headers=headers)
+            if response.status_code in (409, 412):
+                retries[token] += 1
+                continue
+            response.raise_for_status()
+            break
+
+
+def run(url: str, threads: int, writes: int, use_if_match: bool) -> int:
+    with httpx.Client(base_url=url, timeout=30.0) as client:
+        created = client.post(
+            "/api/estimates",
+            json={"customer_id": 1, "notes": "", "items": []},
+        )
+        created.raise_for_status()
+        path = f"/api/estimates/{created.json()['id']}"
+
+        tokens = [[f"t{t}w{w}" for w in range(writes)] for t in range(threads)]
+        retries: Counter = Counter()
+        errors: list[BaseException] = []
+
+        def target(mine: list[str]) -> None:
+            try:
+                writer(client, path, mine, use_if_match, retries)
+            except BaseException as exc:  # surfaced after join
+                errors.append(exc)
+
+        workers = [threading.Thread(target=target, args=(t,)) for t in tokens]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+
+        final = client.get(path).json()
+        client.delete(path)
+
+    if errors:
+        raise errors[0]
+    seen = Counter(final["notes"].split())
+    expected = [t for mine in tokens for t in mine]
+    lost = [t for t in expected if seen[t] == 0]
+    duplicated = [t for t in expected if seen[t] > 1]
+
+    print(
+        f"{threads} threads x {writes} writes, If-Match "
+        f"{'on' if use_if_match else 'off'}: {elapsed:.2f}s, "
+        f"{sum(retries.values())} retries, final version {final['version']}"
+    )
+    print(f"  lost {len(lost)}, duplicated {len(duplicated)} of {len(expected)}")
+    if lost or duplicated:
+        print("FAILED: concurrent writes were lost or applied twice")
+        return 1
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--url", help="Running server; default: start one")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=20, help="Writes per thread")
+    parser.add_argument(
+        "--no-if-match",
+        dest="if_match",
+        action="store_false",
+        help="Send blind writes (shows the lost updates the check prevents)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.url:
+        return run(args.url, args.threads, args.writes, args.if_match)
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, url = start_server(Path(tmp) / "contention.db")
+        try:
+            return run(url, args.threads, args.writes, args.if_match)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
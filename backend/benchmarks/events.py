@@ -0,0 +1,163 @@
+"""
+Change-feed fan-out check: every subscriber sees every write, in order.
+
+Opens ``--clients`` streams on ``GET /api/estimates/events``, then makes
+``--writes`` status changes to one estimate. Each stream must receive every
+``estimate.updated`` event, in order and without gaps. Delivery latency is
+the time from a write's response to each subscriber receiving its event.
+Halfway through, one subscriber disconnects and resumes with
+``Last-Event-ID``; it must not miss anything either. Exits 1 on a miss.
+
+    python -m benchmarks.events
+    python -m benchmarks.events --clients 100 --writes 200
+    python -m benchmarks.events --url http://127.0.0.1:8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.contention import start_server
+
+STATUSES = ["Saved", "Sent"]
+
+
+class Subscriber(threading.Thread):
+    def __init__(self, url: str, estimate_id: int, stop_after: Optional[int] = None):
+        super().__init__(daemon=True)
+        self.url = url
+        self.estimate_id = estimate_id
+        self.stop_after = stop_after
+        self.versions: list[int] = []
+        self.received: dict[int, float] = {}
+        self.last_id: Optional[str] = None
+        self.ready = threading.Event()
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def _listen(self, headers: dict, limit: Optional[int]) -> None:
+        with httpx.stream(
+            "GET", f"{self.url}/api/estimates/events", headers=headers, timeout=60
+        ) as response:
+            response.raise_for_status()
+            event: dict[str, str] = {}
+            for line in response.iter_lines():
+                if line:
+                    key, _, value = line.partition(":")
+                    event[key] = value.strip()
+                    continue
+                if "id" in event:
+                    self.last_id = event["id"]
+                kind, data = event.get("event"), event.get("data")
+                event = {}
+                if kind == "ready":
+                    self.ready.set()
+                elif kind == "estimate.updated":
+                    row = json.loads(data)
+                    if row["id"] != self.estimate_id:
+                        continue
+                    self.versions.append(row["version"])
+                    self.received[row["version"]] = time.perf_counter()
+                    if self.done.is_set():
+                        return
+                    if limit is not None and len(self.versions) >= limit:
+                        return
+
+    def run(self) -> None:
+        try:
+            self._listen({}, self.stop_after)
+            if self.stop_after is not None and not self.done.is_set():
+                time.sleep(0.2)  # miss a few writes, then resume
+                self._listen({"Last-Event-ID": self.last_id}, None)
+        except BaseException as exc:  # surfaced after join
+            self.error = exc
+
+
+def run(url: str, clients: int, writes: int) -> int:
+    with httpx.Client(base_url=url, timeout=30.0) as client:
+        created = client.post("/api/estimates", json={"customer_id": 1, "items": []})
+        created.raise_for_status()
+        est = created.json()
+        path = f"/api/estimates/{est['id']}/status"
+
+        subscribers = [
+            Subscriber(url, est["id"], stop_after=writes // 2 if n == 0 else None)
+            for n in range(clients)
+        ]
+        for s in subscribers:
+            s.start()
+        for s in subscribers:
+            if not s.ready.wait(30):
+                raise RuntimeError("subscriber did not connect")
+
+        sent: dict[int, float] = {}
+        start = time.perf_counter()
+        for n in range(writes):
+            response = client.patch(path, json={"status": STATUSES[n % 2]})
+            response.raise_for_status()
+            sent[response.json()["version"]] = time.perf_counter()
+        elapsed = time.perf_counter() - start
+
+        deadline = time.perf_counter() + 10
+        while time.perf_counter() < deadline and any(
+            len(s.versions) < writes for s in subscribers if not s.error
+        ):
+            time.sleep(0.05)
+        for s in subscribers:
+            s.done.set()
+        client.delete(f"/api/estimates/{est['id']}")
+
+    errors = [s.error for s in subscribers if s.error]
+    if errors:
+        raise errors[0]
+    expected = sorted(sent)
+    bad = [s for s in subscribers if s.versions != expected]
+    latencies = sorted(
+        (s.received[v] - sent[v]) * 1000
+        for s in subscribers
+        for v in expected
+        if v in s.received
+    )
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+
+    print(
+        f"{clients} subscribers x {writes} writes: writes took {elapsed:.2f}s, "
+        f"delivery p50 {statistics.median(latencies or [0]):.2f} ms, p95 {p95:.2f} ms"
+    )
+    print(f"  {clients - len(bad)} of {clients} saw every event in order (one resumed)")
+    if bad:
+        print("FAILED: events were missed, duplicated or reordered")
+        return 1
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--url", help="Running server; default: start one")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        return run(args.url, args.clients, args.writes)
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, url = start_server(Path(tmp) / "events.db")
+        try:
+            return run(url, args.clients, args.writes)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Export benchmark: peak memory and throughput of the streamed export.
+
+Runs the query behind ``GET /api/estimates/export`` (no filters, ``-date``
+order) against a data set and consumes the body the endpoint would stream,
+once per format. Peak Python memory is measured with ``tracemalloc`` on a
+separate pass from the timing, because tracing slows allocation down.
+
+``buffered`` is the way data came out before: every row loaded at once
+and rendered as one JSON body, as ``GET /api/estimates`` without paging did.
+Its peak grows with the table; the streamed formats' peaks should not.
+
+    python -m benchmarks.export --scale 100k
+    python -m benchmarks.export --scale 1m --formats csv ndjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+FORMATS = ("csv", "ndjson", "xlsx")
+
+
+def _export_query():
+    from sqlalchemy import select
+
+    from app.export import COLUMNS
+    from app.models.customer import CustomerModel
+    from app.models.estimate import EstimateModel
+
+    columns = {
+        "customer": CustomerModel.name.label("customer"),
+        **{c: getattr(EstimateModel, c) for c in COLUMNS if c != "customer"},
+    }
+    return (
+        select(*(columns[c] for c in COLUMNS))
+        .outerjoin(EstimateModel.customer_rel)
+        .order_by(EstimateModel.date.desc(), EstimateModel.id.desc())
+    )
+
+
+async def _streamed(fmt: str) -> int:
+    from app.export import stream_export
+
+    size = 0
+    async for chunk in stream_export(_export_query(), fmt):
+        size += len(chunk)
+    return size
+
+
+async def _buffered(_fmt: str) -> int:
+    from app.database import AsyncSessionLocal
+    from app.export import COLUMNS
+    from app.responses import dumps
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(_export_query())).all()
+    return len(dumps([dict(zip(COLUMNS, row)) for row in rows]))
+
+
+async def _measure(fn, fmt: str) -> tuple[int, float, float]:
+    start = time.perf_counter()
+    size = await fn(fmt)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await fn(fmt)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak / 2**20
+
+
+async def _run(formats: list[str]) -> list[tuple]:
+    from sqlalchemy import text
+
+    from app.database import async_engine
+
+    async with async_engine.connect() as conn:  # open the pool before timing
+        await conn.execute(text("SELECT 1"))
+    rows = []
+    for name, fn, fmt in [("buffered", _buffered, "json")] + [
+        (fmt, _streamed, fmt) for fmt in formats
+    ]:
+        rows.append((name, *await _measure(fn, fmt)))
+    await async_engine.dispose()
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scale", choices=("1k", "100k", "1m"), default="100k")
+    parser.add_argument("--database-url", help="Default: benchmarks.run's data set")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url or (
+        f"sqlite:///{Path(tempfile.gettempdir()) / f'wave-bench-{args.scale}.db'}"
+    )
+    from app.database import engine
+    from app.datagen import SCALES, estimate_count, generate
+    from app.manage import migrate
+
+    migrate()
+    count = estimate_count(engine)
+    if count == 0:
+        sizes = SCALES[args.scale]
+        print(f"Generating {args.scale} data set in {engine.url!r} ...", flush=True)
+        generate(engine, sizes.customers, sizes.items, sizes.estimates)
+        count = estimate_count(engine)
+
+    results = asyncio.run(_run(list(args.formats)))
+    print(f"{count:,} estimates ({engine.dialect.name})")
+    print(f"  {'path':<9} {'MB out':>8} {'seconds':>8} {'rows/s':>9} {'peak MB':>8}")
+    for name, size, elapsed, peak in results:
+        print(
+            f"  {name:<9} {size / 2**20:>8.1f} {elapsed:>8.2f} "
+            f"{count / elapsed:>9,.0f} {peak:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
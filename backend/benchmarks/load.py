@@ -0,0 +1,167 @@
+"""
+Concurrent load test: async routers versus the old sync path.
+
+Starts one uvicorn worker for each stack on the same database and hits it
+with ``--clients`` concurrent keep-alive clients (default 500) for
+``--duration`` seconds. Each request is one of the hot reads, picked at
+random:
+
+* ``GET /api/estimates/{id}`` for a random id,
+* ``GET /api/estimates/summary?limit=50``,
+* ``GET /api/customers?limit=50``.
+
+``async`` is ``main:app`` with the response cache off. ``sync`` is
+``benchmarks.sync_app``, which has the same queries in ``def`` handlers on
+the sync engine. Reports requests/second, p50/p99 latency and errors for
+each. The clients are spread over ``--procs`` processes, so the load
+generator's own event loop is not what limits the numbers.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --scale 100k --clients 500 --duration 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.contention import start_server
+
+STACKS = {"async": "main:app", "sync": "benchmarks.sync_app:app"}
+PAGE = 50
+
+
+def _path(rng: random.Random, max_id: int) -> str:
+    roll = rng.random()
+    if roll < 0.5:
+        return f"/api/estimates/{rng.randint(1, max_id)}"
+    if roll < 0.8:
+        return f"/api/estimates/summary?limit={PAGE}"
+    return f"/api/customers?limit={PAGE}"
+
+
+async def _drive(url: str, clients: int, duration: float, max_id: int, seed: int):
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            rng = random.Random(seed * 100_000 + n)
+            while time.perf_counter() < deadline:
+                path = _path(rng, max_id)
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    ok = response.status_code in (200, 404)
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+    return latencies, errors
+
+
+def _drive_process(args: tuple) -> tuple[list[float], int]:
+    return asyncio.run(_drive(*args))
+
+
+def run_load(
+    url: str, clients: int, duration: float, max_id: int, procs: int
+) -> dict:
+    shares = [clients // procs + (n < clients % procs) for n in range(procs)]
+    jobs = [(url, share, duration, max_id, n) for n, share in enumerate(shares)]
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(procs) as pool:
+        parts = pool.map(_drive_process, jobs)
+    elapsed = time.perf_counter() - start
+    latencies = sorted(x for part, _ in parts for x in part)
+    errors = sum(e for _, e in parts)
+    if not latencies:
+        return {"rps": 0.0, "p50": 0.0, "p99": 0.0, "errors": errors}
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        "errors": errors,
+    }
+
+
+def _prepare(database: Path, scale: str) -> int:
+    """Generate the data set if the file is new; return the largest id."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    from sqlalchemy import func, select
+
+    from app.database import engine
+    from app.datagen import SCALES, estimate_count, generate
+    from app.manage import migrate
+    from app.models.estimate import EstimateModel
+
+    migrate()
+    if estimate_count(engine) == 0:
+        sizes = SCALES[scale]
+        print(f"Generating {scale} data set in {database} ...", flush=True)
+        generate(engine, sizes.customers, sizes.items, sizes.estimates)
+    with engine.connect() as conn:
+        max_id = conn.scalar(select(func.max(EstimateModel.id)))
+    engine.dispose()
+    return max_id
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scale", choices=("1k", "100k", "1m"), default="1k")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds")
+    parser.add_argument("--procs", type=int, default=4, help="Client processes")
+    parser.add_argument(
+        "--stack", choices=sorted(STACKS), action="append", help="Default: both"
+    )
+    args = parser.parse_args(argv)
+
+    # Same file as benchmarks.run, so a generated data set is shared.
+    database = Path(tempfile.gettempdir()) / f"wave-bench-{args.scale}.db"
+    max_id = _prepare(database, args.scale)
+
+    print(
+        f"{args.clients} clients over {args.procs} processes, "
+        f"{args.duration:.0f}s per stack, {args.scale} data set"
+    )
+    print(f"  {'stack':<6} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for stack in args.stack or list(STACKS):
+        proc, url = start_server(
+            database,
+            timeout=600,
+            app=STACKS[stack],
+            env={"CACHE_TTL": "0", "SEED_DATABASE": "0", "AUTO_MIGRATE": "0"},
+        )
+        try:
+            # Warm the pool and caches before measuring.
+            run_load(url, min(args.clients, 50), 2, max_id, 1)
+            r = run_load(url, args.clients, args.duration, max_id, args.procs)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(
+            f"  {stack:<6} {r['rps']:>8.0f} {r['p50']:>9.1f} {r['p99']:>9.1f} "
+            f"{r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
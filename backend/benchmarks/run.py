@@ -0,0 +1,645 @@
+"""
+API latency benchmarks.
+
+Fills a database with synthetic data at a given scale (see
+``app.datagen``), then calls every API route in-process through
+``TestClient`` and reports throughput and p50/p95/p99 latency per route.
+The run fails (exit 1) when a route's p95 exceeds its budget in
+``budgets.json``, or when it is more than ``--max-regression`` slower than
+the same route in a ``--baseline`` results file.
+
+    python -m benchmarks.run --scale 1k
+    python -m benchmarks.run --scale 100k --output results.json
+    python -m benchmarks.run --scale 1m --database-url postgresql://.../bench
+
+SQLite databases are kept under the temp directory, one per scale, and are
+reused by later runs; each run deletes the rows it inserted and puts back
+the estimates it updated. Any other database URL gets generated data only when
+it has no estimates yet. ``--fresh`` drops every table first. The response
+cache is off (``CACHE_TTL=0``) unless ``--cache`` is given, so reads
+exercise the database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+BUDGETS_FILE = Path(__file__).parent / "budgets.json"
+SCALE_NAMES = ("1k", "100k", "1m")
+SAMPLE_SIZE = 500
+# Regressions smaller than this are timer noise, whatever the ratio.
+MIN_REGRESSION_MS = 2.0
+
+
+# ── Scenarios ───────────────────────────────────────────────────────────────
+
+
+@dataclass
+class Fixtures:
+    """Real ids and names to aim requests at, sampled before the run."""
+
+    estimate_ids: list[int]
+    numbers: list[str]
+    customer_ids: list[int]
+    customer_prefixes: list[str]
+    item_prefixes: list[str]
+    latest: date
+    next_cursor: str = ""
+    created: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Returns keyword arguments for ``TestClient.request``.
+    request: Callable[[Fixtures, random.Random], dict]
+    iterations: Optional[int] = None
+    expect: int = 200
+
+
+def _line(rng: random.Random) -> dict:
+    return {
+        "name": f"Bench line {rng.randrange(1000)}",
+        "quantity": rng.randint(1, 5),
+        "price": round(rng.uniform(1, 500), 2),
+    }
+
+
+def _estimate_body(fx: Fixtures, rng: random.Random) -> dict:
+    return {
+        "date": fx.latest.isoformat(),
+        "status": "Draft",
+        "type": "draft",
+        "customer_id": rng.choice(fx.customer_ids),
+        "items": [_line(rng) for _ in range(rng.randint(1, 8))],
+    }
+
+
+def _month(fx: Fixtures) -> dict:
+    return {
+        "date_from": (fx.latest - timedelta(days=30)).isoformat(),
+        "date_to": fx.latest.isoformat(),
+    }
+
+
+def _bulk_body(fx: Fixtures, rng: random.Random) -> dict:
+    records = [_estimate_body(fx, rng) for _ in range(100)]
+    return {
+        "url": "/api/estimates/bulk",
+        "content": "\n".join(json.dumps(r) for r in records),
+        "headers": {"Content-Type": "application/x-ndjson"},
+    }
+
+
+def _delete(fx: Fixtures, rng: random.Random) -> dict:
+    return {"url": f"/api/estimates/{fx.created.pop()}"}
+
+
+SCENARIOS = [
+    # Customers and items
+    Scenario(
+        "GET /api/customers",
+        "GET",
+        lambda fx, rng: {"url": "/api/customers", "params": {"limit": 50}},
+    ),
+    Scenario(
+        "GET /api/customers?search",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/customers",
+            "params": {"search": rng.choice(fx.customer_prefixes), "limit": 50},
+        },
+    ),
+    Scenario(
+        "GET /api/customers/suggest",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/customers/suggest",
+            "params": {"q": rng.choice(fx.customer_prefixes)},
+        },
+    ),
+    Scenario(
+        "GET /api/customers/search",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/customers/search",
+            "params": {"q": rng.choice(fx.customer_prefixes)},
+        },
+    ),
+    Scenario(
+        "GET /api/customers/{customer_id}",
+        "GET",
+        lambda fx, rng: {"url": f"/api/customers/{rng.choice(fx.customer_ids)}"},
+    ),
+    Scenario(
+        "POST /api/customers",
+        "POST",
+        lambda fx, rng: {
+            "url": "/api/customers",
+            "json": {"name": f"Bench Customer {rng.randrange(10**9)}"},
+        },
+        expect=201,
+    ),
+    Scenario(
+        "GET /api/items",
+        "GET",
+        lambda fx, rng: {"url": "/api/items", "params": {"limit": 50}},
+    ),
+    Scenario(
+        "GET /api/items/suggest",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/items/suggest",
+            "params": {"q": rng.choice(fx.item_prefixes)},
+        },
+    ),
+    Scenario(
+        "GET /api/items/search",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/items/search",
+            "params": {"q": rng.choice(fx.item_prefixes)},
+        },
+    ),
+    Scenario(
+        "POST /api/items",
+        "POST",
+        lambda fx, rng: {
+            "url": "/api/items",
+            "json": {"name": f"Bench Item {rng.randrange(10**9)}", "price": 9.99},
+        },
+        expect=201,
+    ),
+    # Estimate reads
+    Scenario(
+        "GET /api/estimates",
+        "GET",
+        lambda fx, rng: {"url": "/api/estimates", "params": {"limit": 50}},
+    ),
+    Scenario(
+        "GET /api/estimates?cursor",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/estimates",
+            "params": {"limit": 50, "cursor": fx.next_cursor},
+        },
+    ),
+    Scenario(
+        "GET /api/estimates?status&customer",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/estimates",
+            "params": {
+                "status": rng.choice(["Draft", "Saved", "Sent", "Approved"]),
+                "customer": rng.choice(fx.customer_prefixes),
+                "limit": 50,
+            },
+        },
+    ),
+    Scenario(
+        "GET /api/estimates/summary",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/estimates/summary",
+            "params": {"limit": 100, "sort": "-amount"},
+        },
+    ),
+    Scenario(
+        "GET /api/estimates/summary?include_archived",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/estimates/summary",
+            "params": {"limit": 100, "include_archived": "true"},
+        },
+    ),
+    Scenario(
+        "GET /api/estimates/export",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/estimates/export",
+            "params": {"format": "csv", "status": "Approved", **_month(fx)},
+        },
+        iterations=20,
+    ),
+    Scenario(
+        "GET /api/estimates/stats",
+        "GET",
+        lambda fx, rng: {"url": "/api/estimates/stats", "params": _month(fx)},
+    ),
+    Scenario(
+        "GET /api/estimates/stats (all time)",
+        "GET",
+        lambda fx, rng: {"url": "/api/estimates/stats"},
+        iterations=20,
+    ),
+    Scenario(
+        "GET /api/estimates/search",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/estimates/search",
+            "params": {"q": rng.choice(fx.numbers)[:4]},
+        },
+    ),
+    Scenario(
+        "GET /api/estimates/search?include_archived",
+        "GET",
+        lambda fx, rng: {
+            "url": "/api/estimates/search",
+            "params": {"q": rng.choice(fx.numbers)[:4], "include_archived": "true"},
+        },
+    ),
+    Scenario(
+        "GET /api/estimates/{estimate_id}",
+        "GET",
+        lambda fx, rng: {"url": f"/api/estimates/{rng.choice(fx.estimate_ids)}"},
+    ),
+    Scenario(
+        "GET /api/estimates/{number}",
+        "GET",
+        lambda fx, rng: {"url": f"/api/estimates/{rng.choice(fx.numbers)}"},
+    ),
+    Scenario(
+        "GET /api/estimates/{estimate_id}/receipt",
+        "GET",
+        lambda fx, rng: {
+            "url": f"/api/estimates/{rng.choice(fx.estimate_ids)}/receipt"
+        },
+    ),
+    Scenario(
+        "POST /api/estimates/receipts",
+        "POST",
+        lambda fx, rng: {
+            "url": "/api/estimates/receipts",
+            "json": {"ids": rng.sample(fx.estimate_ids, 50)},
+        },
+        iterations=30,
+    ),
+    Scenario(
+        "POST /api/estimates/batch-get",
+        "POST",
+        lambda fx, rng: {
+            "url": "/api/estimates/batch-get",
+            "json": {
+                "keys": rng.sample(fx.estimate_ids, 50)
+                + rng.sample(fx.numbers, 50)
+                + ["missing"]
+            },
+        },
+    ),
+    # Estimate writes
+    Scenario(
+        "POST /api/estimates",
+        "POST",
+        lambda fx, rng: {"url": "/api/estimates", "json": _estimate_body(fx, rng)},
+        expect=201,
+    ),
+    Scenario("POST /api/estimates/bulk", "POST", _bulk_body, iterations=10),
+    Scenario(
+        "PUT /api/estimates/{estimate_id}",
+        "PUT",
+        lambda fx, rng: {
+            "url": f"/api/estimates/{rng.choice(fx.estimate_ids)}",
+            "json": {"notes": f"bench {rng.randrange(10**6)}"},
+        },
+    ),
+    Scenario(
+        "PATCH /api/estimates/{estimate_id}/items",
+        "PATCH",
+        lambda fx, rng: {
+            "url": f"/api/estimates/{rng.choice(fx.estimate_ids)}/items",
+            "json": {"items": [_line(rng)]},
+        },
+    ),
+    Scenario(
+        "PATCH /api/estimates/{estimate_id}/status",
+        "PATCH",
+        lambda fx, rng: {
+            "url": f"/api/estimates/{rng.choice(fx.estimate_ids)}/status",
+            "json": {"status": rng.choice(["Saved", "Sent", "Approved"])},
+        },
+    ),
+    Scenario(
+        "POST /api/estimates/batch",
+        "POST",
+        lambda fx, rng: {
+            "url": "/api/estimates/batch",
+            "json": {
+                "operations": [
+                    {"op": "status", "id": i, "status": rng.choice(["Saved", "Sent"])}
+                    for i in rng.sample(fx.estimate_ids, 100)
+                ]
+            },
+        },
+        iterations=50,
+    ),
+    # Removes estimates made by "POST /api/estimates", so it must come after.
+    Scenario("DELETE /api/estimates/{estimate_id}", "DELETE", _delete, expect=204),
+    # System
+    Scenario("GET /api/_ready", "GET", lambda fx, rng: {"url": "/api/_ready"}),
+    Scenario("GET /api/_pool", "GET", lambda fx, rng: {"url": "/api/_pool"}),
+    Scenario("GET /metrics", "GET", lambda fx, rng: {"url": "/metrics"}),
+]
+
+
+# ── Measurement ─────────────────────────────────────────────────────────────
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def run_scenario(
+    client, scenario: Scenario, fx: Fixtures, iterations: int, warmup: int
+) -> dict:
+    rng = random.Random(scenario.name)
+    count = min(scenario.iterations or iterations, iterations)
+    timings = []
+    for n in range(warmup + count):
+        kwargs = scenario.request(fx, rng)
+        start = time.perf_counter()
+        response = client.request(scenario.method, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != scenario.expect:
+            raise RuntimeError(
+                f"{scenario.name}: expected {scenario.expect}, got "
+                f"{response.status_code}: {response.text[:200]}"
+            )
+        if scenario.name == "POST /api/estimates":
+            fx.created.append(response.json()["id"])
+        if n >= warmup:
+            timings.append(elapsed)
+    return {
+        "iterations": count,
+        "throughput_rps": round(count / (sum(timings) / 1000), 1),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def wait_until_ready(client, timeout: float = 120.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        body = client.get("/api/_ready").json()
+        if body["ready"]:
+            return
+        if body["error"]:
+            raise SystemExit(f"worker warm-up failed: {body['error']}")
+        time.sleep(0.05)
+    raise SystemExit(f"worker not ready after {timeout}s")
+
+
+def load_fixtures(engine, client) -> Fixtures:
+    from sqlalchemy import func, select
+
+    from app.models.customer import CustomerModel
+    from app.models.estimate import EstimateModel
+    from app.models.item import ItemModel
+
+    with engine.connect() as conn:
+        estimates = conn.execute(
+            select(EstimateModel.id, EstimateModel.number)
+            .order_by(func.random())
+            .limit(SAMPLE_SIZE)
+        ).all()
+        customers = conn.execute(
+            select(CustomerModel.id, CustomerModel.name)
+            .order_by(func.random())
+            .limit(SAMPLE_SIZE)
+        ).all()
+        items = conn.scalars(
+            select(ItemModel.name).order_by(func.random()).limit(SAMPLE_SIZE)
+        ).all()
+        latest = conn.scalar(select(func.max(EstimateModel.date)))
+    if not estimates or not customers or not items:
+        raise SystemExit("benchmark database has no estimates, customers or items")
+
+    fx = Fixtures(
+        estimate_ids=[row.id for row in estimates],
+        numbers=[row.number for row in estimates],
+        customer_ids=[row.id for row in customers],
+        customer_prefixes=sorted({row.name[:3] for row in customers}),
+        item_prefixes=sorted({name[:3] for name in items}),
+        latest=latest or date.today(),
+    )
+    first_page = client.get("/api/estimates", params={"limit": 50})
+    fx.next_cursor = first_page.headers.get("X-Next-Cursor", "")
+    return fx
+
+
+def high_water_marks(engine) -> dict:
+    from sqlalchemy import func, select
+
+    from app.models.customer import CustomerModel
+    from app.models.estimate import EstimateModel
+    from app.models.item import ItemModel
+
+    with engine.connect() as conn:
+        return {
+            model: conn.scalar(select(func.coalesce(func.max(model.id), 0)))
+            for model in (EstimateModel, CustomerModel, ItemModel)
+        }
+
+
+def snapshot_rows(engine, estimate_ids: list[int]) -> dict:
+    """The rows the update scenarios can change, as they were before the run."""
+    from sqlalchemy import select
+
+    from app.models.estimate import EstimateModel, LineItemModel
+
+    with engine.connect() as conn:
+        return {
+            model: conn.execute(
+                select(model.__table__).where(column.in_(estimate_ids))
+            )
+            .mappings()
+            .all()
+            for model, column in (
+                (EstimateModel, EstimateModel.id),
+                (LineItemModel, LineItemModel.estimate_id),
+            )
+        }
+
+
+def restore_rows(engine, marks: dict, snapshot: dict) -> None:
+    """Undo the write scenarios, so reruns see the same data.
+
+    Rows above the high-water ``marks`` were inserted by the run and are
+    deleted. The sampled estimates the update scenarios aim at are put back
+    from ``snapshot``, line items included.
+    """
+    from sqlalchemy import delete, insert
+
+    from app.models.estimate import EstimateModel, LineItemModel
+    from app.stats import rebuild_estimate_stats
+
+    ids = [row["id"] for row in snapshot.get(EstimateModel, [])]
+    with engine.begin() as conn:
+        conn.execute(
+            delete(LineItemModel).where(
+                (LineItemModel.estimate_id > marks[EstimateModel])
+                | LineItemModel.estimate_id.in_(ids)
+            )
+        )
+        for model, mark in marks.items():
+            conn.execute(delete(model).where(model.id > mark))
+        if ids:
+            conn.execute(delete(EstimateModel).where(EstimateModel.id.in_(ids)))
+            for model in (EstimateModel, LineItemModel):
+                if snapshot[model]:
+                    conn.execute(insert(model.__table__), snapshot[model])
+        rebuild_estimate_stats(conn)
+
+
+# ── Budgets ─────────────────────────────────────────────────────────────────
+
+
+def check(
+    results: dict, budgets: dict, baseline: dict, max_regression: float
+) -> list[str]:
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget is not None and result["p95_ms"] > budget:
+            failures.append(
+                f"{name}: p95 {result['p95_ms']} ms over budget {budget} ms"
+            )
+        before = baseline.get(name)
+        if before is None:
+            continue
+        limit = before["p95_ms"] * (1 + max_regression)
+        if (
+            result["p95_ms"] > limit
+            and result["p95_ms"] - before["p95_ms"] > MIN_REGRESSION_MS
+        ):
+            failures.append(
+                f"{name}: p95 {result['p95_ms']} ms regressed from "
+                f"{before['p95_ms']} ms (limit {limit:.2f} ms)"
+            )
+    return failures
+
+
+def print_table(results: dict) -> None:
+    width = max(len(name) for name in results)
+    header = f"{'route':<{width}}  {'req/s':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<{width}}  {r['throughput_rps']:>8.1f}  {r['p50_ms']:>8.2f}  "
+            f"{r['p95_ms']:>8.2f}  {r['p99_ms']:>8.2f}"
+        )
+
+
+# ── Entry point ─────────────────────────────────────────────────────────────
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scale", choices=SCALE_NAMES, default="1k")
+    parser.add_argument(
+        "--database-url", help="Default: a per-scale SQLite file in the temp dir"
+    )
+    parser.add_argument("--fresh", action="store_true", help="Drop all tables first")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", default="", help="Run routes containing this text")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache")
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_FILE)
+    parser.add_argument("--baseline", type=Path, help="Earlier --output file")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or (
+        f"sqlite:///{Path(tempfile.gettempdir()) / f'wave-bench-{args.scale}.db'}"
+    )
+    # The app reads its configuration at import time.
+    os.environ["DATABASE_URL"] = database_url
+    if not args.cache:
+        os.environ["CACHE_TTL"] = "0"
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+
+    from fastapi.testclient import TestClient
+
+    from app.database import Base, engine
+    from app.datagen import SCALES, estimate_count, generate
+    from app.manage import migrate
+    from main import app
+
+    if args.fresh:
+        Base.metadata.drop_all(bind=engine)
+    migrate()
+    existing = estimate_count(engine)
+    if existing == 0:
+        scale = SCALES[args.scale]
+        print(f"Generating {args.scale} data set in {engine.url!r} ...", flush=True)
+        start = time.perf_counter()
+        generate(engine, scale.customers, scale.items, scale.estimates)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+    else:
+        print(f"Reusing {existing:,} estimates in {engine.url!r}")
+
+    scenarios = [s for s in SCENARIOS if args.only in s.name]
+    results: dict[str, dict] = {}
+    marks = high_water_marks(engine)
+    snapshot: dict = {}
+    try:
+        with TestClient(app) as client:
+            wait_until_ready(client)
+            fx = load_fixtures(engine, client)
+            snapshot = snapshot_rows(engine, fx.estimate_ids)
+            for scenario in scenarios:
+                results[scenario.name] = run_scenario(
+                    client, scenario, fx, args.iterations, args.warmup
+                )
+    finally:
+        restore_rows(engine, marks, snapshot)
+
+    print()
+    print_table(results)
+
+    all_budgets = json.loads(args.budgets.read_text()) if args.budgets.exists() else {}
+    baseline = {}
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+    failures = check(
+        results, all_budgets.get(args.scale, {}), baseline, args.max_regression
+    )
+
+    if args.output:
+        report = {
+            "scale": args.scale,
+            "dialect": engine.dialect.name,
+            "estimates": estimate_count(engine),
+            "cache": args.cache,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nAll routes within budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Search latency: trigram index versus the ``ILIKE '%term%'`` scan it replaced.
+
+Fills a database with ``--customers`` customers and ``--estimates``
+estimates (default 100k and 1M; generated once and reused), then times
+the two search paths of ``app.search`` for a set of terms taken from the
+data:
+
+* ``ranked``: ``ranked_ids``, as used by ``/api/estimates/search`` and the
+  ``?search=`` list filters' ranking,
+* ``filter``: the ``contains`` substring filter behind ``?search=``.
+
+Each runs against the index (FTS5 trigram on SQLite, ``pg_trgm`` on
+PostgreSQL) and, for comparison, with the index switched off. That is the
+``LOWER(col) LIKE '%term%'`` scan every keystroke used to cost.
+
+    python -m benchmarks.search
+    python -m benchmarks.search --customers 5000 --estimates 100000
+    python -m benchmarks.search --database-url postgresql://.../bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+LIMIT = 10
+
+
+def _terms(names: list[str], rng: random.Random) -> dict[str, str]:
+    """Prefix, inner substring and one-typo variants of real values."""
+    name = rng.choice([n for n in names if len(n) >= 5])
+    typo = list(name[:5])
+    typo[2], typo[3] = typo[3], typo[2]
+    return {
+        "prefix": name[:3],
+        "substring": name[1:5],
+        "typo": "".join(typo),
+    }
+
+
+async def _time(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+async def _run(repeat: int, seed: int) -> list[tuple]:
+    from sqlalchemy import func, select
+
+    from app import search as search_index
+    from app.database import AsyncSessionLocal, async_engine
+    from app.models.customer import CustomerModel
+    from app.models.estimate import EstimateModel
+
+    rng = random.Random(seed)
+    targets = [
+        ("customers", CustomerModel.name),
+        ("estimates", EstimateModel.number),
+    ]
+    rows = []
+    async with AsyncSessionLocal() as db:
+        for target, column in targets:
+            sample = list(
+                await db.scalars(select(column).order_by(func.random()).limit(200))
+            )
+            for kind, term in _terms(sample, rng).items():
+                table, _ = search_index.TARGETS[target]
+                timings = {}
+                for mode in ("index", "scan"):
+                    saved = search_index._available.get(table, False)
+                    if mode == "scan":
+                        search_index._available[table] = False
+
+                    async def ranked():
+                        await search_index.ranked_ids(db, target, term, LIMIT)
+
+                    async def filtered():
+                        where = search_index.contains(db, target, column, term)
+                        stmt = select(column.class_.id).where(where).limit(LIMIT)
+                        await db.execute(stmt)
+
+                    try:
+                        timings[mode] = (
+                            await _time(ranked, repeat),
+                            await _time(filtered, repeat),
+                        )
+                    finally:
+                        search_index._available[table] = saved
+                rows.append((target, kind, term, timings))
+    await async_engine.dispose()
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--database-url", help="Default: a SQLite file in temp dir")
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=5_000)
+    parser.add_argument("--estimates", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    name = f"wave-search-{args.customers}c-{args.estimates}e.db"
+    os.environ["DATABASE_URL"] = args.database_url or (
+        f"sqlite:///{Path(tempfile.gettempdir()) / name}"
+    )
+
+    from sqlalchemy import func, select
+
+    from app.database import engine
+    from app.datagen import estimate_count, generate
+    from app.manage import migrate
+    from app.models.customer import CustomerModel
+    from app.search import detect_search_indexes
+
+    migrate()
+    if estimate_count(engine) == 0:
+        print(f"Generating data in {engine.url!r} ...", flush=True)
+        start = time.perf_counter()
+        generate(engine, args.customers, args.items, args.estimates)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+    with engine.connect() as conn:
+        detect_search_indexes(conn)
+        customers = conn.scalar(select(func.count()).select_from(CustomerModel))
+
+    rows = asyncio.run(_run(args.repeat, args.seed))
+
+    print(
+        f"{customers:,} customers, {estimate_count(engine):,} estimates "
+        f"({engine.dialect.name}), limit {LIMIT}, p50 / p95 ms over {args.repeat}"
+    )
+    print(
+        f"  {'target':<10} {'term':<18} {'ranked idx':>15} {'ranked scan':>15} "
+        f"{'filter idx':>15} {'filter scan':>15}"
+    )
+    for target, kind, term, t in rows:
+        cells = [t["index"][0], t["scan"][0], t["index"][1], t["scan"][1]]
+        print(
+            f"  {target:<10} {kind + ' ' + repr(term):<18} "
+            + " ".join(f"{p50:>7.2f} /{p95:>6.2f}" for p50, p95 in cells)
+        )
+
+
+if __name__ == "__main__":
+    main()
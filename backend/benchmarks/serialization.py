@@ -0,0 +1,161 @@
+"""
+Serialization micro-benchmark: CPU cost of turning 1k estimates into JSON.
+
+Builds in-memory estimate graphs (customer plus a few lines each, no
+database) and times three paths from loaded ORM objects to response bytes:
+
+* ``models+jsonable_encoder``: the old path. Validates ``EstimateOut`` /
+  ``CustomerOut`` / ``LineItemOut`` models, then
+  ``jsonable_encoder`` + ``json.dumps`` (what the response cache did).
+* ``models+revalidate``: the old path for uncached handlers. The models
+  are dumped and validated again against the ``response_model`` before
+  encoding (FastAPI's behaviour for returned models on older releases).
+* ``rows+orjson``: the current path. ``_estimate_row`` dicts rendered by
+  ``ORJSONResponse``.
+
+    python -m benchmarks.serialization --estimates 1000 --lines 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.models.customer import CustomerModel  # noqa: E402
+from app.models.estimate import EstimateModel, LineItemModel  # noqa: E402
+from app.responses import ORJSONResponse  # noqa: E402
+from app.routers.estimates import _estimate_row, _format_amount  # noqa: E402
+from app.schemas.customer import CustomerOut  # noqa: E402
+from app.schemas.estimate import EstimateOut, LineItemOut  # noqa: E402
+
+
+def make_estimates(count: int, lines: int, seed: int = 0) -> list[EstimateModel]:
+    rng = random.Random(seed)
+    customers = [
+        CustomerModel(
+            id=n,
+            name=f"Customer {n}",
+            email=f"c{n}@example.com",
+            phone="0700000000",
+            first_name="Customer",
+            last_name=str(n),
+        )
+        for n in range(1, 51)
+    ]
+    estimates = []
+    for n in range(count):
+        customer = rng.choice(customers)
+        day = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+        items = [
+            LineItemModel(
+                id=n * lines + k,
+                item_id=rng.randrange(1, 100),
+                name=f"Item {k}",
+                description="Description",
+                quantity=rng.randint(1, 5),
+                price=Decimal(rng.randrange(100, 100_000)) / 100,
+            )
+            for k in range(lines)
+        ]
+        estimates.append(
+            EstimateModel(
+                id=n + 1,
+                number=str(45303 + n),
+                date=day,
+                valid_until=day + timedelta(days=30),
+                status="Saved",
+                type="active",
+                notes="",
+                customer_id=customer.id,
+                customer_rel=customer,
+                line_items=items,
+                total=sum(li.price * li.quantity for li in items),
+                version=1,
+            )
+        )
+    return estimates
+
+
+def _legacy_estimate_to_out(est: EstimateModel) -> EstimateOut:
+    customer_out = None
+    if est.customer_rel:
+        customer_out = CustomerOut.model_validate(est.customer_rel)
+    return EstimateOut(
+        id=est.id,
+        number=est.number,
+        date=est.date.isoformat(),
+        valid_until=est.valid_until.isoformat() if est.valid_until else "",
+        status=est.status,
+        type=est.type,
+        customer=est.customer_rel.name if est.customer_rel else "",
+        amount=_format_amount(est.total),
+        notes=est.notes or "",
+        customer_id=est.customer_id,
+        customer_obj=customer_out,
+        items=[LineItemOut.model_validate(li) for li in est.line_items],
+        version=est.version,
+    )
+
+
+_response_adapter = TypeAdapter(List[EstimateOut])
+
+
+def models_jsonable_encoder(estimates: list[EstimateModel]) -> bytes:
+    payload = [_legacy_estimate_to_out(e) for e in estimates]
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def models_revalidate(estimates: list[EstimateModel]) -> bytes:
+    payload = [_legacy_estimate_to_out(e) for e in estimates]
+    dumped = [m.model_dump() for m in payload]
+    value = _response_adapter.validate_python(dumped, from_attributes=True)
+    return JSONResponse(_response_adapter.dump_python(value, mode="json")).body
+
+
+def rows_orjson(estimates: list[EstimateModel]) -> bytes:
+    return ORJSONResponse([_estimate_row(e) for e in estimates]).body
+
+
+PATHS = {
+    "models+jsonable_encoder": models_jsonable_encoder,
+    "models+revalidate": models_revalidate,
+    "rows+orjson": rows_orjson,
+}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--estimates", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=4, help="Lines per estimate")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    estimates = make_estimates(args.estimates, args.lines)
+    bodies = {name: fn(estimates) for name, fn in PATHS.items()}
+
+    per_1k = 1000 / args.estimates
+    baseline = None
+    print(f"{args.estimates} estimates x {args.lines} lines, best of {args.repeat}")
+    for name, fn in PATHS.items():
+        best = min(timeit.repeat(lambda: fn(estimates), number=1, repeat=args.repeat))
+        ms = best * 1000 * per_1k
+        baseline = baseline or ms
+        print(
+            f"  {name:<24} {ms:>8.2f} ms per 1k  "
+            f"({baseline / ms:>4.1f}x)  {len(bodies[name]):>9,} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
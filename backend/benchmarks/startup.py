@@ -0,0 +1,151 @@
+"""
+Worker startup-time benchmark.
+
+Starts ``uvicorn main:app`` as a fresh process several times and measures
+how long each one takes to accept connections (the first HTTP answer) and
+to report ready (``GET /api/_ready`` answers 200). The worker's own phase
+timings from the readiness body are averaged alongside. The run fails
+(exit 1) when the median time to ready exceeds the ``startup`` budget in
+``budgets.json``.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --database-url postgresql://.../bench --runs 10
+    python -m benchmarks.startup --migrate     # boot-time migrate + seed
+
+The database must already have its schema (``python -m app.manage
+migrate``), unless ``--migrate`` is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.run import BUDGETS_FILE
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+POLL_INTERVAL = 0.005
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_once(env: dict, timeout: float) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/_ready"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    listening = None
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                if proc.poll() is not None:
+                    raise RuntimeError(
+                        "worker exited during startup:\n" + proc.stderr.read().decode()
+                    )
+                try:
+                    response = client.get(url)
+                except httpx.TransportError:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                now = time.perf_counter()
+                listening = listening or now
+                body = response.json()
+                if response.status_code == 200:
+                    return {
+                        "listening_ms": (listening - start) * 1000,
+                        "ready_ms": (now - start) * 1000,
+                        "phases_ms": body["phases_ms"],
+                    }
+                if body.get("error"):
+                    raise RuntimeError(f"warm-up failed: {body['error']}")
+                time.sleep(POLL_INTERVAL)
+        raise RuntimeError(f"worker not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--database-url", help="Default: the 1k benchmark SQLite file")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--migrate", action="store_true", help="Set AUTO_MIGRATE=1 SEED_DATABASE=1"
+    )
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_FILE)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url or (
+        f"sqlite:///{Path(tempfile.gettempdir()) / 'wave-bench-1k.db'}"
+    )
+    env["RECEIPT_WORKERS"] = env.get("RECEIPT_WORKERS", "0")
+    if args.migrate:
+        env.update(AUTO_MIGRATE="1", SEED_DATABASE="1")
+
+    runs = [measure_once(env, args.timeout) for _ in range(args.runs)]
+    listening = [r["listening_ms"] for r in runs]
+    ready = [r["ready_ms"] for r in runs]
+    phases = {
+        name: round(statistics.mean(r["phases_ms"][name] for r in runs), 1)
+        for name in runs[0]["phases_ms"]
+    }
+    result = {
+        "runs": args.runs,
+        "migrate": args.migrate,
+        "listening_ms": {
+            "median": round(statistics.median(listening), 1),
+            "max": round(max(listening), 1),
+        },
+        "ready_ms": {
+            "median": round(statistics.median(ready), 1),
+            "max": round(max(ready), 1),
+        },
+        "phases_ms": phases,
+    }
+
+    for label in ("listening_ms", "ready_ms"):
+        stats = result[label]
+        print(
+            f"{label[:-3]:<10} median {stats['median']:>8.1f} ms  "
+            f"max {stats['max']:>8.1f} ms"
+        )
+    for name, ms in phases.items():
+        print(f"  {name:<16} {ms:>8.1f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+
+    budgets = json.loads(args.budgets.read_text()) if args.budgets.exists() else {}
+    budget = budgets.get("startup", {}).get("ready_ms")
+    if budget is not None and result["ready_ms"]["median"] > budget:
+        print(f"\nFAILED: median time to ready over budget {budget} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Sync twin of the hot read endpoints, for ``benchmarks.load``.
+
+The routers moved to the async engine. This app serves the same three reads
+the old way: plain ``def`` handlers on the sync ``SessionLocal``, run in
+Starlette's threadpool, each holding a worker thread for its whole database
+round trip. The queries and serialization are the async routers' own, so
+only the execution model differs.
+
+    uvicorn benchmarks.sync_app:app
+"""
+
+from fastapi import Depends, FastAPI, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.customer import CustomerModel
+from app.models.estimate import EstimateModel
+from app.responses import ORJSONResponse
+from app.routers.estimates import (
+    _estimate_query,
+    _estimate_row,
+    _summary_query,
+    _summary_row,
+)
+from app.schemas.customer import CustomerOut
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+
+@app.get("/api/_ready")
+def get_readiness():
+    return {"ready": True}
+
+
+@app.get("/api/estimates/summary")
+def list_estimate_summaries(
+    limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)
+):
+    rows = db.execute(
+        _summary_query()
+        .order_by(EstimateModel.date.desc(), EstimateModel.id.desc())
+        .limit(limit)
+    )
+    return ORJSONResponse([_summary_row(r) for r in rows])
+
+
+@app.get("/api/estimates/{estimate_id}")
+def get_estimate(estimate_id: int, db: Session = Depends(get_db)):
+    est = db.scalar(_estimate_query().where(EstimateModel.id == estimate_id))
+    if not est:
+        raise HTTPException(404, "Estimate not found")
+    return ORJSONResponse(_estimate_row(est))
+
+
+@app.get("/api/customers")
+def list_customers(limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    rows = db.scalars(select(CustomerModel).order_by(CustomerModel.id).limit(limit))
+    return ORJSONResponse(
+        [CustomerOut.model_validate(c).model_dump() for c in rows]
+    )
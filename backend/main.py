@@ -1,20 +1,27 @@
 """
 Wave Estimates – FastAPI Backend
 =================================
-Thin entry point: creates the app, registers routers, runs seed on startup.
+Thin entry point: creates the app and registers routers. Schema setup and
+seeding are ``python -m app.manage`` commands; see ``app.startup``.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 
+# First, so the readiness clock includes every other import.
+from app.startup import prepare_database, readiness, warm_up
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import Base, SessionLocal, engine
-from app.routers import customers, estimates, items
-from app.seed import seed_database
-
-# Import models so Base.metadata knows about all tables
-import app.models  # noqa: F401
+from app.archive import ARCHIVE_INTERVAL, archive_periodically
+from app.database import async_engine, engine
+from app.events import end_streams_on_exit, estimate_events
+from app.metrics import TimingMiddleware, instrument_engine
+from app.pagination import NEXT_CURSOR_HEADER
+from app.receipts import shutdown_pool
+from app.responses import ORJSONResponse
+from app.routers import customers, estimates, items, system
 
 
 # ── App lifecycle ───────────────────────────────────────────────────────────
@@ -22,18 +29,31 @@ import app.models  # noqa: F401
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        seed_database(db)
-    finally:
-        db.close()
+    readiness.phase_done("import")
+    prepare_database()
+    end_streams_on_exit()
+    tasks = [asyncio.create_task(warm_up())]
+    if ARCHIVE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(archive_periodically()))
     yield
+    estimate_events.close()
+    for task in tasks:
+        task.cancel()
+    shutdown_pool()
+    await async_engine.dispose()
 
 
 # ── App creation ────────────────────────────────────────────────────────────
 
-app = FastAPI(title="Wave Estimates API", version="1.0.0", lifespan=lifespan)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+app = FastAPI(
+    title="Wave Estimates API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,13 +61,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
 )
+app.add_middleware(TimingMiddleware)
 
 # ── Register routers ───────────────────────────────────────────────────────
 
 app.include_router(customers.router)
 app.include_router(items.router)
 app.include_router(estimates.router)
+app.include_router(system.router)
+app.include_router(system.metrics_router)
 
 
 # ── Run ─────────────────────────────────────────────────────────────────────
@@ -0,0 +1,83 @@
+"""
+Test setup: a scratch SQLite database, migrated and seeded once per session.
+
+The environment is set before anything from ``app`` is imported, since the
+engines and caches read it at import time. The response cache is off
+(``CACHE_TTL=0``) so tests see the database; cache tests build their own.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="wave-tests-")
+atexit.register(shutil.rmtree, _TMP, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/test.db"
+os.environ["CACHE_TTL"] = "0"
+os.environ["RECEIPT_WORKERS"] = "0"
+# SQLite's busy timeout: the concurrency tests queue many writers on one file.
+os.environ["DB_STATEMENT_TIMEOUT_MS"] = "30000"
+os.environ.pop("AUTO_MIGRATE", None)
+os.environ.pop("SEED_DATABASE", None)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete, event  # noqa: E402
+
+from app import manage  # noqa: E402
+from app.database import SessionLocal, async_engine  # noqa: E402
+from app.models.archive import (  # noqa: E402
+    ArchivedEstimateModel,
+    ArchivedLineItemModel,
+)
+from app.models.estimate import EstimateModel, LineItemModel  # noqa: E402
+from app.models.stats import EstimateStatsModel  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    manage.migrate()
+    manage.seed()
+    from main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def empty_estimates(client, db):
+    """Start the test with no estimates (hot or archived) and no stats."""
+    for model in (
+        ArchivedLineItemModel,
+        ArchivedEstimateModel,
+        LineItemModel,
+        EstimateModel,
+        EstimateStatsModel,
+    ):
+        db.execute(delete(model))
+    db.commit()
+    yield
+
+
+
+@pytest.fixture
+def statements():
+    """``(sql, parameters)`` of every statement the app runs during the test."""
+    captured = []
+
+    def capture(conn, cursor, statement, params, context, executemany):
+        captured.append((statement, params))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
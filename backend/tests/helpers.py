@@ -0,0 +1,16 @@
+"""Small helpers shared by the API tests."""
+
+import re
+
+
+def query_count(response) -> int:
+    """Statements the request ran, from its ``Server-Timing`` header."""
+    match = re.search(r'(\d+) queries', response.headers["server-timing"])
+    return int(match.group(1))
+
+
+def new_estimate(client, **fields) -> dict:
+    body = {"customer_id": 1, "items": [], **fields}
+    response = client.post("/api/estimates", json=body)
+    assert response.status_code == 201, response.text
+    return response.json()
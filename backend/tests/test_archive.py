@@ -0,0 +1,85 @@
+import io
+import zipfile
+from datetime import date, timedelta
+
+from app.archive import run_archival
+from app.database import engine
+from app.stats import rebuild_estimate_stats, stats_stale
+from helpers import new_estimate
+
+EXPIRED = (date.today() - timedelta(days=365)).isoformat()
+LINE = {"name": "Labour", "quantity": 1, "price": 10}
+
+
+def _archive(client) -> int:
+    return client.portal.call(run_archival)
+
+
+def test_archived_ids_are_not_handed_out_again(client, empty_estimates):
+    expired = [
+        new_estimate(client, valid_until=EXPIRED, items=[LINE]) for _ in range(3)
+    ]
+    newest = new_estimate(client, items=[LINE])
+    assert _archive(client) == 3
+    assert client.delete(f"/api/estimates/{newest['id']}").status_code == 204
+
+    fresh = new_estimate(client, valid_until=EXPIRED, items=[LINE])
+    assert fresh["id"] > newest["id"]
+    assert fresh["items"][0]["id"] > newest["items"][0]["id"]
+
+    listed = client.get(
+        "/api/estimates/summary", params={"include_archived": True}
+    ).json()
+    ids = [row["id"] for row in listed]
+    assert sorted(ids) == sorted(e["id"] for e in expired + [fresh])
+
+    assert _archive(client) == 1
+    assert client.get(f"/api/estimates/{fresh['id']}").json()["number"] == (
+        fresh["number"]
+    )
+
+
+def test_batch_reads_find_archived_estimates(client, empty_estimates):
+    cold = new_estimate(client, valid_until=EXPIRED, items=[LINE])
+    hot = new_estimate(client, items=[LINE])
+    assert _archive(client) == 1
+
+    keys = [str(cold["id"]), cold["number"], hot["number"]]
+    body = client.post("/api/estimates/batch-get", json={"keys": keys}).json()
+    assert [r["estimate"]["id"] for r in body["results"]] == [
+        cold["id"],
+        cold["id"],
+        hot["id"],
+    ]
+    assert body["missing"] == []
+
+    ids = [cold["id"], hot["id"], 10**6]
+    response = client.post("/api/estimates/receipts", json={"ids": ids})
+    assert response.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert names == [f"estimate-{e['number']}.html" for e in (cold, hot)]
+
+
+def test_archiving_leaves_stats_alone(client, empty_estimates):
+    old = date.today() - timedelta(days=400)
+    for customer_id in (1, 2):
+        new_estimate(
+            client,
+            date=old.isoformat(),
+            valid_until=EXPIRED,
+            customer_id=customer_id,
+            items=[LINE],
+        )
+    new_estimate(client, items=[LINE])
+    ranges = [{}, {"date_from": old.isoformat(), "date_to": old.isoformat()}]
+    before = [client.get("/api/estimates/stats", params=p).json() for p in ranges]
+    assert before[1]["count"] == 2
+
+    assert _archive(client) == 2
+    after = [client.get("/api/estimates/stats", params=p).json() for p in ranges]
+    assert after == before
+
+    with engine.begin() as conn:
+        assert not stats_stale(conn)
+        rebuild_estimate_stats(conn)
+    assert client.get("/api/estimates/stats").json() == before[0]
@@ -0,0 +1,101 @@
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from app.cache import response_cache
+from app.database import engine
+from app.events import estimate_events
+from app.models.estimate import LineItemModel
+from app.stats import rebuild_estimate_stats
+from helpers import new_estimate
+
+LINE = {"name": "Labour", "quantity": 2, "price": "10.00"}
+
+
+def _recorded(monkeypatch, target, name: str, is_async: bool = False) -> list:
+    """Wrap ``target.name`` so every call's positional args are kept."""
+    calls = []
+    original = getattr(target, name)
+
+    if is_async:
+
+        async def wrapper(*args):
+            calls.append(args)
+            return await original(*args)
+
+    else:
+
+        def wrapper(*args):
+            calls.append(args)
+            return original(*args)
+
+    monkeypatch.setattr(target, name, wrapper)
+    return calls
+
+
+def test_batch_reports_each_operation(client, db, empty_estimates, monkeypatch):
+    sent, gone, stale, same = (new_estimate(client, items=[LINE]) for _ in range(4))
+    client.put(f"/api/estimates/{stale['id']}", json={"notes": "edited"})
+    deleted_keys = _recorded(monkeypatch, response_cache.backend, "delete")
+    published = _recorded(monkeypatch, estimate_events.backend, "append", True)
+
+    operations = [
+        {"op": "status", "id": sent["id"], "status": "Sent"},
+        {"op": "delete", "id": gone["id"], "version": gone["version"]},
+        {"op": "status", "id": stale["id"], "status": "Sent", "version": 1},
+        {"op": "delete", "id": 10**6},
+        {"op": "status", "id": same["id"], "status": "Draft"},
+    ]
+    response = client.post("/api/estimates/batch", json={"operations": operations})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [r["code"] for r in body["results"]] == [200, 204, 409, 404, 200]
+    assert (body["succeeded"], body["failed"]) == (3, 2)
+    assert body["results"][0]["version"] == sent["version"] + 1
+    assert body["results"][4]["version"] == same["version"]
+
+    assert client.get(f"/api/estimates/{sent['id']}").json()["status"] == "Sent"
+    assert client.get(f"/api/estimates/{gone['id']}").status_code == 404
+    assert client.get(f"/api/estimates/{stale['id']}").json()["status"] == "Draft"
+    lines = select(func.count()).where(LineItemModel.estimate_id == gone["id"])
+    assert db.scalar(lines) == 0
+
+    # One invalidation and one event per estimate actually written.
+    evicted = Counter(key for call in deleted_keys for key in call)
+    for est in (sent, gone):
+        assert evicted[f"estimates:get:{est['id']}"] == 1
+    for est in (stale, same):
+        assert evicted[f"estimates:get:{est['id']}"] == 0
+    events = [(kind, data["id"]) for call in published for kind, data in call[0]]
+    assert events == [
+        ("estimate.status", sent["id"]),
+        ("estimate.deleted", gone["id"]),
+    ]
+
+
+def test_batch_keeps_stats_consistent(client, empty_estimates):
+    made = [new_estimate(client, items=[LINE]) for _ in range(4)]
+    operations = [
+        {"op": "status", "id": made[0]["id"], "status": "Approved"},
+        {"op": "status", "id": made[1]["id"], "status": "Sent"},
+        {"op": "delete", "id": made[2]["id"]},
+    ]
+    client.post("/api/estimates/batch", json={"operations": operations})
+
+    incremental = client.get("/api/estimates/stats").json()
+    assert incremental["count"] == 3
+    assert incremental["total"] == 60.0
+    assert {b["key"]: b["count"] for b in incremental["by_status"]} == {
+        "Approved": 1,
+        "Sent": 1,
+        "Draft": 1,
+    }
+    assert {b["key"]: b["count"] for b in incremental["by_type"]} == {
+        "active": 2,
+        "draft": 1,
+    }
+
+    with engine.begin() as conn:
+        rebuild_estimate_stats(conn)
+    assert client.get("/api/estimates/stats").json() == incremental
@@ -0,0 +1,35 @@
+import pytest
+
+from helpers import new_estimate
+
+ODD_KEYS = ["²", "٣", "1_0", "+1", "99999999999999999999"]
+
+
+def test_batch_get_resolves_ids_and_numbers(client):
+    est = new_estimate(client)
+    keys = [str(est["id"]), est["number"], "no-such-key", str(est["id"])]
+    response = client.post("/api/estimates/batch-get", json={"keys": keys})
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["estimate"] and r["estimate"]["id"] for r in body["results"]] == [
+        est["id"],
+        est["id"],
+        None,
+        est["id"],
+    ]
+    assert body["missing"] == ["no-such-key"]
+
+
+def test_keys_that_are_not_plain_digits_are_numbers_not_ids(client):
+    response = client.post("/api/estimates/batch-get", json={"keys": ODD_KEYS})
+    assert response.status_code == 200
+    assert response.json()["missing"] == ODD_KEYS
+
+    est = new_estimate(client, number="٤٢")
+    found = client.post("/api/estimates/batch-get", json={"keys": ["٤٢"]}).json()
+    assert found["results"][0]["estimate"]["id"] == est["id"]
+
+
+@pytest.mark.parametrize("key", ODD_KEYS)
+def test_get_with_a_key_that_is_not_plain_digits(client, key):
+    assert client.get(f"/api/estimates/{key}").status_code == 404
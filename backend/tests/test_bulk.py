@@ -0,0 +1,24 @@
+from sqlalchemy import func
+
+from app.models.customer import CustomerModel
+from app.models.item import ItemModel
+
+
+def test_unknown_references_fail_only_their_records(client, db, empty_estimates):
+    item_id = db.query(ItemModel.id).first().id
+    missing_customer = db.query(func.max(CustomerModel.id)).scalar() + 1000
+    line = {"name": "Labour", "quantity": 1, "price": 10}
+    body = [
+        {"customer_id": 1, "items": [{**line, "item_id": item_id}]},
+        {"customer_id": missing_customer, "items": [line]},
+        {"customer_id": 1, "items": [line, {**line, "item_id": 10**6}]},
+        {"customer_id": None, "items": [line]},
+    ]
+
+    result = client.post("/api/estimates/bulk", json=body).json()
+    assert result["created"] == 2
+    assert [(e["index"], e["error"]) for e in result["errors"]] == [
+        (1, f"Unknown customer_id {missing_customer}"),
+        (2, f"Unknown item_id {10**6}"),
+    ]
+    assert len(client.get("/api/estimates/summary").json()) == 2
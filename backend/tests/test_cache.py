@@ -0,0 +1,75 @@
+import asyncio
+
+from fastapi import Request, Response
+
+from app.cache import MemoryBackend, ResponseCache
+from app.cache import response_cache as app_cache
+
+
+def _request() -> Request:
+    scope = {"type": "http", "method": "GET", "headers": [], "query_string": b""}
+    return Request(scope)
+
+
+def _serve(cache: ResponseCache, key: str, build) -> Response:
+    return asyncio.run(cache.serve(_request(), Response(), key, build))
+
+
+def test_fill_that_overlaps_an_invalidation_is_not_stored():
+    cache = ResponseCache(MemoryBackend(), ttl=30)
+    key = "estimates:get:1"
+
+    async def build_then_write_commits():
+        payload = {"id": 1, "notes": "before"}  # read before the write
+        cache.invalidate_estimate(1, "45303")  # the write's invalidation
+        return payload
+
+    stale = _serve(cache, key, build_then_write_commits)
+    assert b"before" in stale.body
+    assert cache.lookup(key) is None
+
+    async def build_after_write():
+        return {"id": 1, "notes": "after"}
+
+    fresh = _serve(cache, key, build_after_write)
+    assert b"after" in fresh.body
+    assert cache.lookup(key).body == fresh.body
+
+
+def test_unrelated_fills_are_stored():
+    cache = ResponseCache(MemoryBackend(), ttl=30)
+
+    async def build():
+        return [{"id": 1}]
+
+    _serve(cache, "customers:list:", build)
+    assert cache.lookup("customers:list:") is not None
+
+
+def test_write_then_read_through_the_app_cache(client, monkeypatch):
+    monkeypatch.setattr(app_cache, "ttl", 30)
+    created = client.post("/api/estimates", json={"customer_id": 1, "notes": "v1"})
+    path = f"/api/estimates/{created.json()['id']}"
+
+    first = client.get(path)
+    assert first.json()["notes"] == "v1"
+    cached = client.get(path, headers={"If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
+
+    client.put(path, json={"notes": "v2"})
+    after = client.get(path, headers={"If-None-Match": first.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["notes"] == "v2"
+
+
+def test_padded_id_reads_see_writes(client, monkeypatch):
+    monkeypatch.setattr(app_cache, "ttl", 30)
+    est_id = client.post("/api/estimates", json={"customer_id": 1}).json()["id"]
+    padded = f"/api/estimates/00{est_id}"
+
+    assert client.get(padded).json()["status"] == "Draft"
+    client.patch(f"/api/estimates/{est_id}/status", json={"status": "Sent"})
+    assert client.get(padded).json()["status"] == "Sent"
+
+    client.delete(f"/api/estimates/{est_id}")
+    assert client.get(padded).status_code == 404
@@ -0,0 +1,51 @@
+import threading
+from collections import Counter
+
+from helpers import new_estimate
+
+THREADS = 8
+WRITES = 5
+
+
+def _append(client, path: str, tokens: list[str], retries: Counter) -> None:
+    """Read-modify-write ``notes`` with If-Match, retrying on a conflict."""
+    for token in tokens:
+        while True:
+            est = client.get(path).json()
+            response = client.put(
+                path,
+                json={"notes": f"{est['notes']} {token}".strip()},
+                headers={"If-Match": f'"{est["version"]}"'},
+            )
+            if response.status_code in (409, 412):
+                retries[token] += 1
+                continue
+            assert response.status_code == 200, response.text
+            break
+
+
+def test_contended_updates_lose_no_write(client):
+    path = f"/api/estimates/{new_estimate(client, notes='')['id']}"
+    tokens = [[f"t{t}w{w}" for w in range(WRITES)] for t in range(THREADS)]
+    retries: Counter = Counter()
+    errors: list[BaseException] = []
+
+    def run(mine: list[str]) -> None:
+        try:
+            _append(client, path, mine, retries)
+        except BaseException as exc:  # re-raised below, after join
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(mine,)) for mine in tokens]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+    assert retries, "the writers never collided"
+
+    final = client.get(path).json()
+    seen = Counter(final["notes"].split())
+    assert seen == Counter(token for mine in tokens for token in mine)
+    assert final["version"] == 1 + THREADS * WRITES
@@ -0,0 +1,57 @@
+import pytest
+
+from helpers import new_estimate, query_count
+
+LINES = [
+    {"name": "Widget", "quantity": 2, "price": 10.5},
+    {"name": "Gadget", "quantity": 1, "price": 99},
+]
+
+
+def _add(client, count: int) -> list[dict]:
+    return [new_estimate(client, items=LINES) for _ in range(count)]
+
+
+def test_list_query_count_does_not_grow_with_estimates(client, empty_estimates):
+    _add(client, 3)
+    few = client.get("/api/estimates", params={"limit": 100})
+    assert few.status_code == 200
+    assert len(few.json()) == 3
+
+    _add(client, 30)
+    many = client.get("/api/estimates", params={"limit": 100})
+    assert len(many.json()) == 33
+    assert all(len(e["items"]) == 2 and e["customer"] for e in many.json())
+
+    assert query_count(many) == query_count(few)
+
+
+def test_get_and_status_patch_load_the_graph_in_bounded_queries(
+    client, empty_estimates
+):
+    est = _add(client, 1)[0]
+    got = client.get(f"/api/estimates/{est['id']}")
+    assert len(got.json()["items"]) == 2
+    assert query_count(got) <= 3
+
+    patched = client.patch(
+        f"/api/estimates/{est['id']}/status", json={"status": "Sent"}
+    )
+    assert patched.status_code == 200
+    assert len(patched.json()["items"]) == 2
+    assert query_count(patched) <= 8
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/estimates", "/api/estimates/summary", "/api/estimates/stats"]
+)
+def test_blank_filters_are_ignored(client, empty_estimates, path):
+    _add(client, 2)
+    blank = {"date_from": "", "date_to": "", "min_amount": "", "max_amount": ""}
+    if path.endswith("stats"):
+        blank = {"date_from": "", "date_to": ""}
+
+    response = client.get(path, params=blank)
+    assert response.status_code == 200, response.text
+    assert response.json() == client.get(path).json()
+    assert client.get(path, params={"date_from": "soon"}).status_code == 422
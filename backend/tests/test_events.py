@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from app.events import EventGap, MemoryBackend
+
+
+def test_resume_reads_only_what_was_missed():
+    async def scenario():
+        backend = MemoryBackend(max_events=10)
+        first = await backend.append([("estimate.created", {"id": 1})])
+        await backend.append([("estimate.updated", {"id": 1})])
+        return await backend.read(first[0].id, timeout=0)
+
+    events = asyncio.run(scenario())
+    assert [e.type for e in events] == ["estimate.updated"]
+
+
+@pytest.mark.parametrize("seq", ["²", "٣", "-1", "99", ""])
+def test_unknown_last_event_id_is_a_gap(seq):
+    async def scenario():
+        backend = MemoryBackend(max_events=10)
+        await backend.append([("estimate.created", {"id": 1})])
+        await backend.read(f"{backend.stream}-{seq}", timeout=0)
+
+    with pytest.raises(EventGap):
+        asyncio.run(scenario())
@@ -0,0 +1,30 @@
+import pytest
+
+from app.database import engine
+
+CASES = [
+    ({}, "ix_estimates_date_id"),
+    ({"status": "Draft"}, "ix_estimates_status_date"),
+    ({"type": "draft"}, "ix_estimates_type_date"),
+    ({"date_from": "2026-01-01", "date_to": "2026-01-31"}, "ix_estimates_date_id"),
+    ({"min_amount": "100", "sort": "amount"}, "ix_estimates_total_id"),
+]
+
+
+@pytest.mark.parametrize("params, index", CASES)
+def test_list_filters_use_their_index(client, statements, params, index):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("reads SQLite's EXPLAIN QUERY PLAN")
+    response = client.get("/api/estimates/summary", params={**params, "limit": 20})
+    assert response.status_code == 200
+
+    statement, parameters = statements[-1]
+    with engine.connect() as conn:
+        plan = [
+            row[-1]
+            for row in conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        ]
+    assert any(f"estimates USING INDEX {index}" in step for step in plan), plan
+    assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), plan
@@ -0,0 +1,131 @@
+from decimal import Decimal
+
+import pytest
+
+from app.models.estimate import EstimateModel
+from helpers import new_estimate
+
+LINES = [
+    {"name": "Labour", "quantity": 2, "price": "10.00"},
+    {"name": "Paint", "quantity": 1, "price": "25.00"},
+    {"name": "Brushes", "quantity": 3, "price": "4.00"},
+]
+
+
+def _line_writes(statements) -> list[tuple[str, object]]:
+    """``(verb, parameters)`` of each statement that wrote ``line_items``."""
+    writes = []
+    for sql, params in statements:
+        verb = sql.lstrip().split(None, 1)[0].upper()
+        if verb in ("INSERT", "UPDATE", "DELETE") and "line_items" in sql:
+            writes.append((verb, params))
+    return writes
+
+
+def _batch(params) -> list:
+    """Rows of one statement, whether it ran once or as an executemany."""
+    return params if isinstance(params, list) else [params]
+
+
+@pytest.fixture
+def est(client):
+    return new_estimate(client, items=LINES)
+
+
+def test_put_writes_only_the_changed_lines(client, db, est, statements):
+    labour, paint, brushes = est["items"]
+    items = [
+        {**LINES[0], "id": labour["id"]},
+        {**LINES[1], "id": paint["id"], "price": "30.00"},
+        {"name": "Tape", "quantity": 1, "price": "5.00"},
+    ]
+    statements.clear()
+    response = client.put(f"/api/estimates/{est['id']}", json={"items": items})
+    assert response.status_code == 200
+
+    writes = _line_writes(statements)
+    assert sorted(verb for verb, _ in writes) == ["DELETE", "INSERT", "UPDATE"]
+    for verb, params in writes:
+        assert len(_batch(params)) == 1, (verb, params)
+
+    body = response.json()
+    ids = [li["id"] for li in body["items"]]
+    assert ids[:2] == [labour["id"], paint["id"]]
+    assert brushes["id"] not in ids
+    assert [li["price"] for li in body["items"]] == [10.0, 30.0, 5.0]
+    assert body["amount"] == "$55.00"
+    assert body["version"] == est["version"] + 1
+
+    stored = db.get(EstimateModel, est["id"])
+    assert (stored.total, stored.line_count) == (Decimal("55.00"), 3)
+
+
+def test_unchanged_lines_are_not_written(client, est, statements):
+    items = [{**line, "id": li["id"]} for line, li in zip(LINES, est["items"])]
+    statements.clear()
+    response = client.put(f"/api/estimates/{est['id']}", json={"items": items})
+    assert response.status_code == 200
+    assert _line_writes(statements) == []
+    assert [li["id"] for li in response.json()["items"]] == [
+        li["id"] for li in est["items"]
+    ]
+
+
+def test_patch_of_one_line_bumps_the_version(client, est, statements):
+    paint = est["items"][1]
+    statements.clear()
+    response = client.patch(
+        f"/api/estimates/{est['id']}/items",
+        json={"items": [{"id": paint["id"], "quantity": 2}], "delete": []},
+    )
+    assert response.status_code == 200
+
+    writes = _line_writes(statements)
+    assert [verb for verb, _ in writes] == ["UPDATE"]
+    assert len(_batch(writes[0][1])) == 1
+
+    body = response.json()
+    assert body["version"] == est["version"] + 1
+    assert body["amount"] == "$82.00"
+    assert [li["quantity"] for li in body["items"]] == [2, 2, 3]
+
+
+def test_other_estimates_lines_are_off_limits(client, est):
+    other = new_estimate(client, items=LINES[:1])
+    foreign = other["items"][0]["id"]
+    path = f"/api/estimates/{est['id']}"
+
+    response = client.patch(
+        f"{path}/items", json={"items": [{"id": foreign, "price": "1.00"}]}
+    )
+    assert response.status_code == 404
+    response = client.patch(f"{path}/items", json={"delete": [foreign]})
+    assert response.status_code == 404
+
+    items = [{**LINES[0], "id": foreign, "price": "1.00"}]
+    assert client.put(path, json={"items": items}).status_code == 404
+
+    assert client.get(path).json() == est
+    assert client.get(f"/api/estimates/{other['id']}").json() == other
+
+
+@pytest.mark.parametrize(
+    "method, suffix, body",
+    [
+        ("PUT", "", {"items": LINES[:1]}),
+        ("PATCH", "/items", {"items": [{"name": "Extra"}]}),
+    ],
+)
+def test_stale_versions_are_refused(client, est, method, suffix, body):
+    path = f"/api/estimates/{est['id']}{suffix}"
+    client.put(f"/api/estimates/{est['id']}", json={"notes": "moved on"})
+
+    stale = f'"{est["version"]}"'
+    response = client.request(method, path, json=body, headers={"If-Match": stale})
+    assert response.status_code == 412
+    response = client.request(method, path, json={**body, "version": est["version"]})
+    assert response.status_code == 409
+
+    current = client.get(f"/api/estimates/{est['id']}").json()
+    assert current["items"] == est["items"]
+    assert current["version"] == est["version"] + 1
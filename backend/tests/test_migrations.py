@@ -0,0 +1,147 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.migrations import run_migrations
+from app.models.estimate import EstimateModel
+from app.search import ensure_search_indexes
+
+# The estimates tables as the first release created them on SQLite.
+LEGACY_SCHEMA = [
+    "CREATE TABLE estimates (id INTEGER NOT NULL, number VARCHAR NOT NULL, "
+    "date VARCHAR NOT NULL, valid_until VARCHAR, status VARCHAR, type VARCHAR, "
+    "notes VARCHAR, customer_id INTEGER, PRIMARY KEY (id), "
+    "FOREIGN KEY(customer_id) REFERENCES customers (id))",
+    "CREATE INDEX ix_estimates_id ON estimates (id)",
+    "CREATE UNIQUE INDEX ix_estimates_number ON estimates (number)",
+    "CREATE TABLE line_items (id INTEGER NOT NULL, estimate_id INTEGER NOT NULL, "
+    "item_id INTEGER, name VARCHAR NOT NULL, description VARCHAR, "
+    "quantity INTEGER, price FLOAT, PRIMARY KEY (id), "
+    "FOREIGN KEY(estimate_id) REFERENCES estimates (id), "
+    "FOREIGN KEY(item_id) REFERENCES items (id))",
+    "CREATE INDEX ix_line_items_id ON line_items (id)",
+]
+
+
+@pytest.fixture
+def legacy(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_rebuild_stops_id_reuse_and_keeps_indexes(legacy):
+    with legacy.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO estimates (id, number, date, valid_until, status) "
+                "VALUES (1, '00001', '2026-01-05', '', 'Draft'), "
+                "(2, '00002', '2026-01-06', '2026-02-05', 'Saved')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO line_items (id, estimate_id, name, quantity, price) "
+                "VALUES (1, 1, 'Labour', 2, 12.5)"
+            )
+        )
+        # Ids 3-5 were archived, then handed out again before this fix.
+        conn.execute(
+            text(
+                "INSERT INTO estimates_archive (id, number, date, version, "
+                "archived_at) VALUES (5, '00005', '2025-01-01', 1, '2026-01-01')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO line_items_archive (id, estimate_id, name) "
+                "VALUES (9, 5, 'Parts')"
+            )
+        )
+        ensure_search_indexes(conn)
+
+    run_migrations(legacy)
+    run_migrations(legacy)  # idempotent
+
+    with legacy.begin() as conn:
+        for table in ("estimates", "line_items"):
+            ddl = conn.scalar(
+                text("SELECT sql FROM sqlite_master WHERE name = :t"), {"t": table}
+            )
+            assert "AUTOINCREMENT" in ddl
+        names = set(conn.scalars(text("SELECT name FROM sqlite_master")))
+        for name in ("ix_estimates_number", "ix_estimates_date_id", "estimates_fts_ai"):
+            assert name in names
+        rows = conn.execute(
+            text("SELECT id, number, version, total FROM estimates ORDER BY id")
+        ).all()
+        assert [(r.id, r.number, r.version) for r in rows] == [
+            (1, "00001", 1),
+            (2, "00002", 1),
+        ]
+        assert float(rows[0].total) == 25.0
+
+        new_id = conn.scalar(
+            text(
+                "INSERT INTO estimates (number, date, version) "
+                "VALUES ('00006', '2026-03-01', 1) RETURNING id"
+            )
+        )
+        new_line = conn.scalar(
+            text(
+                "INSERT INTO line_items (estimate_id, name) "
+                "VALUES (:e, 'Labour') RETURNING id"
+            ),
+            {"e": new_id},
+        )
+        assert new_id > 5
+        assert new_line > 9
+        found = conn.scalars(
+            text("SELECT rowid FROM estimates_fts WHERE estimates_fts MATCH '00006'")
+        ).all()
+        assert found == [new_id]
+
+
+def test_legacy_text_dates_and_float_prices_are_converted(legacy):
+    with legacy.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO estimates (id, number, date, valid_until, status) "
+                "VALUES (1, '00001', '2026-01-05', '', 'Draft'), "
+                "(2, '00002', '2026-01-06', '2026-02-05', 'Saved')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO line_items (id, estimate_id, name, quantity, price) "
+                "VALUES (1, 1, 'Labour', 3, 19.999), (2, 1, 'Parts', 1, 0.1), "
+                "(3, 2, 'Labour', 2, 12.5)"
+            )
+        )
+
+    run_migrations(legacy)
+
+    with Session(legacy) as db:
+        first, second = db.scalars(select(EstimateModel).order_by(EstimateModel.id))
+        assert first.date == date(2026, 1, 5)
+        assert first.valid_until is None
+        assert second.valid_until == date(2026, 2, 5)
+        assert [li.price for li in first.line_items] == [
+            Decimal("20.00"),
+            Decimal("0.10"),
+        ]
+        assert (first.total, first.line_count) == (Decimal("60.10"), 2)
+        assert (second.total, second.version) == (Decimal("25.00"), 1)
+
+        newest = db.scalars(
+            select(EstimateModel.number).order_by(EstimateModel.date.desc())
+        ).first()
+        assert newest == "00002"
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from app import numbering
+from app.archive import run_archival
+from helpers import new_estimate
+
+CONCURRENT_CREATES = 2000
+CREATE_WORKERS = 8
+
+
+def test_explicit_number_moves_the_counter_past_it(client):
+    auto = int(new_estimate(client)["number"])
+    new_estimate(client, number=str(auto + 1))
+    assert int(new_estimate(client)["number"]) == auto + 2
+
+    ahead = str(auto + 100)
+    body = [{"customer_id": 1, "number": ahead}, {"customer_id": 1}]
+    result = client.post("/api/estimates/bulk", json=body).json()
+    assert result["created"] == 2
+    assert int(new_estimate(client)["number"]) > int(ahead)
+
+
+def test_taken_number_is_a_conflict(client, empty_estimates):
+    hot = new_estimate(client)
+    expired = (date.today() - timedelta(days=365)).isoformat()
+    cold = new_estimate(client, number="A-1", valid_until=expired)
+    assert client.portal.call(run_archival) == 1
+
+    for number in (hot["number"], cold["number"]):
+        response = client.post(
+            "/api/estimates", json={"customer_id": 1, "number": number}
+        )
+        assert response.status_code == 409
+
+    result = client.post(
+        "/api/estimates/bulk", json=[{"customer_id": 1, "number": "A-1"}]
+    ).json()
+    assert result["created"] == 0
+    assert "Duplicate" in result["errors"][0]["error"]
+
+
+def test_reserved_number_taken_explicitly_is_skipped(client, monkeypatch):
+    # Another worker's view: a block reserved before the explicit create.
+    monkeypatch.setattr(numbering, "_allocator", numbering.NumberAllocator(10))
+    first = int(new_estimate(client)["number"])
+    new_estimate(client, number=str(first + 1))
+    assert int(new_estimate(client)["number"]) == first + 2
+
+
+@pytest.mark.slow
+def test_concurrent_creates_get_unique_numbers(client, monkeypatch):
+    monkeypatch.setattr(numbering, "_allocator", numbering.NumberAllocator(5))
+    start = int(new_estimate(client)["number"])
+    # Explicit numbers land in the range the allocated ones are drawn from.
+    bodies = [{"customer_id": 1} for _ in range(CONCURRENT_CREATES)]
+    for n in range(0, CONCURRENT_CREATES, 25):
+        bodies[n]["number"] = str(start + n + 1)
+
+    async def worker(c: httpx.AsyncClient, mine: list[dict]) -> list:
+        return [await c.post("/api/estimates", json=body) for body in mine]
+
+    async def create_all():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as c:
+            shares = [bodies[n::CREATE_WORKERS] for n in range(CREATE_WORKERS)]
+            done = await asyncio.gather(*(worker(c, mine) for mine in shares))
+        return [pair for mine, rs in zip(shares, done) for pair in zip(mine, rs)]
+
+    responses = client.portal.call(create_all)
+    created = [r.json()["number"] for _, r in responses if r.status_code == 201]
+    assert len(set(created)) == len(created)
+    for body, r in responses:
+        if "number" not in body:
+            assert r.status_code == 201, r.text
+        else:
+            # An explicit number loses only to an allocated one that got there
+            # first.
+            assert r.status_code == 201 or (
+                r.status_code == 409 and body["number"] in created
+            )
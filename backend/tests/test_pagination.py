@@ -0,0 +1,87 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from app.models.customer import CustomerModel
+from app.models.estimate import EstimateModel
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from helpers import new_estimate
+
+
+def _all_pages(client, path: str, **params) -> list[dict]:
+    rows, cursor = [], ""
+    for _ in range(50):
+        response = client.get(path, params={**params, "cursor": cursor})
+        assert response.status_code == 200, response.text
+        rows += response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return rows
+    raise AssertionError("pagination did not terminate")
+
+
+@pytest.fixture
+def null_valid_until(client, db, empty_estimates):
+    """Six estimates, three of them without a ``valid_until``."""
+    days = [date(2026, 1, 3), None, date(2026, 1, 1), None, date(2026, 1, 2), None]
+    ids = [
+        new_estimate(client, valid_until=(day or date(2026, 1, 1)).isoformat())["id"]
+        for day in days
+    ]
+    db.execute(
+        update(EstimateModel)
+        .where(EstimateModel.id.in_([i for i, d in zip(ids, days) if d is None]))
+        .values(valid_until=None)
+    )
+    db.commit()
+    return dict(zip(ids, days))
+
+
+@pytest.mark.parametrize("sort", ["valid_until", "-valid_until"])
+@pytest.mark.parametrize("path", ["/api/estimates", "/api/estimates/summary"])
+def test_keyset_pages_through_null_sort_values(client, null_valid_until, sort, path):
+    rows = _all_pages(client, path, sort=sort, limit=2)
+
+    ids = [r["id"] for r in rows]
+    assert sorted(ids) == sorted(null_valid_until)
+    # NULL sorts above every date: last ascending, first descending.
+    dated = sorted((d, i) for i, d in null_valid_until.items() if d)
+    undated = sorted(i for i, d in null_valid_until.items() if d is None)
+    if sort.startswith("-"):
+        expected = undated[::-1] + [i for _, i in dated[::-1]]
+    else:
+        expected = [i for _, i in dated] + undated
+    assert ids == expected
+
+
+def test_customer_pages_through_null_emails(client, db):
+    names = [f"Null Email {n}" for n in range(4)]
+    for n, name in enumerate(names):
+        response = client.post(
+            "/api/customers", json={"name": name, "email": f"ne{n}@example.com"}
+        )
+        assert response.status_code in (200, 201), response.text
+    db.execute(
+        update(CustomerModel)
+        .where(CustomerModel.name.in_(names[:2]))
+        .values(email=None)
+    )
+    db.commit()
+
+    total = len(_all_pages(client, "/api/customers", sort="id", limit=500))
+    for sort in ("email", "-email"):
+        rows = _all_pages(client, "/api/customers", sort=sort, limit=3)
+        assert len(rows) == total
+        assert len({r["id"] for r in rows}) == total
+
+
+@pytest.mark.parametrize("path", ["/api/estimates", "/api/estimates/summary"])
+def test_lists_are_paged_by_default(client, empty_estimates, path):
+    client.post("/api/estimates/bulk", json=[{}] * (DEFAULT_PAGE_SIZE + 1))
+
+    first = client.get(path)
+    assert len(first.json()) == DEFAULT_PAGE_SIZE
+    assert first.headers[NEXT_CURSOR_HEADER]
+    assert len(_all_pages(client, path)) == DEFAULT_PAGE_SIZE + 1
+    assert client.get(path, params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
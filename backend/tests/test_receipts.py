@@ -0,0 +1,35 @@
+import io
+import zipfile
+from urllib.parse import unquote
+
+from helpers import new_estimate
+
+
+def test_receipt_zip_entries_stay_flat(client):
+    made = [
+        new_estimate(client, number=number)
+        for number in ("../../evil", "..\\..\\evil", "/etc/passwd", "ok-1")
+    ]
+    response = client.post(
+        "/api/estimates/receipts", json={"ids": [e["id"] for e in made]}
+    )
+    assert response.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+
+    assert len(set(names)) == len(made)
+    assert names[-1] == "estimate-ok-1.html"
+    for name in names:
+        assert "/" not in name and "\\" not in name and ".." not in name
+
+
+def test_receipt_header_quotes_the_number(client):
+    est = new_estimate(client, number='q"é;\r\nX-Evil: 1')
+    response = client.get(f"/api/estimates/{est['id']}/receipt")
+    assert response.status_code == 200
+    assert "x-evil" not in response.headers
+
+    header = response.headers["content-disposition"]
+    ascii_part, utf8_part = header.split("; filename*=")
+    assert ascii_part == 'inline; filename="estimate-q_X-Evil_1.html"'
+    assert utf8_part.startswith("UTF-8''")
+    assert unquote(utf8_part[len("UTF-8''") :]) == "estimate-q_é;_X-Evil: 1.html"
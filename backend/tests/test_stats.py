@@ -0,0 +1,62 @@
+from collections import Counter
+
+from app.database import engine
+from app.stats import rebuild_estimate_stats
+from helpers import new_estimate, query_count
+
+LINE = {"name": "Labour", "quantity": 2, "price": "12.50"}
+
+
+def _stats(client, **params) -> dict:
+    response = client.get("/api/estimates/stats", params=params)
+    assert response.status_code == 200
+    assert query_count(response) == 2
+    return response.json()
+
+
+def _writes(client) -> list[dict]:
+    """Estimates spread over two months, then moved between buckets."""
+    made = [
+        new_estimate(client, date="2026-01-10", items=[LINE]),
+        new_estimate(client, date="2026-01-10", customer_id=2, items=[LINE]),
+        new_estimate(client, date="2026-02-03", customer_id=None, type="final"),
+        new_estimate(client, date="2026-02-20", items=[LINE, LINE]),
+    ]
+    client.patch(f"/api/estimates/{made[0]['id']}/status", json={"status": "Saved"})
+    client.put(f"/api/estimates/{made[1]['id']}", json={"date": "2026-02-01"})
+    client.delete(f"/api/estimates/{made[3]['id']}")
+    client.post(
+        "/api/estimates/bulk",
+        json=[{"customer_id": 2, "date": "2026-01-31", "items": [LINE]}],
+    )
+    return made
+
+
+def test_stats_follow_writes_and_match_a_rebuild(client, empty_estimates):
+    _writes(client)
+    listed = client.get("/api/estimates/summary").json()
+    incremental = _stats(client)
+
+    assert incremental["count"] == len(listed) == 4
+    assert incremental["total"] == 75.0
+    assert {b["key"]: b["count"] for b in incremental["by_status"]} == Counter(
+        e["status"] for e in listed
+    )
+    assert [(b["key"], b["count"]) for b in incremental["by_month"]] == [
+        ("2026-01", 2),
+        ("2026-02", 2),
+    ]
+    customers = {b["id"]: (b["count"], b["total"]) for b in incremental["by_customer"]}
+    assert customers == {1: (1, 25.0), 2: (2, 50.0), None: (1, 0.0)}
+
+    with engine.begin() as conn:
+        rebuild_estimate_stats(conn)
+    assert _stats(client) == incremental
+
+
+def test_stats_date_range(client, empty_estimates):
+    _writes(client)
+    january = _stats(client, date_from="2026-01-01", date_to="2026-01-31")
+    assert january["count"] == 2
+    assert [b["key"] for b in january["by_month"]] == ["2026-01"]
+    assert [b["id"] for b in january["by_customer"]] == [1, 2]
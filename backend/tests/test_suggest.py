@@ -0,0 +1,39 @@
+import string
+import timeit
+from itertools import product
+
+from app.suggest import PrefixIndex
+
+
+def _index(count: int) -> PrefixIndex[str]:
+    index: PrefixIndex[str] = PrefixIndex()
+    names = ("".join(p) for p in product(string.ascii_lowercase, repeat=4))
+    index.load(
+        (n, f"{name} Perera", name)
+        for n, name in zip(range(count), names)
+    )
+    return index
+
+
+def test_suggest_finds_prefixes_across_the_alphabet():
+    index = _index(20_000)
+    assert index.suggest("aa", k=3) == ["aaaa", "aaab", "aaac"]
+    assert index.suggest("ba", k=2) == ["baaa", "baab"]
+    # Names 0..19,999; the last is "bdpf" (19,999 = 1, 3, 15, 5 in base 26).
+    assert index.suggest("bdp", k=30)[-1] == "bdpf"
+    assert index.suggest("bdpg") == []
+    assert index.suggest("zz") == []
+    assert index.suggest("pere", k=2) == ["aaaa", "aaab"]
+
+
+def test_late_prefixes_cost_the_same_as_early_ones():
+    index = _index(100_000)
+    assert index.suggest("ezz", k=1) == ["ezza"]
+
+    def cost(prefix: str) -> float:
+        return min(timeit.repeat(lambda: index.suggest(prefix), number=20, repeat=5))
+
+    # A lookup walks at most k * SCAN_FACTOR keys from the bisect point, so
+    # its cost must not depend on how far into the list the prefix sorts.
+    assert cost("ezz") < cost("aab") * 10
+    assert cost("zz") < cost("aab") * 10
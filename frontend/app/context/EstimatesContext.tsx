@@ -13,6 +13,7 @@ import {
   createEstimate as apiCreateEstimate,
   updateEstimate as apiUpdateEstimate,
   updateEstimateStatus as apiUpdateEstimateStatus,
+  subscribeEstimateEvents,
   type EstimateData,
 } from "../utils/api";
 
@@ -46,12 +47,18 @@ export interface Estimate {
   customerObj?: EstimateCustomer;
   items?: EstimateItem[];
   customer_id?: number;
+  version: number;
 }
 
+// Estimates per request; the dashboard asks for more as the user needs them.
+const PAGE_SIZE = 100;
+
 interface EstimatesContextType {
   estimates: Estimate[];
   loading: boolean;
+  hasMore: boolean;
   refreshEstimates: () => Promise<void>;
+  loadMore: () => Promise<void>;
   addEstimate: (data: {
     number?: string;
     date?: string;
@@ -84,6 +91,7 @@ interface EstimatesContextType {
         quantity?: number;
         price?: number;
       }[];
+      version?: number;
     },
   ) => Promise<Estimate>;
   updateEstimateStatus: (id: string, status: string) => Promise<Estimate>;
@@ -102,6 +110,7 @@ function apiToEstimate(e: EstimateData): Estimate {
     type: e.type,
     validUntil: e.valid_until,
     customer_id: e.customer_id ?? undefined,
+    version: e.version,
     customerObj: e.customer_obj
       ? {
           id: e.customer_obj.id,
@@ -123,11 +132,14 @@ function apiToEstimate(e: EstimateData): Estimate {
 export function EstimatesProvider({ children }: { children: ReactNode }) {
   const [estimates, setEstimates] = useState<Estimate[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
+  // Back to the first page, e.g. after the change feed lost its place.
   const refreshEstimates = useCallback(async () => {
     try {
-      const data = await apiFetchEstimates();
-      setEstimates(data.map(apiToEstimate));
+      const page = await apiFetchEstimates({}, { limit: PAGE_SIZE });
+      setEstimates(page.rows.map(apiToEstimate));
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error("Failed to fetch estimates:", err);
     } finally {
@@ -135,16 +147,72 @@ export function EstimatesProvider({ children }: { children: ReactNode }) {
     }
   }, []);
 
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    try {
+      const page = await apiFetchEstimates(
+        {},
+        { limit: PAGE_SIZE, cursor: nextCursor },
+      );
+      const more = page.rows.map(apiToEstimate);
+      // Skip rows the change feed already added to the list.
+      setEstimates((prev) => [
+        ...prev,
+        ...more.filter((e) => !prev.some((p) => p.id === e.id)),
+      ]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to fetch more estimates:", err);
+    }
+  }, [nextCursor]);
+
   useEffect(() => {
     refreshEstimates();
   }, [refreshEstimates]);
 
+  // Apply changes made elsewhere (other tabs, other users) as they happen,
+  // instead of refetching the list. Versions only go up, so an event older
+  // than what we already show is ignored.
+  useEffect(() => {
+    const upsert = (data: EstimateData) => {
+      const est = apiToEstimate(data);
+      setEstimates((prev) =>
+        prev.some((e) => e.id === est.id)
+          ? prev.map((e) =>
+              e.id === est.id && e.version < est.version ? est : e,
+            )
+          : [est, ...prev],
+      );
+    };
+    return subscribeEstimateEvents({
+      created: upsert,
+      updated: upsert,
+      status: (change) =>
+        setEstimates((prev) =>
+          prev.map((e) =>
+            e.id === change.id && e.version < change.version
+              ? {
+                  ...e,
+                  status: change.status,
+                  type: change.type,
+                  version: change.version,
+                }
+              : e,
+          ),
+        ),
+      removed: ({ id }) =>
+        setEstimates((prev) => prev.filter((e) => e.id !== id)),
+      resync: refreshEstimates,
+    });
+  }, [refreshEstimates]);
+
   const addEstimate = async (
     data: Parameters<EstimatesContextType["addEstimate"]>[0],
   ) => {
     const created = await apiCreateEstimate(data);
     const est = apiToEstimate(created);
-    setEstimates((prev) => [est, ...prev]);
+    // The change feed may have delivered it already.
+    setEstimates((prev) => [est, ...prev.filter((e) => e.id !== est.id)]);
     return est;
   };
 
@@ -152,14 +220,20 @@ export function EstimatesProvider({ children }: { children: ReactNode }) {
     id: number,
     data: Parameters<EstimatesContextType["updateEstimate"]>[1],
   ) => {
-    const updated = await apiUpdateEstimate(id, data);
+    // Send the version this client last saw, so a concurrent edit made
+    // elsewhere is reported as a conflict instead of being overwritten.
+    const version = estimates.find((e) => e.id === id)?.version;
+    const updated = await apiUpdateEstimate(id, { version, ...data });
     const est = apiToEstimate(updated);
     setEstimates((prev) => prev.map((e) => (e.id === id ? est : e)));
     return est;
   };
 
   const updateEstimateStatus = async (id: string, status: string) => {
-    const updated = await apiUpdateEstimateStatus(id, status);
+    const version = estimates.find(
+      (e) => String(e.id) === id || e.number === id,
+    )?.version;
+    const updated = await apiUpdateEstimateStatus(id, status, version);
     const est = apiToEstimate(updated);
     setEstimates((prev) =>
       prev.map((e) => (String(e.id) === id || e.number === id ? est : e)),
@@ -172,7 +246,9 @@ export function EstimatesProvider({ children }: { children: ReactNode }) {
       value={{
         estimates,
         loading,
+        hasMore: nextCursor !== null,
         refreshEstimates,
+        loadMore,
         addEstimate,
         updateEstimate,
         updateEstimateStatus,
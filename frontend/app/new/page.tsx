@@ -304,6 +304,7 @@ function NewEstimateForm() {
     setErrors({});
 
     const itemsPayload = selectedItems.map((it) => ({
+      id: it.id,
       name: it.name,
       description: it.description,
       price: it.price,
@@ -15,7 +15,7 @@ import {
 } from "lucide-react";
 
 export default function Home() {
-  const { estimates, loading } = useEstimates();
+  const { estimates, loading, hasMore, loadMore } = useEstimates();
   const router = useRouter();
   const [activeTab, setActiveTab] = useState<"active" | "draft" | "all">(
     "active",
@@ -421,8 +421,17 @@ export default function Home() {
             <span>per page</span>
           </div>
           <div className="flex items-center gap-4">
+            {hasMore && (
+              <button
+                onClick={loadMore}
+                className="rounded border border-gray-300 bg-white px-3 py-1 font-semibold text-blue-600 hover:bg-gray-50"
+              >
+                Load more
+              </button>
+            )}
             <span className="font-semibold text-[#0f1f4b]">
               1–{filteredData.length} of {filteredData.length}
+              {hasMore && "+"}
             </span>
             <div className="flex items-center gap-1">
               <button
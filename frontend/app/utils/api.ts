@@ -1,5 +1,45 @@
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+// List endpoints return one page at a time; the header carries the cursor
+// for the next one and is absent on the last page.
+const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+const MAX_PAGE_SIZE = 500;
+
+export interface Page<T> {
+  rows: T[];
+  nextCursor: string | null;
+}
+
+async function fetchPage<T>(
+  path: string,
+  params: URLSearchParams,
+  what: string,
+): Promise<Page<T>> {
+  const qs = params.toString();
+  const res = await fetch(`${API_BASE}${path}${qs ? `?${qs}` : ""}`);
+  if (!res.ok) throw new Error(`Failed to fetch ${what}`);
+  return {
+    rows: await res.json(),
+    nextCursor: res.headers.get(NEXT_CURSOR_HEADER),
+  };
+}
+
+// Every page, for the pickers that filter the whole list client-side.
+async function fetchAllPages<T>(
+  path: string,
+  params: URLSearchParams,
+  what: string,
+): Promise<T[]> {
+  params.set("limit", String(MAX_PAGE_SIZE));
+  const rows: T[] = [];
+  for (;;) {
+    const page = await fetchPage<T>(path, params, what);
+    rows.push(...page.rows);
+    if (!page.nextCursor) return rows;
+    params.set("cursor", page.nextCursor);
+  }
+}
+
 // ── Customers ──────────────────────────────────────────────────────────────
 
 export interface CustomerData {
@@ -12,9 +52,17 @@ export interface CustomerData {
 }
 
 export async function fetchCustomers(search = ""): Promise<CustomerData[]> {
-  const params = search ? `?search=${encodeURIComponent(search)}` : "";
-  const res = await fetch(`${API_BASE}/api/customers${params}`);
-  if (!res.ok) throw new Error("Failed to fetch customers");
+  const params = new URLSearchParams(search ? { search } : {});
+  return fetchAllPages("/api/customers", params, "customers");
+}
+
+export async function suggestCustomers(
+  q: string,
+  limit = 10,
+): Promise<CustomerData[]> {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  const res = await fetch(`${API_BASE}/api/customers/suggest?${params}`);
+  if (!res.ok) throw new Error("Failed to fetch customer suggestions");
   return res.json();
 }
 
@@ -44,9 +92,14 @@ export interface ItemData {
 }
 
 export async function fetchItems(search = ""): Promise<ItemData[]> {
-  const params = search ? `?search=${encodeURIComponent(search)}` : "";
-  const res = await fetch(`${API_BASE}/api/items${params}`);
-  if (!res.ok) throw new Error("Failed to fetch items");
+  const params = new URLSearchParams(search ? { search } : {});
+  return fetchAllPages("/api/items", params, "items");
+}
+
+export async function suggestItems(q: string, limit = 10): Promise<ItemData[]> {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  const res = await fetch(`${API_BASE}/api/items/suggest?${params}`);
+  if (!res.ok) throw new Error("Failed to fetch item suggestions");
   return res.json();
 }
 
@@ -88,25 +141,59 @@ export interface EstimateData {
   customer_id: number | null;
   customer_obj: CustomerData | null;
   items: LineItemData[];
+  version: number;
 }
 
-export async function fetchEstimates(filters?: {
-  status?: string;
-  type?: string;
-  customer?: string;
-  search?: string;
-  date_from?: string;
-  date_to?: string;
-}): Promise<EstimateData[]> {
+// One page of estimates; pass the previous page's nextCursor for the next.
+export async function fetchEstimates(
+  filters?: {
+    status?: string;
+    type?: string;
+    customer?: string;
+    search?: string;
+    date_from?: string;
+    date_to?: string;
+    include_archived?: boolean;
+  },
+  page: { limit?: number; cursor?: string } = {},
+): Promise<Page<EstimateData>> {
   const params = new URLSearchParams();
-  if (filters) {
-    Object.entries(filters).forEach(([k, v]) => {
-      if (v) params.set(k, v);
-    });
-  }
+  Object.entries({ ...filters, ...page }).forEach(([k, v]) => {
+    if (v) params.set(k, String(v));
+  });
+  return fetchPage("/api/estimates", params, "estimates");
+}
+
+export interface StatsBucket {
+  key: string;
+  id: number | null;
+  count: number;
+  total: number;
+  average: number;
+}
+
+export interface EstimateStats {
+  date_from: string;
+  date_to: string;
+  count: number;
+  total: number;
+  average: number;
+  by_status: StatsBucket[];
+  by_type: StatsBucket[];
+  by_customer: StatsBucket[];
+  by_month: StatsBucket[];
+}
+
+export async function fetchEstimateStats(
+  dateFrom = "",
+  dateTo = "",
+): Promise<EstimateStats> {
+  const params = new URLSearchParams();
+  if (dateFrom) params.set("date_from", dateFrom);
+  if (dateTo) params.set("date_to", dateTo);
   const qs = params.toString();
-  const res = await fetch(`${API_BASE}/api/estimates${qs ? `?${qs}` : ""}`);
-  if (!res.ok) throw new Error("Failed to fetch estimates");
+  const res = await fetch(`${API_BASE}/api/estimates/stats${qs ? `?${qs}` : ""}`);
+  if (!res.ok) throw new Error("Failed to fetch estimate stats");
   return res.json();
 }
 
@@ -116,6 +203,18 @@ export async function fetchEstimate(id: string): Promise<EstimateData> {
   return res.json();
 }
 
+export async function fetchEstimatesBatch(
+  keys: (number | string)[],
+): Promise<{ key: string; estimate: EstimateData | null }[]> {
+  const res = await fetch(`${API_BASE}/api/estimates/batch-get`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ keys }),
+  });
+  if (!res.ok) throw new Error("Failed to fetch estimates");
+  return (await res.json()).results;
+}
+
 export async function createEstimate(data: {
   number?: string;
   date?: string;
@@ -151,12 +250,14 @@ export async function updateEstimate(
     customer_id?: number;
     notes?: string;
     items?: {
+      id?: number;
       item_id?: number;
       name: string;
       description?: string;
       quantity?: number;
       price?: number;
     }[];
+    version?: number;
   },
 ): Promise<EstimateData> {
   const res = await fetch(`${API_BASE}/api/estimates/${id}`, {
@@ -164,26 +265,127 @@ export async function updateEstimate(
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(data),
   });
+  if (res.status === 409 || res.status === 412)
+    throw new Error("Estimate was changed elsewhere; reload and try again");
   if (!res.ok) throw new Error("Failed to update estimate");
   return res.json();
 }
 
+export async function patchEstimateItems(
+  id: number,
+  data: {
+    items?: (Partial<Omit<LineItemData, "id">> & { id?: number })[];
+    delete?: number[];
+    version?: number;
+  },
+): Promise<EstimateData> {
+  const res = await fetch(`${API_BASE}/api/estimates/${id}/items`, {
+    method: "PATCH",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(data),
+  });
+  if (res.status === 409 || res.status === 412)
+    throw new Error("Estimate was changed elsewhere; reload and try again");
+  if (!res.ok) throw new Error("Failed to update estimate items");
+  return res.json();
+}
+
 export async function updateEstimateStatus(
   id: string,
   status: string,
+  version?: number,
 ): Promise<EstimateData> {
   const res = await fetch(`${API_BASE}/api/estimates/${id}/status`, {
     method: "PATCH",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ status }),
+    body: JSON.stringify({ status, version }),
   });
+  if (res.status === 409 || res.status === 412)
+    throw new Error("Estimate was changed elsewhere; reload and try again");
   if (!res.ok) throw new Error("Failed to update estimate status");
   return res.json();
 }
 
+export interface EstimateBatchResult {
+  index: number;
+  id: number;
+  op: "status" | "delete";
+  code: number;
+  error: string | null;
+  version: number | null;
+}
+
+export async function batchEstimates(
+  operations: (
+    | { op: "status"; id: number; status: string; version?: number }
+    | { op: "delete"; id: number; version?: number }
+  )[],
+): Promise<{
+  succeeded: number;
+  failed: number;
+  results: EstimateBatchResult[];
+}> {
+  const res = await fetch(`${API_BASE}/api/estimates/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ operations }),
+  });
+  if (!res.ok) throw new Error("Failed to update estimates");
+  return res.json();
+}
+
 export async function deleteEstimate(id: number): Promise<void> {
   const res = await fetch(`${API_BASE}/api/estimates/${id}`, {
     method: "DELETE",
   });
   if (!res.ok) throw new Error("Failed to delete estimate");
 }
+
+export function estimateReceiptUrl(id: number | string): string {
+  return `${API_BASE}/api/estimates/${encodeURIComponent(String(id))}/receipt`;
+}
+
+// ── Change feed ────────────────────────────────────────────────────────────
+
+export interface EstimateStatusChange {
+  id: number;
+  number: string;
+  status: string;
+  type: string;
+  version: number;
+}
+
+export interface EstimateEventHandlers {
+  created?: (estimate: EstimateData) => void;
+  updated?: (estimate: EstimateData) => void;
+  status?: (change: EstimateStatusChange) => void;
+  removed?: (estimate: { id: number; number: string }) => void;
+  // Bulk import, or this client fell too far behind: refetch.
+  resync?: () => void;
+}
+
+/**
+ * Follow estimate changes over Server-Sent Events. EventSource reconnects
+ * on its own and resumes after the last event it saw. Returns a function
+ * that closes the stream.
+ */
+export function subscribeEstimateEvents(
+  handlers: EstimateEventHandlers,
+): () => void {
+  const source = new EventSource(`${API_BASE}/api/estimates/events`);
+  const on = <T>(event: string, handler?: (data: T) => void) => {
+    if (handler) {
+      source.addEventListener(event, (e) =>
+        handler(JSON.parse((e as MessageEvent).data)),
+      );
+    }
+  };
+  on("estimate.created", handlers.created);
+  on("estimate.updated", handlers.updated);
+  on("estimate.status", handlers.status);
+  on("estimate.deleted", handlers.removed);
+  on("estimate.archived", handlers.removed);
+  on("estimates.imported", handlers.resync);
+  on("reset", handlers.resync);
+  return () => source.close();
+}